@@ -0,0 +1,307 @@
+"""
+`altitude_filter`
+====================================================
+
+Kalman filter for altitude, vertical velocity and vertical acceleration.
+
+:class:`AltitudeFilter` fuses the MPL3115A2 altitude, the vertical axis of the
+ISM330DHCX accelerometer and, when a fix is available, the GPS altitude and
+vertical velocity. The state is ``[altitude, velocity, acceleration]`` under a
+constant acceleration model driven by white jerk. Every sensor measures one
+state directly, so each sample is a scalar update: no matrix is inverted and
+nothing is allocated per step. The state and covariance live in preallocated
+arrays.
+
+Altitude samples whose innovation is far outside what the covariance allows,
+such as a pressure spike at transonic speed or ejection, are rejected, so a
+single bad altimeter reading cannot move the estimate.
+
+After burnout the filter predicts apogee from the current velocity and
+deceleration, assuming quadratic drag. :func:`replay` runs a
+:class:`flight_state.FlightStateMachine` on the filtered estimates over a
+recorded or simulated trace.
+"""
+
+import math
+from array import array
+
+from adafruit_ticks import ticks_diff
+from flight_state import (
+    LANDED,
+    STANDARD_GRAVITY,
+    FlightStateMachine,
+    RateScheduler,
+    TraceClock,
+    TraceSensor,
+)
+
+try:
+    from typing import Optional, Sequence, Tuple
+except ImportError:
+    pass
+
+
+class AltitudeFilter:  # pylint: disable=too-many-instance-attributes
+    """Estimates altitude, vertical velocity and acceleration.
+
+    Each update takes the ``ticks_ms`` value its sample was taken at; the
+    state is predicted forward to that time before the sample is applied.
+
+    :param float baro_noise: Altimeter noise standard deviation in meters.
+    :param float accel_noise: Accelerometer noise standard deviation in m/s^2.
+    :param float jerk_noise: Process noise spectral density in m^2/s^5. Larger
+        values follow motor ignition and burnout faster.
+    :param float gps_altitude_noise: GPS altitude standard deviation in meters.
+    :param float gps_velocity_noise: GPS vertical velocity standard deviation
+        in m/s.
+    :param int vertical_axis: Accelerometer axis along the rocket, 0 to 2.
+    :param int vertical_sign: 1 if that axis points up on the pad, -1 if down.
+    :param float gate: Altitude innovations beyond this many standard
+        deviations are rejected.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        baro_noise: float = 0.5,
+        accel_noise: float = 0.3,
+        jerk_noise: float = 500.0,
+        gps_altitude_noise: float = 5.0,
+        gps_velocity_noise: float = 0.5,
+        vertical_axis: int = 2,
+        vertical_sign: int = 1,
+        gate: float = 5.0,
+    ) -> None:
+        self.baro_variance = baro_noise * baro_noise
+        self.accel_variance = accel_noise * accel_noise
+        self.jerk_noise = jerk_noise
+        self.gps_altitude_variance = gps_altitude_noise * gps_altitude_noise
+        self.gps_velocity_variance = gps_velocity_noise * gps_velocity_noise
+        self.vertical_axis = vertical_axis
+        self.vertical_sign = vertical_sign
+        self.gate_squared = gate * gate
+        # State [altitude, velocity, acceleration] and its row-major 3x3
+        # covariance
+        self._x = array("f", (0.0, 0.0, 0.0))
+        self._p = array("f", (0.0,) * 9)
+        self._ticks = None
+        self._gps_offset = None
+        self._rejected_run = 0
+        self.steps = 0
+        self.rejected = 0
+
+    @property
+    def initialized(self) -> bool:
+        """True once an altitude sample has been seen."""
+        return self._ticks is not None
+
+    @property
+    def altitude(self) -> float:
+        """Estimated altitude in meters, in the altimeter's reference."""
+        return self._x[0]
+
+    @property
+    def velocity(self) -> float:
+        """Estimated vertical velocity in m/s, positive up."""
+        return self._x[1]
+
+    @property
+    def acceleration(self) -> float:
+        """Estimated vertical acceleration in m/s^2, without gravity."""
+        return self._x[2]
+
+    @property
+    def altitude_sigma(self) -> float:
+        """Standard deviation of the altitude estimate in meters."""
+        return math.sqrt(self._p[0])
+
+    def reset(self, altitude: float, now: int) -> None:
+        """Start over at rest at ``altitude`` meters."""
+        x = self._x
+        p = self._p
+        x[0] = altitude
+        x[1] = 0.0
+        x[2] = 0.0
+        for i in range(9):
+            p[i] = 0.0
+        p[0] = self.baro_variance
+        p[4] = 1.0
+        p[8] = 1.0
+        self._ticks = now
+        self._gps_offset = None
+        self._rejected_run = 0
+
+    def predict(self, now: int) -> None:
+        """Advance the state to ``now`` ticks."""
+        dt = ticks_diff(now, self._ticks) / 1000
+        if dt <= 0:
+            return  # Samples from two tasks can arrive slightly out of order
+        self._ticks = now
+        self.steps += 1
+        x = self._x
+        p = self._p
+        half = 0.5 * dt * dt
+        x[0] += x[1] * dt + x[2] * half
+        x[1] += x[2] * dt
+        # P = F P F' + Q with F = [[1, dt, dt^2/2], [0, 1, dt], [0, 0, 1]]
+        p00, p01, p02, p11, p12, p22 = p[0], p[1], p[2], p[4], p[5], p[8]
+        a01 = p01 + dt * p11 + half * p12
+        a02 = p02 + dt * p12 + half * p22
+        a12 = p12 + dt * p22
+        q = self.jerk_noise
+        dt2 = dt * dt
+        dt3 = dt2 * dt
+        p[0] = p00 + dt * p01 + half * p02 + dt * a01 + half * a02 + q * dt3 * dt2 / 20
+        p[1] = p[3] = a01 + dt * a02 + q * dt2 * dt2 / 8
+        p[2] = p[6] = a02 + q * dt3 / 6
+        p[4] = p11 + dt * p12 + dt * a12 + q * dt3 / 3
+        p[5] = p[7] = a12 + q * dt2 / 2
+        p[8] = p22 + q * dt
+
+    def _correct(
+        self, index: int, measured: float, variance: float, gated: bool = False
+    ) -> bool:
+        # Scalar Kalman update of state ``index``, optionally gated on the
+        # innovation.
+        x = self._x
+        p = self._p
+        row = index * 3
+        innovation = measured - x[index]
+        if gated:
+            s = p[row + index] + variance
+            if innovation * innovation > self.gate_squared * s:
+                self.rejected += 1
+                self._rejected_run += 1
+                if self._rejected_run < 5:
+                    return False
+                # A run of rejections means the estimate is lost, not the
+                # sensor: reopen the position and velocity uncertainty so
+                # the filter follows the sensor again.
+                p[row + index] += innovation * innovation
+                p[4] += innovation * innovation
+            self._rejected_run = 0
+        s = p[row + index] + variance
+        k0 = p[index] / s
+        k1 = p[3 + index] / s
+        k2 = p[6 + index] / s
+        x[0] += k0 * innovation
+        x[1] += k1 * innovation
+        x[2] += k2 * innovation
+        r0, r1, r2 = p[row], p[row + 1], p[row + 2]
+        p[0] -= k0 * r0
+        p[1] -= k0 * r1
+        p[2] -= k0 * r2
+        p[3] -= k1 * r0
+        p[4] -= k1 * r1
+        p[5] -= k1 * r2
+        p[6] -= k2 * r0
+        p[7] -= k2 * r1
+        p[8] -= k2 * r2
+        return True
+
+    def update_altitude(self, now: int, altitude: float) -> bool:
+        """Apply an altimeter sample in meters. The first one initializes the
+        filter. Returns False if the sample was rejected as an outlier; after
+        five in a row the next is accepted anyway."""
+        if self._ticks is None:
+            self.reset(altitude, now)
+            return True
+        self.predict(now)
+        return self._correct(0, altitude, self.baro_variance, True)
+
+    def update_acceleration(self, now: int, x: float, y: float, z: float) -> bool:
+        """Apply an accelerometer sample in m/s^2. Only the vertical axis is
+        used, and gravity is taken off it. The accelerometer is never gated,
+        so ignition and burnout steps go straight in. Samples before the
+        first altitude are ignored."""
+        if self._ticks is None:
+            return False
+        if self.vertical_axis == 2:
+            sensed = z
+        else:
+            sensed = x if self.vertical_axis == 0 else y
+        self.predict(now)
+        return self._correct(
+            2, self.vertical_sign * sensed - STANDARD_GRAVITY, self.accel_variance
+        )
+
+    def update_motion(self, now: int, motion: Sequence[float]) -> bool:
+        """Apply the acceleration from a ``LSM6DS.read_motion`` array."""
+        return self.update_acceleration(now, motion[0], motion[1], motion[2])
+
+    def update_gps(self, now: int, gps) -> None:
+        """Apply ``altitude_m`` and, from a UBX NAV-PVT receiver,
+        ``velocity_down`` of an `adafruit_gps.GPS`. Call it once per new
+        fix. GPS altitude is above mean sea level while the altimeter's
+        depends on the sea level pressure set, so the offset between the two
+        at the first fix is removed and only GPS altitude changes are used."""
+        if self._ticks is None or not gps.has_fix:
+            return
+        self.predict(now)
+        if gps.altitude_m is not None:
+            if self._gps_offset is None:
+                self._gps_offset = gps.altitude_m - self._x[0]
+            self._correct(
+                0, gps.altitude_m - self._gps_offset, self.gps_altitude_variance, True
+            )
+        velocity_down = getattr(gps, "velocity_down", None)
+        if velocity_down is not None:
+            self._correct(1, -velocity_down, self.gps_velocity_variance)
+
+    def apogee_prediction(self) -> Tuple[float, float]:
+        """Predicted ``(apogee_altitude, seconds_to_apogee)`` from the current
+        estimate, assuming the deceleration beyond gravity is drag growing with
+        the square of velocity. Only meaningful after burnout; once descending
+        it is the current altitude and 0."""
+        altitude, velocity, acceleration = self._x[0], self._x[1], self._x[2]
+        if velocity <= 0:
+            return altitude, 0.0
+        g = STANDARD_GRAVITY
+        drag = (-acceleration - g) / (velocity * velocity)
+        if drag < 1e-6:
+            return altitude + velocity * velocity / (2 * g), velocity / g
+        return (
+            altitude + math.log(1 + drag * velocity * velocity / g) / (2 * drag),
+            math.atan(velocity * math.sqrt(drag / g)) / math.sqrt(drag * g),
+        )
+
+    @property
+    def predicted_apogee(self) -> float:
+        """Predicted apogee altitude in meters, see :meth:`apogee_prediction`."""
+        return self.apogee_prediction()[0]
+
+
+def replay(
+    trace: Sequence[Sequence[float]],
+    *,
+    baro_period_ms: int = 50,
+    imu_period_ms: int = 10,
+    altitude_filter: Optional[AltitudeFilter] = None,
+    **kwargs,
+) -> Tuple[FlightStateMachine, AltitudeFilter]:
+    """Like :func:`flight_state.replay`, but the state machine is fed the
+    filtered altitude and velocity. Returns the machine and the filter.
+
+    Extra keyword arguments are passed to :class:`FlightStateMachine`.
+    """
+    if altitude_filter is None:
+        altitude_filter = AltitudeFilter()
+    clock = TraceClock(trace[0][0])
+    sensor = TraceSensor(trace, clock)
+    machine = FlightStateMachine(**kwargs)
+    scheduler = RateScheduler(clock.ticks_ms, clock.sleep)
+
+    def sample_baro(now: int) -> None:
+        altitude_filter.update_altitude(now, sensor.altitude)
+        machine.update_altitude(now, altitude_filter.altitude)
+
+    def sample_imu(now: int) -> None:
+        x, y, z = sensor.acceleration
+        altitude_filter.update_acceleration(now, x, y, z)
+        machine.update_acceleration(now, x, y, z)
+        machine.update_velocity(now, altitude_filter.velocity)
+
+    scheduler.add(baro_period_ms, sample_baro)
+    scheduler.add(imu_period_ms, sample_imu)
+    scheduler.run(lambda: machine.state == LANDED or sensor.ended)
+    return machine, altitude_filter
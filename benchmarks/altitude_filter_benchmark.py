@@ -0,0 +1,104 @@
+# Apogee detection with and without altitude_filter, replayed on flight traces.
+# Runs on the board or any computer:
+#   python3 benchmarks/altitude_filter_benchmark.py [trace.csv ...]
+# Traces are t_ms,altitude,ax,ay,az CSV; make one from a flight log with
+#   flight_recorder.to_trace("flight.bin", "trace.csv")
+# Without any, simulated flights are used, some with a burst of bad altimeter
+# readings in coast. Latency is from the true apogee where it is known, and
+# from the highest filtered altitude otherwise.
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import flight_state
+from altitude_filter import AltitudeFilter, replay
+from flight_state import APOGEE, COAST, load_trace, simulate_flight
+
+monotonic_ns = getattr(time, "monotonic_ns", None)
+
+
+def clock_us():
+    if monotonic_ns is not None:
+        return monotonic_ns() / 1000
+    return time.monotonic() * 1e6
+
+
+def with_spike(trace, at_ms, drop, rows=30):
+    # Lower the altitude of rows trace rows after at_ms by drop meters; at the
+    # 5 ms simulation step, 30 rows are three 50 ms altimeter samples.
+    spiked = []
+    count = 0
+    for row in trace:
+        if row[0] >= at_ms and count < rows:
+            row = (row[0], row[1] - drop) + tuple(row[2:])
+            count += 1
+        spiked.append(row)
+    return spiked
+
+
+def step_cost_us(trace, imu_period_ms=10, baro_period_ms=50):
+    # The filter alone, at the flight rates
+    filt = AltitudeFilter()
+    start = clock_us()
+    for row in trace:
+        t = row[0]
+        if t % imu_period_ms == 0:
+            filt.update_acceleration(t, row[2], row[3], row[4])
+        if t % baro_period_ms == 0:
+            filt.update_altitude(t, row[1])
+    return (clock_us() - start) / max(filt.steps, 1)
+
+
+def prediction_error(trace, coast_ms, apogee_altitude, lead_ms=1000):
+    # Apogee predicted lead_ms after burnout against the filtered peak
+    filt = AltitudeFilter()
+    for row in trace:
+        t = row[0]
+        if t % 10 == 0:
+            filt.update_acceleration(t, row[2], row[3], row[4])
+        if t % 50 == 0:
+            filt.update_altitude(t, row[1])
+        if t >= coast_ms + lead_ms:
+            return filt.predicted_apogee - apogee_altitude
+    return None
+
+
+def latency(machine, reference):
+    for elapsed, state, _ in machine.events:
+        if state == APOGEE:
+            return "%+6d ms" % (elapsed - reference)
+    return "  missed"
+
+
+runs = []
+if len(sys.argv) > 1:
+    for path in sys.argv[1:]:
+        runs.append((path, load_trace(path), None))
+else:
+    for seed in (1, 2, 3):
+        trace, truth = simulate_flight(seed=seed)
+        runs.append(("sim seed %d" % seed, trace, truth))
+        spiked = with_spike(trace, truth[COAST] + 3000, 15.0)
+        runs.append(("sim seed %d spike" % seed, spiked, truth))
+
+for name, trace, truth in runs:
+    raw = flight_state.replay(trace)
+    filtered, filt = replay(trace)
+    if truth is not None:
+        reference = truth[APOGEE]
+    else:
+        reference = filtered.max_altitude_ms
+    line = "%-18s apogee raw %s filtered %s, %4d rejected, %5.1f us/step" % (
+        name,
+        latency(raw, reference),
+        latency(filtered, reference),
+        filt.rejected,
+        step_cost_us(trace),
+    )
+    if truth is not None:
+        error = prediction_error(trace, truth[COAST], filtered.max_altitude)
+        if error is not None:
+            line += ", prediction at burnout+1s %+.1f m" % error
+    print(line)
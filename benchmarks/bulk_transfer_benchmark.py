@@ -0,0 +1,69 @@
+# Measure bulk_transfer throughput over a simulated lossy LoRa link.
+# Runs on the ground station or any computer:
+#   python3 benchmarks/bulk_transfer_benchmark.py [file]
+# Compares stop-and-wait (a window of 1) with selective repeat at several
+# loss rates. Times are link time: airtime at SF7/125 kHz plus ACK waits.
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bulk_transfer import BulkReceiver, BulkSender, LoopbackLink
+
+SOURCE = sys.argv[1] if len(sys.argv) > 1 else "bulk_source.bin"
+TARGET = "bulk_target.bin"
+if len(sys.argv) < 2:
+    with open(SOURCE, "wb") as f:
+        f.write(os.urandom(16 * 1024))
+size = os.path.getsize(SOURCE)
+
+
+async def measure(link, sender, receiver):
+    async def send():
+        start = time.monotonic()
+        done = await sender.send(SOURCE)
+        # The receiver lingers after the last chunk, so time the sender only.
+        return done, time.monotonic() - start
+
+    (sent, elapsed), received = await asyncio.gather(
+        send(), receiver.receive(TARGET, timeout=10.0, linger=1.0)
+    )
+    return sent and received, elapsed / link.time_scale
+
+
+print("%d byte file" % size)
+try:
+    for loss in (0.0, 0.1, 0.3):
+        for window in (1, 16, 32):
+            link = LoopbackLink(loss, time_scale=0.005)
+            sender = BulkSender(
+                link.a,
+                link.b.node,
+                window=window,
+                ack_timeout=1.0,
+                clock=link.ticks_ms,
+            )
+            receiver = BulkReceiver(link.b)
+            ok, seconds = asyncio.run(measure(link, sender, receiver))
+            with open(SOURCE, "rb") as a, open(TARGET, "rb") as b:
+                intact = a.read() == b.read()
+            print(
+                "loss %2d%% window %2d: %s, %.1f s, %.0f bit/s, %d packets, %d resent"
+                % (
+                    loss * 100,
+                    window,
+                    "ok" if ok and intact else "FAILED",
+                    seconds,
+                    size * 8 / seconds,
+                    sender.packets,
+                    sender.resent,
+                )
+            )
+finally:
+    # Leave only a file that was passed in
+    if os.path.exists(TARGET):
+        os.remove(TARGET)
+    if len(sys.argv) < 2:
+        os.remove(SOURCE)
@@ -0,0 +1,172 @@
+# Parse throughput of adafruit_gps: line-based update() against the streaming
+# update_stream() parser, on a recorded NMEA log replayed from RAM, and the same
+# number of fixes as binary UBX NAV-PVT frames.
+# Put a log on the board as nmea.log, or a synthetic 10 Hz GGA/RMC/VTG/GSA/GSV
+# stream is used. Allocations are only reported on CircuitPython, where
+# gc.mem_alloc counts every heap byte handed out.
+import gc
+import struct
+import time
+import adafruit_gps
+
+LOG = "nmea.log"
+SENTENCES = 500
+
+mem_alloc = getattr(gc, "mem_alloc", None)
+
+
+def sentence(body):
+    checksum = 0
+    for char in body:
+        checksum ^= ord(char)
+    return "$%s*%02X\r\n" % (body, checksum)
+
+
+def synthetic_log():
+    lines = []
+    for i in range(SENTENCES // 4):
+        stamp = "1200%02d.%02d" % (i // 10 % 60, i % 10 * 10)
+        lines.append(
+            sentence(
+                "GPGGA,%s,4807.0%02d,N,01131.0%02d,E,1,08,0.9,%d.4,M,46.9,M,,"
+                % (stamp, i % 100, i % 97, 545 + i % 50)
+            )
+        )
+        lines.append(
+            sentence(
+                "GPRMC,%s,A,4807.0%02d,N,01131.0%02d,E,022.4,084.4,230394,003.1,W,A"
+                % (stamp, i % 100, i % 97)
+            )
+        )
+        lines.append(sentence("GPVTG,054.7,T,034.4,M,005.5,N,010.2,K,A"))
+        if i % 10 == 0:
+            lines.append(sentence("GPGSA,A,3,04,05,,09,12,,,24,,,,,2.5,1.3,2.1"))
+        else:
+            lines.append(
+                sentence(
+                    "GPGGA,%s,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,"
+                    % stamp
+                )
+            )
+    return "".join(lines).encode()
+
+
+def ubx_frame(msg_class, msg_id, payload):
+    body = bytes((msg_class, msg_id, len(payload) & 0xFF, len(payload) >> 8))
+    body += payload
+    ck_a = ck_b = 0
+    for char in body:
+        ck_a = (ck_a + char) & 0xFF
+        ck_b = (ck_b + ck_a) & 0xFF
+    return b"\xb5\x62" + body + bytes((ck_a, ck_b))
+
+
+def nav_pvt_log(fixes):
+    frames = []
+    for i in range(fixes):
+        payload = struct.pack(
+            "<IHBBBBBBIiBBBBiiiiIIiiiiiIIH",
+            i * 100,
+            2025,
+            6,
+            1,
+            12,
+            i // 10 % 60,
+            i % 60,
+            0x07,
+            50,
+            0,
+            3,
+            0x01,
+            0,
+            8,
+            115166666 + i,
+            481173000 + i,
+            592300 + i,
+            545400 + i,
+            1500,
+            2500,
+            100,
+            -200,
+            -36500,
+            11520,
+            8440000,
+            300,
+            500000,
+            250,
+        )
+        frames.append(ubx_frame(0x01, 0x07, payload + bytes(92 - len(payload))))
+    return b"".join(frames)
+
+
+class ReplayUART:
+    """A UART stand-in that replays a byte string in fixed-size bursts."""
+
+    def __init__(self, data, burst=64):
+        self.data = data
+        self.position = 0
+        self.burst = burst
+
+    @property
+    def in_waiting(self):
+        return min(self.burst, len(self.data) - self.position)
+
+    def readline(self):
+        end = self.data.find(b"\n", self.position)
+        if end < 0:
+            return None
+        line = self.data[self.position : end + 1]
+        self.position = end + 1
+        return line
+
+    def readinto(self, buf):
+        count = min(len(buf), len(self.data) - self.position)
+        buf[:count] = self.data[self.position : self.position + count]
+        self.position += count
+        return count
+
+
+def measure(name, data, parse):
+    gps = adafruit_gps.GPS(ReplayUART(data))
+    gc.collect()
+    if mem_alloc is not None:
+        before = mem_alloc()
+    start = time.monotonic()
+    parsed = parse(gps)
+    elapsed = time.monotonic() - start
+    allocated = "n/a"
+    if mem_alloc is not None:
+        allocated = "%.0f" % ((mem_alloc() - before) / max(parsed, 1))
+    print(
+        "%-16s %5d sentences %8.0f sentences/s %6s bytes/sentence"
+        % (name, parsed, parsed / elapsed, allocated)
+    )
+
+
+def run_update(gps):
+    parsed = 0
+    while gps.update() is not False:
+        parsed += 1
+    return parsed
+
+
+def run_stream(gps):
+    parsed = 0
+    uart = gps._uart  # pylint: disable=protected-access
+    while uart.position < len(uart.data):
+        parsed += gps.update_stream()
+    return parsed
+
+
+try:
+    with open(LOG, "rb") as log:
+        nmea = log.read()
+except OSError:
+    nmea = synthetic_log()
+print("%d bytes of NMEA" % len(nmea))
+measure("update()", nmea, run_update)
+measure("update_stream()", nmea, run_stream)
+fixes = nmea.count(b"GGA,")
+ubx = nav_pvt_log(fixes)
+print("%d bytes of NAV-PVT for the same %d fixes" % (len(ubx), fixes))
+measure("NAV-PVT stream", ubx, run_stream)
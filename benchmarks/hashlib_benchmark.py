@@ -0,0 +1,64 @@
+# Throughput of the pure Python digests in adafruit_hashlib, checked against
+# and timed beside the hashlib module of the interpreter running it (CPython's
+# C implementations on a computer, the built-in ones on boards that have
+# them). Messages of every length up to a few blocks, fed in uneven pieces,
+# must give the same digests. The file test hashes a log with
+# update_from_file, as done after a flight; put one on the board as
+# flight.bin or a synthetic 64 KB one is written.
+import os
+import time
+import adafruit_hashlib
+from adafruit_hashlib._md5 import md5
+from adafruit_hashlib._sha1 import sha1
+from adafruit_hashlib._sha256 import sha224, sha256
+from adafruit_hashlib._sha512 import sha384, sha512
+
+try:
+    import hashlib
+except ImportError:
+    hashlib = None
+
+SIZE = 16384
+LOG = "flight.bin"
+
+message = bytes(i * 131 & 0xFF for i in range(SIZE))
+print("%-7s %10s %10s" % ("", "KB/s", "built-in"))
+for digest_class in (md5, sha1, sha224, sha256, sha384, sha512):
+    reference = getattr(hashlib, digest_class.name, None) if hashlib else None
+    if reference is not None:
+        for length in range(0, 3 * digest_class.block_size + 2):
+            piecewise = digest_class()
+            position = 0
+            while position < length:
+                end = min(length, position + 1 + position % 37)
+                piecewise.update(message[position:end])
+                position = end
+            expected = reference(message[:length]).digest()
+            assert piecewise.digest() == expected, (digest_class.name, length)
+    start = time.monotonic()
+    digest_class(message).digest()
+    elapsed = time.monotonic() - start
+    native = "n/a"
+    if reference is not None:
+        start = time.monotonic()
+        for _ in range(100):
+            reference(message).digest()
+        native = "%.0f" % (100 * SIZE / 1024 / (time.monotonic() - start))
+    print("%-7s %10.1f %10s" % (digest_class.name, SIZE / 1024 / elapsed, native))
+
+try:
+    size = os.stat(LOG)[6]
+    remove = False
+except OSError:
+    with open(LOG, "wb") as log:
+        for _ in range(4):
+            log.write(message)
+    size = 4 * SIZE
+    remove = True
+start = time.monotonic()
+with open(LOG, "rb") as log:
+    hexdigest = adafruit_hashlib.update_from_file(sha256(), log).hexdigest()
+elapsed = time.monotonic() - start
+print("update_from_file: %d bytes in %.2f s, sha256 %s" % (size, elapsed, hexdigest))
+if remove:
+    os.remove(LOG)
@@ -0,0 +1,92 @@
+# Per-record cost of the adafruit_logging file handlers. Run it on the board
+# with the SD card mounted at /sd, or on any computer, where the log goes to
+# the working directory. FileHandler flushes after every record; the old
+# RotatingFileHandler also flushed and stat'ed the file before every record.
+# BufferedFileHandler formats and writes in batches of about 4 KB, so most
+# records cost a list append; the maximum is a batch being written.
+#
+# The second part leaves the filesystem out: the CPU cost of a disabled debug
+# call, and of a sensor record written as text by StreamHandler against a
+# packed record by BinaryHandler, with the bytes each puts in the log.
+import os
+import time
+import adafruit_logging as logging
+
+RECORDS = 500
+DIRECTORY = "/sd" if "sd" in os.listdir("/") else "."
+
+
+class OldRotatingFileHandler(logging.RotatingFileHandler):
+    """RotatingFileHandler as it was, checking the size on disk per record."""
+
+    def emit(self, record):
+        if self.GetLogSize() >= self._maxBytes > 0 and self._backupCount > 0:
+            self.doRollover()
+        self.stream.write(self.format(record) + self.terminator)
+        self.stream.flush()
+
+
+def measure(name, handler):
+    logger = logging.Logger(name, logging.DEBUG)
+    logger.addHandler(handler)
+    worst = 0
+    start = time.monotonic()
+    for i in range(RECORDS):
+        before = time.monotonic()
+        logger.info("alt %d m, vel %d m/s, state %s", i, i % 50, "COAST")
+        worst = max(worst, time.monotonic() - before)
+    handler.close()
+    elapsed = time.monotonic() - start
+    print(
+        "%-24s %7.1f us/record  max %8.1f us"
+        % (name, elapsed * 1e6 / RECORDS, worst * 1e6)
+    )
+
+
+filename = DIRECTORY + "/bench.log"
+for handler_class, arguments in (
+    (logging.FileHandler, ()),
+    (OldRotatingFileHandler, (1 << 20, 1)),
+    (logging.RotatingFileHandler, (1 << 20, 1)),
+    (logging.BufferedFileHandler, ()),
+):
+    label = handler_class.__name__
+    if handler_class is OldRotatingFileHandler:
+        label = "old RotatingFileHandler"
+    measure(label, handler_class(filename, "w", *arguments))
+os.remove(filename)
+
+
+class CountingStream:
+    """A stream that only counts what is written to it."""
+
+    def __init__(self):
+        self.written = 0
+
+    def write(self, data):
+        self.written += len(data)
+
+    def flush(self):
+        pass
+
+
+def per_call_us(logger, count=RECORDS):
+    start = time.monotonic()
+    for i in range(count):
+        logger.debug("alt %f m, vel %f m/s, state %d", 1234.5 + i, 87.25, 2)
+    return (time.monotonic() - start) * 1e6 / count
+
+
+quiet = logging.Logger("quiet", logging.INFO)
+quiet.addHandler(logging.NullHandler())
+print("%-24s %7.1f us/record" % ("disabled debug", per_call_us(quiet)))
+for handler_class in (logging.StreamHandler, logging.BinaryHandler):
+    stream = CountingStream()
+    sink = logging.Logger(handler_class.__name__, logging.DEBUG)
+    sink.addHandler(handler_class(stream))
+    stream.written = 0
+    cost = per_call_us(sink)
+    print(
+        "%-24s %7.1f us/record  %5.1f bytes/record"
+        % (handler_class.__name__, cost, stream.written / RECORDS)
+    )
@@ -0,0 +1,29 @@
+# Compare IMU samples per second between the acceleration/gyro properties and
+# the single-transaction read_motion() call on the flight ISM330DHCX.
+import time
+from array import array
+import busio
+from board import *
+from adafruit_lsm6ds.ism330dhcx import ISM330DHCX
+
+SAMPLES = 1000
+
+i2c = busio.I2C(SCL, SDA)
+sensor = ISM330DHCX(i2c, address=0x6a)
+
+
+def rate(read):
+    start = time.monotonic()
+    for _ in range(SAMPLES):
+        read()
+    return SAMPLES / (time.monotonic() - start)
+
+
+def read_properties():
+    sensor.acceleration
+    sensor.gyro
+
+
+motion = array("f", (0.0,) * 6)
+print("properties:  %.1f samples/s" % rate(read_properties))
+print("read_motion: %.1f samples/s" % rate(lambda: sensor.read_motion(motion)))
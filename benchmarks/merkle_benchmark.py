@@ -0,0 +1,156 @@
+# Cost of proving a flight log intact with the Merkle tree HashingSink against
+# hashing the whole file once the flight is over. The log is written by a
+# FlightRecorder.run task in 4 KB chunks, as in flight, beside a sampler task
+# that logs a record each time it gets to run; the longest the sampler waits
+# is the stall hashing adds to it. The time from close() to a root follows.
+# After that a single byte of the log is flipped: verify_log names the chunk,
+# either by rehashing every chunk or by reading only the chunks asked about.
+#
+# HMAC over the adafruit_hashlib objects is first checked against the RFC 4231
+# SHA-256 vectors, and the tree against RFC 6962 built from plain SHA-256.
+# Sinks are timed with the pure Python SHA-256 and with the built-in one from
+# native_digestmod where there is one; the checks after the flight use the
+# pure Python one.
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from adafruit_hashlib import hmac, update_from_file
+from adafruit_hashlib._sha256 import sha256
+from adafruit_hashlib.merkle import MerkleHash
+from flight_recorder import (
+    FileSink,
+    FlightRecorder,
+    HashingSink,
+    RECORD_IMU,
+    native_digestmod,
+    verify_log,
+)
+
+RECORDS = 4096
+LOG = "bench.bin"
+TREE = "bench.tree"
+KEY = b"ground station"
+
+for key, data, tag in (
+    (
+        b"\x0b" * 20,
+        b"Hi There",
+        "b0344c61d8db38535ca8afceaf0bf12b881dc200c9833da726e9376c2e32cff7",
+    ),
+    (
+        b"Jefe",
+        b"what do ya want for nothing?",
+        "5bdcc146bf60754e6a042426089575c75a003f089d2739839dec58b964ec3843",
+    ),
+    (
+        b"\xaa" * 131,
+        b"Test Using Larger Than Block-Size Key - Hash Key First",
+        "60e431591ee0b67f0d8a26aacbf5b77f8e0bc6213728c5140546040f0ee37f54",
+    ),
+):
+    assert hmac.new(key, data, sha256).hexdigest() == tag, "RFC 4231"
+    assert hmac.new(key, data, "sha256").hexdigest() == tag, "RFC 4231"
+
+
+def leaf(chunk):
+    return sha256(b"\x00" + chunk).digest()
+
+
+def node(left, right):
+    return sha256(b"\x01" + left + right).digest()
+
+
+chunks = [bytes([i]) * 4096 for i in range(5)]
+tree = MerkleHash(digestmod=sha256)
+for chunk in chunks:
+    tree.update(chunk)
+expected = node(
+    node(
+        node(leaf(chunks[0]), leaf(chunks[1])),
+        node(leaf(chunks[2]), leaf(chunks[3])),
+    ),
+    leaf(chunks[4]),
+)
+assert tree.finish() == expected, "RFC 6962"
+print("RFC 4231 and RFC 6962 checks pass")
+
+
+async def sample(recorder, state):
+    worst = 0.0
+    last = time.monotonic()
+    for i in range(RECORDS):
+        recorder.log(RECORD_IMU, i, (0.1 * i, 9.81, -0.2, 0.01, 0.02, 0.03))
+        await asyncio.sleep(0)
+        now = time.monotonic()
+        worst = max(worst, now - last)
+        last = now
+    state["worst"] = worst
+    recorder.stop()
+
+
+async def fly(recorder, state):
+    await asyncio.gather(sample(recorder, state), recorder.run(interval=0))
+
+
+sinks = [
+    ("FileSink", lambda: FileSink(LOG)),
+    (
+        "pure SHA-256",
+        lambda: HashingSink(FileSink(LOG), TREE, key=KEY, digestmod=sha256),
+    ),
+]
+if native_digestmod() is not None:
+    sinks.append(
+        (
+            "built-in SHA-256",
+            lambda: HashingSink(
+                FileSink(LOG), TREE, key=KEY, digestmod=native_digestmod()
+            ),
+        )
+    )
+for name, make_sink in sinks:
+    recorder = FlightRecorder(make_sink())
+    state = {}
+    start = time.monotonic()
+    asyncio.run(fly(recorder, state))
+    logged = time.monotonic() - start
+    start = time.monotonic()
+    recorder.close()
+    closed = time.monotonic() - start
+    print(
+        "%-16s %7.3f s to log, sampler stall max %6.2f ms, close to root %7.4f s"
+        % (name, logged, state["worst"] * 1000, closed)
+    )
+size = os.stat(LOG)[6]
+
+def report(label, start, found=None):
+    line = "%-34s %7.3f s" % (label, time.monotonic() - start)
+    if found is not None:
+        line += ", corrupt chunks %s" % found
+    print(line)
+
+
+start = time.monotonic()
+with open(LOG, "rb") as log:
+    update_from_file(sha256(), log).digest()
+report("whole file sha256, %d bytes" % size, start)
+start = time.monotonic()
+assert verify_log(LOG, TREE, KEY, sha256) == []
+report("verify_log, intact", start)
+corrupt = size // 2 + 100
+with open(LOG, "r+b") as log:
+    log.seek(corrupt)
+    byte = log.read(1)[0]
+    log.seek(corrupt)
+    log.write(bytes((byte ^ 0x01,)))
+start = time.monotonic()
+report("verify_log, all chunks", start, verify_log(LOG, TREE, KEY, sha256))
+start = time.monotonic()
+found = verify_log(LOG, TREE, KEY, sha256, chunks=(0, corrupt // 4096))
+report("verify_log, two chunks", start, found)
+os.remove(LOG)
+os.remove(TREE)
@@ -0,0 +1,83 @@
+# Time and allocation cost per access of each adafruit_register descriptor.
+# The registers live in RAM behind a fake bus so only the Python overhead of the
+# descriptors is measured. Allocations are only reported on CircuitPython,
+# where gc.mem_alloc counts every heap byte handed out.
+import gc
+import time
+from array import array
+from adafruit_register.i2c_bit import RWBit
+from adafruit_register.i2c_bits import RWBits
+from adafruit_register.i2c_struct import Struct, UnaryStruct
+
+ACCESSES = 2000
+
+mem_alloc = getattr(gc, "mem_alloc", None)
+
+
+class RegisterFile:
+    """An I2CDevice stand-in backed by a bytearray of registers."""
+
+    def __init__(self):
+        self.registers = bytearray(256)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def write(self, buf, *, start=0, end=None):
+        end = len(buf) if end is None else end
+        address = buf[start]
+        self.registers[address : address + end - start - 1] = buf[start + 1 : end]
+
+    def write_then_readinto(
+        self, out_buf, in_buf, *, out_start=0, out_end=None, in_start=0, in_end=None
+    ):
+        in_end = len(in_buf) if in_end is None else in_end
+        address = out_buf[out_start]
+        for i in range(in_end - in_start):
+            in_buf[in_start + i] = self.registers[address + i]
+
+
+class Device:
+    i2c_device = RegisterFile()
+    bit = RWBit(0x10, 3)
+    bits = RWBits(4, 0x10, 4)
+    unary = UnaryStruct(0x20, "<h")
+    vector = Struct(0x28, "<hhh")
+
+
+def measure(name, access):
+    gc.collect()
+    if mem_alloc is not None:
+        gc.disable()
+        before = mem_alloc()
+    start = time.monotonic()
+    for _ in range(ACCESSES):
+        access()
+    elapsed = time.monotonic() - start
+    allocated = "n/a"
+    if mem_alloc is not None:
+        allocated = "%.1f" % ((mem_alloc() - before) / ACCESSES)
+        gc.enable()
+    print(
+        "%-18s %8.1f us/access %8s bytes/access"
+        % (name, elapsed * 1e6 / ACCESSES, allocated)
+    )
+
+
+device = Device()
+values = array("h", (0, 0, 0))
+
+
+def set_unary():
+    device.unary = 1234
+
+
+measure("RWBit get", lambda: device.bit)
+measure("RWBits get", lambda: device.bits)
+measure("UnaryStruct get", lambda: device.unary)
+measure("UnaryStruct set", set_unary)
+measure("Struct get", lambda: device.vector)
+measure("Struct readinto", lambda: Device.vector.readinto(device, values))
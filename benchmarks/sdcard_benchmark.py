@@ -0,0 +1,259 @@
+# Write throughput and per-write latency of adafruit_sdcard, raw SDCard against
+# BufferedSDCard, on a simulated SPI card. The simulation speaks the SD SPI
+# protocol byte by byte and charges bus time for every byte clocked at the SPI
+# baud rate, plus a fixed cost per chip select. Programming time is modelled
+# as busy bytes the driver has to poll through; these numbers are assumptions
+# in the range of a class 10 card, not measurements.
+#
+# The workload is what FAT does for a log of small appends: each append
+# rewrites the current data sector, the directory sector is read and rewritten
+# every few appends, and the FAT sectors (both copies) at every new cluster.
+# Most buffered writes cost no bus time at all, so their cost shows up in the
+# mean and the maximum (a flush) rather than the 99th percentile.
+import time
+import adafruit_sdcard
+
+BAUDRATE = 12000000
+CS_OVERHEAD_US = 20  # Lock, configure and chip select, per transaction
+SINGLE_BUSY_US = 900  # Programming a lone block
+MULTI_BUSY_US = 150  # Per block inside a CMD25 run
+STOP_BUSY_US = 1500  # Finishing a CMD25 run without a pre-erase hint
+STOP_BUSY_ERASED_US = 300  # ... and with one
+
+APPENDS = 2048
+RECORD_SIZE = 64
+SYNC_EVERY = 8
+CLUSTER_BLOCKS = 8
+FAT_BLOCK = 32
+FAT_COPY_BLOCK = 288
+DIR_BLOCK = 544
+DATA_BLOCK = 600
+
+
+class SimulatedCard:
+    """A busio.SPI stand-in with an SDHC card in SPI mode behind it."""
+
+    def __init__(self):
+        self.blocks = {}
+        self.out = bytearray()
+        self.position = 0
+        self.command = bytearray()
+        self.mode = "command"
+        self.data = bytearray()
+        self.next_block = 0
+        self.app_command = False
+        self.erase_count = 0
+        self.crc = False
+        self.crc_errors = 0
+        self.bytes = 0
+        self.transactions = 0
+
+    def bus_us(self):
+        return self.bytes * 8e6 / BAUDRATE + self.transactions * CS_OVERHEAD_US
+
+    def busy(self, microseconds):
+        return bytes(int(microseconds * BAUDRATE / 8e6))
+
+    # busio.SPI interface
+    def try_lock(self):
+        self.transactions += 1
+        return True
+
+    def unlock(self):
+        pass
+
+    def configure(self, **kwargs):
+        pass
+
+    def write(self, buf, *, start=0, end=None):
+        end = len(buf) if end is None else end
+        self.bytes += end - start
+        for i in range(start, end):
+            self.receive(buf[i])
+
+    def readinto(self, buf, *, start=0, end=None, write_value=0):
+        end = len(buf) if end is None else end
+        self.bytes += end - start
+        for i in range(start, end):
+            if self.mode == "read" and self.position >= len(self.out):
+                self.queue_block()
+            if self.position < len(self.out):
+                buf[i] = self.out[self.position]
+                self.position += 1
+            else:
+                buf[i] = 0xFF
+
+    # Card side
+    def respond(self, data):
+        if self.position >= len(self.out):
+            self.out = bytearray(data)
+            self.position = 0
+        else:
+            self.out += data
+
+    def queue_block(self):
+        data = self.blocks.get(self.next_block, bytes(512))
+        crc = adafruit_sdcard.calculate_crc16(data)
+        self.respond(b"\xff\xfe" + data + bytes((crc >> 8, crc & 0xFF)))
+        self.next_block += 1
+
+    def receive(self, byte):
+        if self.mode in ("write", "write_multiple"):
+            if not self.data:
+                if byte == 0xFD and self.mode == "write_multiple":
+                    stop = STOP_BUSY_ERASED_US if self.erase_count else STOP_BUSY_US
+                    self.erase_count = 0
+                    self.mode = "command"
+                    self.respond(b"\xff" + self.busy(stop))
+                elif byte in (0xFE, 0xFC):
+                    self.data.append(byte)
+                return
+            self.data.append(byte)
+            if len(self.data) == 515:  # token, data and CRC
+                data = bytes(self.data[1:513])
+                crc = self.data[513] << 8 | self.data[514]
+                self.data = bytearray()
+                if self.crc and crc != adafruit_sdcard.calculate_crc16(data):
+                    self.crc_errors += 1
+                    self.respond(b"\x0b")  # Data rejected, CRC error
+                    return
+                self.blocks[self.next_block] = data
+                self.next_block += 1
+                if self.mode == "write":
+                    self.mode = "command"
+                    self.respond(b"\x05" + self.busy(SINGLE_BUSY_US))
+                else:
+                    self.respond(b"\x05" + self.busy(MULTI_BUSY_US))
+            return
+        if not self.command and byte & 0xC0 != 0x40:
+            return
+        self.command.append(byte)
+        if len(self.command) == 6:
+            arg = int.from_bytes(self.command[1:5], "big")
+            self.execute(self.command[0] & 0x3F, arg)
+            self.command = bytearray()
+
+    def execute(self, cmd, arg):
+        app = self.app_command
+        self.app_command = False
+        if cmd == 0:
+            self.respond(b"\xff\x01")
+        elif cmd == 8:
+            self.respond(b"\xff\x01\x00\x00\x01\xaa")
+        elif cmd == 58:
+            self.respond(b"\xff\x00\xc0\xff\x80\x00")
+        elif cmd == 55:
+            self.app_command = True
+            self.respond(b"\xff\x00")
+        elif cmd == 41 and app:
+            self.respond(b"\xff\x00")
+        elif cmd == 23 and app:
+            self.erase_count = arg
+            self.respond(b"\xff\x00")
+        elif cmd == 9:
+            csd = bytearray(16)
+            csd[0] = 0x40
+            csd[8], csd[9] = 0x3B, 0x37
+            self.respond(b"\xff\x00\xff\xfe" + csd + b"\xff\xff")
+        elif cmd == 16:
+            self.respond(b"\xff\x00")
+        elif cmd == 59:
+            self.crc = bool(arg & 1)
+            self.respond(b"\xff\x00")
+        elif cmd in (17, 18):
+            self.out = bytearray(b"\xff\x00")
+            self.position = 0
+            self.next_block = arg
+            self.queue_block()
+            if cmd == 18:
+                self.mode = "read"
+        elif cmd == 12:
+            self.mode = "command"
+            self.out = bytearray(b"\xff\x00")
+            self.position = 0
+        elif cmd in (24, 25):
+            self.next_block = arg
+            self.mode = "write" if cmd == 24 else "write_multiple"
+            self.data = bytearray()
+            self.respond(b"\xff\x00")
+        else:
+            self.respond(b"\xff\x04")  # Illegal command
+
+
+class ChipSelect:
+    """A digitalio.DigitalInOut stand-in."""
+
+    value = True
+
+    def switch_to_output(self, value=False):
+        self.value = value
+
+
+def fat_appends(card, device):
+    """Replay the FAT write pattern of a growing log file on device. Returns
+    the bus time of every filesystem access, in microseconds."""
+    sector = bytearray(512)
+    metadata = bytearray(512)
+    latencies = []
+
+    def timed(operation, block, buf):
+        before = card.bus_us()
+        if operation(block, buf):
+            raise OSError("SD operation failed")
+        latencies.append(card.bus_us() - before)
+
+    for i in range(APPENDS):
+        offset = i * RECORD_SIZE
+        block = DATA_BLOCK + offset // 512
+        position = offset % 512
+        sector[position : position + RECORD_SIZE] = bytes((i & 0xFF,)) * RECORD_SIZE
+        if offset % (CLUSTER_BLOCKS * 512) == 0:
+            # A new cluster: link it in both FAT copies
+            timed(device.readblocks, FAT_BLOCK, metadata)
+            timed(device.writeblocks, FAT_BLOCK, metadata)
+            timed(device.writeblocks, FAT_COPY_BLOCK, metadata)
+        timed(device.writeblocks, block, sector)
+        if (i + 1) % SYNC_EVERY == 0:
+            # Update the file size in the directory entry
+            timed(device.readblocks, DIR_BLOCK, metadata)
+            timed(device.writeblocks, DIR_BLOCK, metadata)
+    if hasattr(device, "sync"):
+        before = card.bus_us()
+        device.sync()
+        latencies.append(card.bus_us() - before)
+    return latencies
+
+
+def report(name, card, latencies, cpu):
+    total = sum(latencies)
+    written = APPENDS * RECORD_SIZE
+    ordered = sorted(latencies)
+    print(
+        "%-14s %6.3f MB/s  mean %6.0f us  p99 %6.0f us  max %6.0f us"
+        "  %4d transactions  %.1f s host CPU"
+        % (
+            name,
+            written / total,
+            total / len(latencies),
+            ordered[len(ordered) * 99 // 100],
+            ordered[-1],
+            card.transactions,
+            cpu,
+        )
+    )
+
+
+print(
+    "%d appends of %d bytes, %.1f MHz SPI" % (APPENDS, RECORD_SIZE, BAUDRATE / 1e6)
+)
+for label in ("SDCard", "BufferedSDCard"):
+    sim = SimulatedCard()
+    sd = adafruit_sdcard.SDCard(sim, ChipSelect(), baudrate=BAUDRATE)
+    dev = sd if label == "SDCard" else adafruit_sdcard.BufferedSDCard(sd, 16, 4)
+    sim.bytes = sim.transactions = 0
+    start = time.monotonic()
+    result = fat_appends(sim, dev)
+    report(label, sim, result, time.monotonic() - start)
+    expected = bytes(((APPENDS - 1) & 0xFF,)) * RECORD_SIZE
+    last = DATA_BLOCK + (APPENDS * RECORD_SIZE - 1) // 512
+    assert sim.blocks[last][-RECORD_SIZE:] == expected, "data did not reach the card"
@@ -0,0 +1,69 @@
+# CPU cost of the CRCs in adafruit_sdcard, per 512 byte block and per command.
+# Runs on the board or any computer. CRC7 protects every command: the old
+# loop over a sliced copy of the command is timed against the unrolled
+# calculate_crc. CRC16 protects data blocks when SDCard(crc=True): the table
+# fallback CircuitPython uses is timed against binascii.crc_hqx where the
+# firmware has it. crc16_blocks, for checking whole images, is also timed
+# with use_numpy where NumPy is installed. With CRC off, the default, a block
+# costs no CRC work at all.
+import time
+import adafruit_sdcard
+
+BLOCKS = 64
+IMAGE_BLOCKS = 2048
+COMMANDS = 2000
+
+block = bytearray(512)
+for i in range(512):
+    block[i] = (i * 7 + 3) & 0xFF
+image = bytes(block) * IMAGE_BLOCKS
+command = bytearray(b"\x51\x00\x00\x10\x00\xff")
+
+
+def old_calculate_crc(message):
+    crc = 0
+    for i in range(0, 5):
+        crc = adafruit_sdcard.CRC_TABLE[(crc << 1) ^ message[i]]
+    return (crc << 1) | 1
+
+
+def per_call_us(function, argument, count):
+    start = time.monotonic()
+    for _ in range(count):
+        function(argument)
+    return (time.monotonic() - start) * 1e6 / count
+
+
+print(
+    "CRC7 per command: before %.1f us, after %.1f us"
+    % (
+        per_call_us(lambda buf: old_calculate_crc(buf[:-1]), command, COMMANDS),
+        per_call_us(adafruit_sdcard.calculate_crc, command, COMMANDS),
+    )
+)
+
+if adafruit_sdcard.crc_hqx is not None:
+    print(
+        "CRC16 per block, crc_hqx:       %8.1f us"
+        % per_call_us(adafruit_sdcard.calculate_crc16, block, BLOCKS * 100)
+    )
+crc_hqx = adafruit_sdcard.crc_hqx
+adafruit_sdcard.crc_hqx = None  # Force the table used without it
+print(
+    "CRC16 per block, table:         %8.1f us"
+    % per_call_us(adafruit_sdcard.calculate_crc16, block, BLOCKS)
+)
+adafruit_sdcard.crc_hqx = crc_hqx
+try:
+    import numpy  # pylint: disable=unused-import
+
+    start = time.monotonic()
+    crcs = adafruit_sdcard.crc16_blocks(image, use_numpy=True)
+    elapsed = time.monotonic() - start
+    assert list(crcs) == list(adafruit_sdcard.crc16_blocks(image))
+    print(
+        "CRC16 per block, NumPy batch:   %8.1f us (%d block image)"
+        % (elapsed * 1e6 / IMAGE_BLOCKS, IMAGE_BLOCKS)
+    )
+except ImportError:
+    pass
@@ -0,0 +1,61 @@
+# Throughput of the TinyLoRa AES-128 engine, in blocks per second, and the
+# cost of the crypto in one uplink frame. Before timing anything, the engine is
+# checked against the FIPS-197 block vector, the RFC 4493 AES-CMAC vectors and
+# a LoRaWAN data uplink (payload "test", FCnt 2) with known ciphertext and MIC.
+import time
+from adafruit_tinylora import adafruit_tinylora_encryption as encryption
+
+BLOCKS = 500
+FRAMES = 100
+PAYLOAD = 48
+
+block = bytearray.fromhex("00112233445566778899aabbccddeeff")
+encryption.encrypt_block(block, encryption.key_schedule(bytes(range(16))))
+assert block == bytes.fromhex("69c4e0d86a7b0430d8cdb78070b4c55a"), "FIPS-197"
+
+key = bytes.fromhex("2b7e151628aed2a6abf7158809cf4f3c")
+message = bytes.fromhex(
+    "6bc1bee22e409f96e93d7e117393172aae2d8a571e03ac9c9eb76fac45af8e51"
+    "30c81c46a35ce411e5fbc1191a0a52eff69f2445df4f9b17ad2b417be66c3710"
+)
+for length, mac in (
+    (0, "bb1d6929e95937287fa37d129b756746"),
+    (16, "070a16b46b4d4144f79bdd9dd04a287c"),
+    (40, "dfa66747de9ae63030ca32611497c827"),
+    (64, "51f0bebf7e3b9d92fc49741779363cfe"),
+):
+    assert encryption.cmac(key, message[:length]) == bytes.fromhex(mac), "RFC 4493"
+
+network_key = bytearray.fromhex("44024241ed4ce9a68c6a8bc055233fd3")
+app_key = bytearray.fromhex("ec925802ae430ca77fd3dd73cb2cc588")
+device_address = bytearray.fromhex("49be7df1")
+aes = encryption.AES(device_address, app_key, network_key, 2)
+assert aes.encrypt(bytearray(b"test")) == bytes.fromhex("95437876"), "payload"
+frame = bytearray.fromhex("40f17dbe490002000195437876")
+mic = aes.calculate_mic(frame, len(frame), bytearray(4))
+assert mic == bytes.fromhex("2b11ff0d"), "MIC"
+print("FIPS-197, RFC 4493 and LoRaWAN vectors pass")
+
+schedule = encryption.key_schedule(app_key)
+start = time.monotonic()
+for _ in range(BLOCKS):
+    encryption.encrypt_block(block, schedule)
+elapsed = time.monotonic() - start
+print("encrypt_block: %8.0f blocks/s" % (BLOCKS / elapsed))
+
+payload = bytearray(PAYLOAD)
+packet = bytearray(9 + PAYLOAD)
+start = time.monotonic()
+for counter in range(FRAMES):
+    # As TinyLoRa.send_data does it: a new AES per frame, the payload
+    # encrypted in counter mode, then the MIC over the whole packet
+    aes = encryption.AES(device_address, app_key, network_key, counter)
+    aes.encrypt(payload)
+    packet[9:] = payload
+    aes.calculate_mic(packet, len(packet), bytearray(4))
+elapsed = time.monotonic() - start
+blocks = (PAYLOAD + 15) // 16 + (len(packet) + 16 + 15) // 16
+print(
+    "%d byte uplink:  %8.2f ms/frame, %8.0f blocks/s"
+    % (PAYLOAD, elapsed * 1000 / FRAMES, blocks * FRAMES / elapsed)
+)
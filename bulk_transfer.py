@@ -0,0 +1,453 @@
+"""
+`bulk_transfer`
+====================================================
+
+Selective-repeat file transfer over an `adafruit_rfm` radio.
+
+The file is cut into numbered chunks. :class:`BulkSender` sends a window of
+chunks back to back and polls for an ACK only on the last one. The ACK from
+:class:`BulkReceiver` carries the first missing chunk and a bitmap of the 64
+chunks from there, so only lost chunks are sent again. Retries are
+per-window, not per-packet as in ``asyncio_send_with_ack``. A sender that gives
+up can call :meth:`BulkSender.send` again later with the same transfer id, and
+the receiver's bitmap makes it resume where the link dropped.
+
+RadioHead header fields: ``identifier`` is the transfer id, and the low four
+bits of ``flags`` hold the packet type and the poll bit. Payloads, little
+endian::
+
+    OFFER  <IHH   file size, chunk size, chunk count
+    DATA   <H     chunk index, then the chunk
+    POLL   <H     chunk count; asks for an ACK
+    ACK    <HH8s  first missing chunk, chunks received, bitmap from there
+
+:class:`LoopbackLink` connects a sender and a receiver in one process over a
+simulated lossy link, to measure throughput without radios.
+"""
+
+import asyncio
+import struct
+import time
+
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
+
+try:
+    from typing import Callable, Optional
+except ImportError:
+    pass
+
+TYPE_OFFER = 0x01
+TYPE_DATA = 0x02
+TYPE_POLL = 0x03
+TYPE_ACK = 0x04
+FLAG_POLL = 0x08
+_TYPE_MASK = 0x07
+
+CHUNK_SIZE = 250
+ACK_BITMAP_BYTES = 8
+ACK_SPAN = ACK_BITMAP_BYTES * 8
+
+_OFFER_FORMAT = "<IHH"
+_ACK_FORMAT = "<HH8s"
+
+
+def _chunk_count(size: int, chunk_size: int) -> int:
+    return (size + chunk_size - 1) // chunk_size
+
+
+class BulkSender:  # pylint: disable=too-many-instance-attributes
+    """Sends a file to a `BulkReceiver`.
+
+    :param radio: An `adafruit_rfm` radio in RadioHead mode.
+    :param int destination: Node address of the receiver.
+    :param int window: Chunks sent per ACK, at most 64.
+    :param int chunk_size: Payload bytes per chunk, at most the radio's
+        ``max_packet_length`` minus 2.
+    :param float ack_timeout: Seconds to wait for an ACK before polling again.
+    :param int retries: Polls without an answer before :meth:`send` gives up.
+    :param clock: Callable returning the current ``ticks_ms`` value, such as
+        `LoopbackLink.ticks_ms` for a simulated link.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        radio,
+        destination: int,
+        *,
+        window: int = 16,
+        chunk_size: int = CHUNK_SIZE,
+        ack_timeout: float = 1.0,
+        retries: int = 5,
+        clock: Callable[[], int] = ticks_ms,
+    ) -> None:
+        if not 0 < window <= ACK_SPAN:
+            raise ValueError("window must be between 1 and %d" % ACK_SPAN)
+        if not 0 < chunk_size <= radio.max_packet_length - 2:
+            raise ValueError("chunk_size does not fit the radio's packets")
+        self.radio = radio
+        self.destination = destination
+        self.window = window
+        self.chunk_size = chunk_size
+        self.ack_timeout = ack_timeout
+        self.retries = retries
+        self._clock = clock
+        self._packet = bytearray(2 + chunk_size)
+        self._view = memoryview(self._packet)
+        self._acked = bytearray(0)
+        self.count = 0
+        self.acked = 0
+        self.packets = 0
+        self.resent = 0
+        self.timeouts = 0
+        self.send_failures = 0
+
+    def _is_acked(self, index: int) -> bool:
+        return self._acked[index >> 3] & (1 << (index & 7))
+
+    async def _send(self, data, transfer_id: int, flags: int) -> bool:
+        self.packets += 1
+        if await self.radio.asyncio_send(
+            data,
+            keep_listening=True,
+            destination=self.destination,
+            identifier=transfer_id,
+            flags=flags,
+        ):
+            return True
+        self.send_failures += 1
+        return False
+
+    async def _wait_ack(self, transfer_id: int) -> Optional[int]:
+        """Wait for an ACK of this transfer and merge its bitmap. Returns the
+        receiver's first missing chunk, or None on timeout."""
+        radio = self.radio
+        clock = self._clock
+        # One deadline for the whole wait, so other traffic cannot extend it
+        deadline = ticks_add(clock(), int(self.ack_timeout * 1000))
+        while True:
+            remaining = ticks_diff(deadline, clock())
+            if remaining <= 0:
+                return None
+            packet = await radio.asyncio_receive(
+                with_header=True, timeout=remaining / 1000
+            )
+            if packet is None:
+                return None
+            if (
+                packet[2] != transfer_id
+                or packet[3] & _TYPE_MASK != TYPE_ACK
+                or len(packet) < 4 + struct.calcsize(_ACK_FORMAT)
+            ):
+                continue
+            base, received, bitmap = struct.unpack_from(_ACK_FORMAT, packet, 4)
+            # Everything before the first missing chunk has arrived.
+            for index in range(min(base, self.count)):
+                self._acked[index >> 3] |= 1 << (index & 7)
+            for bit in range(ACK_SPAN):
+                index = base + bit
+                if index < self.count and bitmap[bit >> 3] & (1 << (bit & 7)):
+                    self._acked[index >> 3] |= 1 << (index & 7)
+            self.acked = received
+            return base
+
+    async def _request_ack(self, data, transfer_id: int, flags: int) -> Optional[int]:
+        """Send ``data`` asking for an ACK. On a timeout an OFFER is sent
+        again, while a chunk is replaced by a short POLL."""
+        for _ in range(self.retries + 1):
+            # A failed transmit is retried at once, without waiting for an ACK
+            if await self._send(data, transfer_id, flags | FLAG_POLL):
+                base = await self._wait_ack(transfer_id)
+                if base is not None:
+                    return base
+                self.timeouts += 1
+            if flags != TYPE_OFFER:
+                data = struct.pack("<H", self.count)
+                flags = TYPE_POLL
+        return None
+
+    async def send(self, path: str, transfer_id: int = 1) -> bool:
+        """Send the file at ``path``. Returns True once the receiver has every
+        chunk, or False if it stopped answering."""
+        with open(path, "rb") as source:
+            source.seek(0, 2)
+            size = source.tell()
+            count = _chunk_count(size, self.chunk_size)
+            if count > 0xFFFF:
+                raise ValueError("File too large for 16 bit chunk numbers")
+            if count != self.count or len(self._acked) != (count + 7) // 8:
+                self.count = count
+                self._acked = bytearray((count + 7) // 8)
+            offer = struct.pack(_OFFER_FORMAT, size, self.chunk_size, count)
+            base = await self._request_ack(offer, transfer_id, TYPE_OFFER)
+            sent = bytearray((count + 7) // 8)
+            view = self._view
+            while base is not None and base < count:
+                burst = []
+                index = base
+                while len(burst) < self.window and index < min(count, base + ACK_SPAN):
+                    if not self._is_acked(index):
+                        burst.append(index)
+                    index += 1
+                for position, index in enumerate(burst):
+                    source.seek(index * self.chunk_size)
+                    length = source.readinto(view[2 : 2 + self.chunk_size])
+                    struct.pack_into("<H", self._packet, 0, index)
+                    if sent[index >> 3] & (1 << (index & 7)):
+                        self.resent += 1
+                    sent[index >> 3] |= 1 << (index & 7)
+                    if position == len(burst) - 1:
+                        base = await self._request_ack(
+                            view[: 2 + length], transfer_id, TYPE_DATA
+                        )
+                    elif not await self._send(
+                        view[: 2 + length], transfer_id, TYPE_DATA
+                    ):
+                        # Ask where the receiver is rather than send the rest
+                        # of the window after a failed transmit.
+                        base = await self._request_ack(
+                            struct.pack("<H", count), transfer_id, TYPE_POLL
+                        )
+                        break
+            return base is not None and base >= count
+
+
+class BulkReceiver:  # pylint: disable=too-many-instance-attributes
+    """Receives files from a `BulkSender`.
+
+    :param radio: An `adafruit_rfm` radio in RadioHead mode.
+    :param queue: Optional running `adafruit_rfm.rfm_common.PacketQueue` on
+        ``radio``, so packets in a burst are not lost while an ACK is sent.
+    """
+
+    def __init__(self, radio, queue=None) -> None:
+        self.radio = radio
+        self.queue = queue
+        self._ack = bytearray(struct.calcsize(_ACK_FORMAT))
+        self._file = None
+        self._received = bytearray(0)
+        self.transfer_id = None
+        self.size = 0
+        self.chunk_size = 0
+        self.count = 0
+        self.received = 0
+        self.duplicates = 0
+
+    @property
+    def complete(self) -> bool:
+        """True when every chunk of the current transfer has arrived."""
+        return self.transfer_id is not None and self.received == self.count
+
+    def _has(self, index: int) -> bool:
+        return self._received[index >> 3] & (1 << (index & 7))
+
+    async def _next_packet(self, timeout: float):
+        """Return ``(header, payload)`` of the next packet or None."""
+        if self.queue is None:
+            packet = await self.radio.asyncio_receive(with_header=True, timeout=timeout)
+            if packet is None:
+                return None
+            view = memoryview(packet)
+            return view[:4], view[4:]
+        waited = 0.0
+        poll = self.radio.timeout_poll or 0.001
+        while True:
+            packet = self.queue.get_nowait()
+            if packet is not None:
+                return packet.header, packet.payload
+            if waited >= timeout:
+                return None
+            await asyncio.sleep(poll)
+            waited += poll
+
+    async def _send_ack(self, source: int) -> None:
+        base = 0
+        while base < self.count and self._has(base):
+            base += 1
+        ack = self._ack
+        for byte in range(ACK_BITMAP_BYTES):
+            value = 0
+            for bit in range(8):
+                index = base + byte * 8 + bit
+                if index < self.count and self._has(index):
+                    value |= 1 << bit
+            ack[4 + byte] = value
+        struct.pack_into("<HH", ack, 0, base, self.received)
+        await self.radio.asyncio_send(
+            ack,
+            keep_listening=True,
+            destination=source,
+            identifier=self.transfer_id,
+            flags=TYPE_ACK,
+        )
+
+    def _start(self, path: str, transfer_id: int, payload) -> None:
+        size, chunk_size, count = struct.unpack_from(_OFFER_FORMAT, payload)
+        if (
+            transfer_id == self.transfer_id
+            and (size, chunk_size, count) == (self.size, self.chunk_size, self.count)
+        ):
+            return  # Resume: keep what has arrived.
+        self.close()
+        self.transfer_id = transfer_id
+        self.size = size
+        self.chunk_size = chunk_size
+        self.count = count
+        self.received = 0
+        self._received = bytearray((count + 7) // 8)
+        self._file = open(path, "wb")  # pylint: disable=consider-using-with
+
+    async def receive(self, path: str, timeout: float = 30.0, linger: float = 2.0) -> bool:
+        """Receive one file into ``path``. Returns True when it is complete, or
+        False after ``timeout`` seconds without a packet. Once complete, keeps
+        answering polls for ``linger`` seconds in case the last ACK was lost."""
+        while True:
+            wait = linger if self.complete else timeout
+            packet = await self._next_packet(wait)
+            if packet is None:
+                done = self.complete
+                if done:
+                    self.close()
+                return done
+            header, payload = packet
+            transfer_id = header[2]
+            kind = header[3] & _TYPE_MASK
+            if kind == TYPE_OFFER and len(payload) >= 8:
+                self._start(path, transfer_id, payload)
+            elif transfer_id != self.transfer_id:
+                continue
+            elif kind == TYPE_DATA and len(payload) > 2:
+                index = payload[0] | payload[1] << 8
+                if index >= self.count:
+                    continue
+                if self._has(index):
+                    self.duplicates += 1
+                elif self._file is not None:
+                    self._file.seek(index * self.chunk_size)
+                    self._file.write(payload[2:])
+                    self._received[index >> 3] |= 1 << (index & 7)
+                    self.received += 1
+            if header[3] & FLAG_POLL or kind == TYPE_POLL:
+                await self._send_ack(header[1])
+
+    def close(self) -> None:
+        """Close the file being written."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class LoopbackRadio:  # pylint: disable=too-many-instance-attributes
+    """One end of a `LoopbackLink`, with the asyncio send and receive API of
+    an `adafruit_rfm` radio in RadioHead mode."""
+
+    def __init__(self, link: "LoopbackLink", node: int) -> None:
+        self._link = link
+        self._inbox = []
+        self.peer = None
+        self.node = node
+        self.destination = 0xFF
+        self.identifier = 0
+        self.flags = 0
+        self.radiohead = True
+        self.max_packet_length = 252
+        self.timeout_poll = 0.001
+        self.last_rssi = 0.0
+        self.last_snr = 0.0
+
+    async def asyncio_send(  # pylint: disable=too-many-arguments,unused-argument
+        self,
+        data,
+        *,
+        keep_listening: bool = False,
+        destination: Optional[int] = None,
+        node: Optional[int] = None,
+        identifier: Optional[int] = None,
+        flags: Optional[int] = None,
+    ) -> bool:
+        """Deliver the packet to the peer unless the link loses it, after
+        its scaled airtime."""
+        assert 0 < len(data) <= self.max_packet_length
+        header = bytes(
+            (
+                self.destination if destination is None else destination,
+                self.node if node is None else node,
+                self.identifier if identifier is None else identifier,
+                self.flags if flags is None else flags,
+            )
+        )
+        link = self._link
+        await asyncio.sleep(link.airtime(len(data) + 4) / 1000 * link.time_scale)
+        link.packets += 1
+        if link.rng.random() < link.loss:
+            link.lost += 1
+        else:
+            self.peer._inbox.append(header + bytes(data))  # pylint: disable=protected-access
+        return True
+
+    async def asyncio_receive(
+        self,
+        *,
+        keep_listening: bool = True,  # pylint: disable=unused-argument
+        with_header: bool = False,
+        timeout: Optional[float] = None,
+    ) -> Optional[bytearray]:
+        """Wait up to ``timeout`` link seconds for a packet."""
+        limit = (0.5 if timeout is None else timeout) * self._link.time_scale
+        waited = 0.0
+        step = max(limit / 50, 0.0005)
+        while not self._inbox:
+            if waited >= limit:
+                return None
+            await asyncio.sleep(step)
+            waited += step
+        packet = bytearray(self._inbox.pop(0))
+        return packet if with_header else packet[4:]
+
+
+class LoopbackLink:  # pylint: disable=too-many-instance-attributes
+    """Two `LoopbackRadio` ends joined by a link that loses packets at random.
+
+    Every send waits for the LoRa airtime of the packet times ``time_scale``,
+    and receive timeouts are scaled the same way, so a transfer runs
+    ``1 / time_scale`` times faster than on air.
+
+    :param float loss: Probability that a packet is lost.
+    :param int spreading_factor: LoRa setting used for the airtime.
+    :param int bandwidth: LoRa bandwidth in Hz.
+    :param float time_scale: Wall-clock seconds per link second.
+    :param int seed: Seed for the loss pattern.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        loss: float = 0.1,
+        *,
+        spreading_factor: int = 7,
+        bandwidth: int = 125000,
+        time_scale: float = 0.01,
+        seed: int = 1,
+    ) -> None:
+        import random  # pylint: disable=import-outside-toplevel
+
+        self.loss = loss
+        self.spreading_factor = spreading_factor
+        self.bandwidth = bandwidth
+        self.time_scale = time_scale
+        self.rng = random.Random(seed)
+        self.packets = 0
+        self.lost = 0
+        self.a = LoopbackRadio(self, 1)
+        self.b = LoopbackRadio(self, 2)
+        self.a.peer = self.b
+        self.b.peer = self.a
+
+    def ticks_ms(self) -> int:
+        """Link time in milliseconds, as a ``ticks_ms`` value, to pass to
+        `BulkSender` as its ``clock``."""
+        return int(time.monotonic() * 1000 / self.time_scale) & ((1 << 29) - 1)
+
+    def airtime(self, length: int) -> float:
+        """Airtime in milliseconds of a packet of ``length`` bytes."""
+        from telemetry import time_on_air_ms  # pylint: disable=import-outside-toplevel
+
+        return time_on_air_ms(length, self.spreading_factor, self.bandwidth)
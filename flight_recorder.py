@@ -0,0 +1,529 @@
+"""
+`flight_recorder`
+====================================================
+
+Binary flight-data recorder.
+
+Samples are packed as fixed-size 32 byte records into a RAM ring buffer that
+is allocated once up front, so logging a sample costs a few ``pack_into``
+calls and never touches storage. Whole 512 byte blocks are flushed to the sink
+in multi-block chunks from a separate asyncio task, off the sampling path. The
+sink is either an `adafruit_sdcard.SDCard` written with raw ``writeblocks``
+(one CMD25 per chunk) or an ordinary file.
+
+Log layout: one 512 byte header block, then data blocks of 16 records each.
+Each record is ``<IBBH6f``: the ``ticks_ms`` stamp, the record kind, the number
+of values used, a 16 bit sequence number and six float32 values. Kind 0 marks
+padding. :func:`read_records`, :func:`to_csv` and :func:`to_numpy` decode a log
+after the flight, and :func:`to_trace` turns it into a trace for
+`flight_state.replay`.
+
+`HashingSink` wraps any sink to hash the log into a Merkle tree of 4 KB chunks
+as it is written, so the root is ready the moment the log is closed.
+:func:`verify_log` checks a log against its tree file after the flight and
+names the corrupted chunks.
+"""
+
+import asyncio
+import struct
+from adafruit_hashlib import hmac
+from adafruit_hashlib.merkle import (
+    CHUNK_SIZE,
+    MerkleHash,
+    chunk_digests,
+    compare_leaves,
+    merkle_root,
+)
+
+try:
+    from typing import Iterator, List, Optional, Sequence, Tuple
+except ImportError:
+    pass
+
+BLOCK_SIZE = 512
+RECORD_SIZE = 32
+MAX_VALUES = 6
+
+RECORD_PADDING = 0
+RECORD_BARO = 1
+RECORD_IMU = 2
+RECORD_EVENT = 3
+RECORD_STATE = 4
+
+RECORD_NAMES = {
+    RECORD_BARO: "baro",
+    RECORD_IMU: "imu",
+    RECORD_EVENT: "event",
+    RECORD_STATE: "state",
+}
+
+_MAGIC = b"FLOG"
+_VERSION = 1
+_HEADER_FORMAT = "<4sBB"
+_RECORD_HEADER_FORMAT = "<IBBH"
+_RECORD_FORMAT = "<IBBH6f"
+_RECORD_HEADER_SIZE = 8
+
+# ticks_ms wraps at 2**29
+_TICKS_PERIOD = 1 << 29
+_TICKS_HALF = _TICKS_PERIOD // 2
+
+_TREE_MAGIC = b"FTRE"
+_TREE_VERSION = 1
+_TREE_HEADER_FORMAT = "<4sBBBxI"
+_TREE_HEADER_SIZE = 12
+
+
+class FileSink:
+    """Writes log blocks to a file.
+
+    :param str path: File to create, truncating any existing one.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "wb")  # pylint: disable=consider-using-with
+
+    def write_blocks(self, buf: memoryview) -> None:
+        """Append whole blocks and push them out of the file buffer."""
+        self._file.write(buf)
+        self._file.flush()
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+
+class SDCardSink:
+    """Writes log blocks straight to an SD card with ``writeblocks``.
+
+    Multi-block chunks go out as a single CMD25 transfer, with an ACMD23
+    pre-erase hint for the chunk. The log occupies
+    consecutive blocks from ``start_block``, outside of any filesystem, so pick
+    a region the card's filesystem does not use.
+
+    :param ~adafruit_sdcard.SDCard sdcard: The card to write to.
+    :param int start_block: The first block of the log.
+    """
+
+    def __init__(self, sdcard, start_block: int) -> None:
+        self._sdcard = sdcard
+        self.block = start_block
+
+    def write_blocks(self, buf: memoryview) -> None:
+        """Write whole blocks at the current position and advance it."""
+        if self._sdcard.writeblocks(self.block, buf, pre_erase=True):
+            raise OSError("SD card rejected write at block %d" % self.block)
+        self.block += len(buf) // BLOCK_SIZE
+
+    def close(self) -> None:
+        """Nothing to release; present for symmetry with `FileSink`."""
+
+
+def native_digestmod(name: str = "sha256"):
+    """Return a constructor for the firmware's built-in hash ``name``, for
+    `HashingSink`, or None if there is none. CircuitPython's ``hashlib`` only
+    has ``new()``, so the constructor wraps it.
+    """
+    try:
+        import hashlib  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    constructor = getattr(hashlib, name, None)
+    if constructor is None:
+
+        def constructor(data=b""):
+            return hashlib.new(name, data)
+
+    try:
+        constructor()
+    except (AttributeError, ValueError):
+        return None
+    return constructor
+
+
+class HashingSink:
+    """Passes log blocks on to another sink and hashes them into a Merkle tree
+    on the way, one leaf per ``chunk_size`` bytes of log.
+
+    The leaf digests go to ``tree_path`` as their chunks complete. On
+    :meth:`close` the last leaf, the root and, with a ``key``, an HMAC of the
+    root are appended, and :attr:`root` and :attr:`tag` are set.
+
+    `FlightRecorder.run` writes through :meth:`asyncio_write_blocks`, which
+    hashes ``slice_blocks`` blocks at a time and yields to the other tasks in
+    between, so the sampler is held up for one slice at most. In flight, use
+    the firmware's built-in hash from :func:`native_digestmod`: the pure Python
+    SHA-256 of `adafruit_hashlib` takes tens of milliseconds per block on a
+    microcontroller, and cannot keep up with a fast log.
+
+    Tree file layout: a 12 byte ``<4sBBBxI`` header (magic, version, digest
+    size, whether a tag follows the root, chunk size), the leaves, then the
+    root, the tag and the leaf count as ``<I``.
+
+    :param sink: The sink to write the log to.
+    :param str tree_path: File to write the tree to, truncating any existing one.
+    :param bytes key: Optional HMAC key that authenticates the root.
+    :param int chunk_size: Log bytes per leaf, a multiple of the block size.
+    :param digestmod: A hash name or constructor, SHA-256 by default.
+    :param int slice_blocks: Blocks hashed between yields to other tasks.
+    """
+
+    def __init__(
+        self,
+        sink,
+        tree_path: str,
+        *,
+        key: Optional[bytes] = None,
+        chunk_size: int = CHUNK_SIZE,
+        digestmod="sha256",
+        slice_blocks: int = 1,
+    ) -> None:
+        if chunk_size % BLOCK_SIZE:
+            raise ValueError("chunk_size must be a multiple of %d" % BLOCK_SIZE)
+        self._sink = sink
+        self._slice = slice_blocks * BLOCK_SIZE
+        self._key = key
+        self._digestmod = digestmod
+        self._tree_file = open(tree_path, "wb")  # pylint: disable=consider-using-with
+        self.tree = MerkleHash(chunk_size, digestmod, self._tree_file)
+        self.root = None
+        self.tag = None
+        self._tree_file.write(
+            struct.pack(
+                _TREE_HEADER_FORMAT,
+                _TREE_MAGIC,
+                _TREE_VERSION,
+                self.tree.digest_size,
+                key is not None,
+                chunk_size,
+            )
+        )
+
+    def write_blocks(self, buf: memoryview) -> None:
+        """Write whole blocks to the sink, then hash them."""
+        self._sink.write_blocks(buf)
+        chunks = self.tree.chunks
+        self.tree.update(buf)
+        if self.tree.chunks != chunks:
+            self._tree_file.flush()
+
+    async def asyncio_write_blocks(self, buf: memoryview) -> None:
+        """Write whole blocks to the sink, then hash them a slice at a time,
+        letting other tasks run after each slice."""
+        self._sink.write_blocks(buf)
+        chunks = self.tree.chunks
+        for offset in range(0, len(buf), self._slice):
+            self.tree.update(buf[offset : offset + self._slice])
+            await asyncio.sleep(0)
+        if self.tree.chunks != chunks:
+            self._tree_file.flush()
+
+    def close(self) -> None:
+        """Close the sink and finish the tree file."""
+        self._sink.close()
+        self.root = self.tree.finish()
+        self._tree_file.write(self.root)
+        if self._key is not None:
+            self.tag = hmac.digest(self._key, self.root, self._digestmod)
+            self._tree_file.write(self.tag)
+        self._tree_file.write(struct.pack("<I", self.tree.chunks))
+        self._tree_file.close()
+
+
+class FlightRecorder:  # pylint: disable=too-many-instance-attributes
+    """Packs records into a preallocated ring buffer and flushes it in chunks.
+
+    When the buffer is full, new records are dropped and counted in
+    :attr:`dropped` rather than blocking the sampler.
+
+    :param sink: A `FileSink`, `SDCardSink`, `HashingSink` or any object with
+        ``write_blocks(buf)`` and ``close()``.
+    :param int buffer_blocks: Ring buffer size in 512 byte blocks.
+    :param int chunk_blocks: Blocks to collect before :meth:`run` flushes them.
+    """
+
+    def __init__(self, sink, *, buffer_blocks: int = 32, chunk_blocks: int = 8) -> None:
+        if not 0 < chunk_blocks <= buffer_blocks:
+            raise ValueError("chunk_blocks must be between 1 and buffer_blocks")
+        self._sink = sink
+        self._buffer = bytearray(buffer_blocks * BLOCK_SIZE)
+        self._view = memoryview(self._buffer)
+        self._size = len(self._buffer)
+        self.chunk_blocks = chunk_blocks
+        # Running byte totals; ring offsets are taken modulo the buffer size.
+        self._logged = 0
+        self._flushed = 0
+        self._sequence = 0
+        self._running = False
+        self.records = 0
+        self.dropped = 0
+        header = bytearray(BLOCK_SIZE)
+        struct.pack_into(_HEADER_FORMAT, header, 0, _MAGIC, _VERSION, RECORD_SIZE)
+        sink.write_blocks(memoryview(header))
+
+    def log(self, kind: int, ticks: int, values: Sequence[float] = ()) -> bool:
+        """Append a record of up to six values. Returns False if it was dropped
+        because the buffer is full."""
+        if self._logged - self._flushed + RECORD_SIZE > self._size:
+            self.dropped += 1
+            return False
+        buf = self._buffer
+        offset = self._logged % self._size
+        count = min(len(values), MAX_VALUES)
+        struct.pack_into(
+            _RECORD_HEADER_FORMAT,
+            buf,
+            offset,
+            ticks & 0xFFFFFFFF,
+            kind,
+            count,
+            self._sequence,
+        )
+        offset += _RECORD_HEADER_SIZE
+        for i in range(MAX_VALUES):
+            struct.pack_into("<f", buf, offset, values[i] if i < count else 0.0)
+            offset += 4
+        self._sequence = (self._sequence + 1) & 0xFFFF
+        self._logged += RECORD_SIZE
+        self.records += 1
+        return True
+
+    @property
+    def pending_blocks(self) -> int:
+        """Complete blocks waiting to be flushed."""
+        return (self._logged - self._flushed) // BLOCK_SIZE
+
+    def _pad(self) -> None:
+        """Pad the last partial block with padding records."""
+        partial = self._logged % BLOCK_SIZE
+        if partial:
+            offset = self._logged % self._size
+            pad = BLOCK_SIZE - partial
+            self._buffer[offset : offset + pad] = bytes(pad)
+            self._logged += pad
+
+    def _next_run(self, blocks: int) -> memoryview:
+        """The longest run of pending blocks that does not cross the ring wrap."""
+        offset = self._flushed % self._size
+        run = min(blocks, (self._size - offset) // BLOCK_SIZE)
+        return self._view[offset : offset + run * BLOCK_SIZE]
+
+    def flush(self, final: bool = False) -> int:
+        """Write every complete block to the sink, in as few transfers as the
+        ring wrap allows. With ``final`` the last partial block is padded and
+        written too. Returns the number of blocks written."""
+        if final:
+            self._pad()
+        blocks = self.pending_blocks
+        written = blocks
+        while blocks:
+            run = self._next_run(blocks)
+            self._sink.write_blocks(run)
+            self._flushed += len(run)
+            blocks -= len(run) // BLOCK_SIZE
+        return written
+
+    async def asyncio_flush(self, final: bool = False) -> int:
+        """Like :meth:`flush`, but awaits the sink's ``asyncio_write_blocks``
+        where it has one, as `HashingSink` does, so other tasks keep running
+        while it works. The blocks stay reserved in the ring until the sink
+        returns."""
+        write = getattr(self._sink, "asyncio_write_blocks", None)
+        if write is None:
+            return self.flush(final)
+        if final:
+            self._pad()
+        blocks = self.pending_blocks
+        written = blocks
+        while blocks:
+            run = self._next_run(blocks)
+            await write(run)
+            self._flushed += len(run)
+            blocks -= len(run) // BLOCK_SIZE
+        return written
+
+    async def run(self, interval: float = 0.02) -> None:
+        """Flush each time a chunk has filled, until :meth:`stop` is called,
+        then flush what is left."""
+        self._running = True
+        while self._running:
+            if self.pending_blocks >= self.chunk_blocks:
+                await self.asyncio_flush()
+            await asyncio.sleep(interval)
+        await self.asyncio_flush(final=True)
+
+    def stop(self) -> None:
+        """Make :meth:`run` write the remaining records and return."""
+        self._running = False
+
+    def close(self) -> None:
+        """Flush everything and close the sink."""
+        self.flush(final=True)
+        self._sink.close()
+
+
+def read_records(path: str) -> Iterator[Tuple[int, int, int, Tuple[float, ...]]]:
+    """Yield ``(ticks, kind, sequence, values)`` for each record in a log file,
+    skipping padding."""
+    with open(path, "rb") as log_file:
+        header = log_file.read(BLOCK_SIZE)
+        magic, version, record_size = struct.unpack_from(_HEADER_FORMAT, header)
+        if magic != _MAGIC or version != _VERSION or record_size != RECORD_SIZE:
+            raise ValueError("%s is not a flight recorder log" % path)
+        while True:
+            block = log_file.read(BLOCK_SIZE)
+            if len(block) < BLOCK_SIZE:
+                return
+            for offset in range(0, BLOCK_SIZE, RECORD_SIZE):
+                record = struct.unpack_from(_RECORD_FORMAT, block, offset)
+                if record[1] == RECORD_PADDING:
+                    continue
+                yield (record[0], record[1], record[3], record[4 : 4 + record[2]])
+
+
+def verify_log(
+    path: str,
+    tree_path: str,
+    key: Optional[bytes] = None,
+    digestmod="sha256",
+    chunks: Optional[Sequence[int]] = None,
+) -> List[int]:
+    """Check a log against the tree file a `HashingSink` wrote beside it.
+    Returns the indices of the chunks that differ; chunk ``i`` starts at byte
+    ``i * chunk_size`` of the log. An empty list means the log is intact.
+
+    Raises `ValueError` if the leaves in the tree file do not hash to its
+    root, or, when a ``key`` is given, if the root's HMAC does not match. A
+    tree file left without its trailer by a lost flight is still usable: its
+    complete leaves are compared, the root is not checked, and the chunks
+    logged after the last leaf are reported as well.
+
+    :param str path: The log file.
+    :param str tree_path: Its tree file.
+    :param bytes key: The HMAC key given to the `HashingSink`, if any.
+    :param digestmod: The hash the `HashingSink` used.
+    :param chunks: Only read and hash these chunks, such as the ones a decoder
+        is about to use, instead of the whole log.
+    """
+    with open(tree_path, "rb") as tree_file:
+        tree = tree_file.read()
+    magic, version, digest_size, tagged, chunk_size = struct.unpack_from(
+        _TREE_HEADER_FORMAT, tree
+    )
+    if magic != _TREE_MAGIC or version != _TREE_VERSION:
+        raise ValueError("%s is not a flight log tree" % tree_path)
+    body = len(tree) - _TREE_HEADER_SIZE
+    trailer = digest_size * (2 if tagged else 1) + 4
+    count = struct.unpack_from("<I", tree, len(tree) - 4)[0] if body >= 4 else -1
+    closed = body == count * digest_size + trailer
+    if not closed:
+        count = body // digest_size
+    leaves = [
+        tree[offset : offset + digest_size]
+        for offset in range(
+            _TREE_HEADER_SIZE, _TREE_HEADER_SIZE + count * digest_size, digest_size
+        )
+    ]
+    if closed:
+        offset = _TREE_HEADER_SIZE + count * digest_size
+        root = tree[offset : offset + digest_size]
+        if merkle_root(leaves, digestmod) != root:
+            raise ValueError("%s does not match its root" % tree_path)
+        if key is not None:
+            if not tagged:
+                raise ValueError("%s has no HMAC" % tree_path)
+            tag = tree[offset + digest_size : offset + 2 * digest_size]
+            if not hmac.compare_digest(hmac.digest(key, root, digestmod), tag):
+                raise ValueError("%s failed HMAC authentication" % tree_path)
+    with open(path, "rb") as log_file:
+        if chunks is None:
+            return compare_leaves(
+                leaves, chunk_digests(log_file, chunk_size, digestmod)
+            )
+        buffer = bytearray(chunk_size)
+        mismatched = []
+        for index in chunks:
+            log_file.seek(index * chunk_size)
+            leaf = next(chunk_digests(log_file, chunk_size, digestmod, buffer), None)
+            if leaf is None or index >= len(leaves) or leaf != leaves[index]:
+                mismatched.append(index)
+        return mismatched
+
+
+def to_csv(path: str, csv_path: str, names: Optional[dict] = None) -> int:
+    """Write a log out as CSV with one row per record. Returns the row count."""
+    if names is None:
+        names = RECORD_NAMES
+    rows = 0
+    columns = ",".join("v%d" % i for i in range(MAX_VALUES))
+    with open(csv_path, "w") as csv_file:
+        csv_file.write("ticks_ms,kind,sequence,%s\n" % columns)
+        for ticks, kind, sequence, values in read_records(path):
+            fields = [repr(value) for value in values]
+            fields.extend([""] * (MAX_VALUES - len(values)))
+            csv_file.write(
+                "%d,%s,%d,%s\n"
+                % (ticks, names.get(kind, kind), sequence, ",".join(fields))
+            )
+            rows += 1
+    return rows
+
+
+def to_trace(path: str, trace_path: str, step_ms: int = 5) -> int:
+    """Write the altimeter and IMU records of a log as a ``t_ms,altitude,ax,ay,az``
+    CSV trace for `flight_state.load_trace` and `flight_state.replay`. The two
+    record kinds are merged onto a grid of ``step_ms`` from the first record
+    that has both, holding each sensor's latest reading, as `TraceSensor`
+    does, so the rows line up with the rates the replay samples at. Ticks are
+    unwrapped; a record stamped before one already read, such as an awaited
+    altimeter read, is placed at the latest time seen. Returns the row count."""
+    rows = 0
+    start = None
+    elapsed = 0
+    previous = None
+    altitude = None
+    acceleration = None
+    with open(trace_path, "w") as trace_file:
+        trace_file.write("t_ms,altitude,ax,ay,az\n")
+        for ticks, kind, _, values in read_records(path):
+            if previous is None:
+                previous = ticks
+            # Signed, as ticks_diff() does, so a slightly older stamp is not
+            # taken for a wrap
+            step = (ticks - previous + _TICKS_HALF) % _TICKS_PERIOD - _TICKS_HALF
+            if step > 0:
+                elapsed += step
+                previous = ticks
+            if kind not in (RECORD_BARO, RECORD_IMU):
+                continue
+            while start is not None and start + rows * step_ms < elapsed:
+                trace_file.write(
+                    "%d,%r,%r,%r,%r\n" % ((rows * step_ms, altitude) + acceleration)
+                )
+                rows += 1
+            if kind == RECORD_BARO:
+                altitude = values[0]
+            else:
+                acceleration = tuple(values[:3])
+            if start is None and altitude is not None and acceleration is not None:
+                start = elapsed
+    return rows
+
+
+def to_numpy(path: str):
+    """Load a log as a NumPy structured array with ``ticks``, ``kind``,
+    ``count``, ``sequence`` and ``values`` fields, padding removed. Needs NumPy,
+    so run it on the ground station."""
+    import numpy  # pylint: disable=import-outside-toplevel
+
+    dtype = numpy.dtype(
+        [
+            ("ticks", "<u4"),
+            ("kind", "u1"),
+            ("count", "u1"),
+            ("sequence", "<u2"),
+            ("values", "<f4", (MAX_VALUES,)),
+        ]
+    )
+    records = numpy.fromfile(path, dtype=dtype, offset=BLOCK_SIZE)
+    return records[records["kind"] != RECORD_PADDING]
@@ -0,0 +1,494 @@
+"""
+`flight_state`
+====================================================
+
+Event-driven flight state machine for the payload flight computer.
+
+The machine walks PAD -> BOOST -> COAST -> APOGEE -> DESCENT -> LANDED. Sensor
+reads are driven by a fixed-rate scheduler rather than ``time.sleep`` polling
+loops, so the altimeter and the IMU are each sampled at their own rate for the
+whole flight. Every transition is debounced over several samples and uses a
+hysteresis margin, and is appended to a timestamped event log.
+
+The same code runs against live drivers or against a recorded or simulated
+trace (see :func:`replay` and :func:`simulate_flight`), which is how transition
+latency is benchmarked on the ground.
+"""
+
+import math
+import time
+
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
+
+try:
+    from typing import Callable, List, Optional, Sequence, Tuple
+except ImportError:
+    pass
+
+PAD = 0
+BOOST = 1
+COAST = 2
+APOGEE = 3
+DESCENT = 4
+LANDED = 5
+
+STATE_NAMES = ("PAD", "BOOST", "COAST", "APOGEE", "DESCENT", "LANDED")
+
+STANDARD_GRAVITY = 9.80665
+
+
+class FlightStateMachine:  # pylint: disable=too-many-instance-attributes
+    """Detects flight phases from altitude and acceleration samples.
+
+    Samples are pushed in with :meth:`update_altitude` and
+    :meth:`update_acceleration`; each carries the ``ticks_ms`` value it was taken
+    at. Transitions are recorded in :attr:`events` as
+    ``(elapsed_ms, state, altitude)`` tuples, where ``elapsed_ms`` is measured
+    from the first sample seen.
+
+    :param float ground_altitude: Pad altitude in meters. Defaults to the first
+        altitude sample.
+    :param float launch_accel: Acceleration magnitude in m/s^2 that signals launch.
+    :param float launch_altitude: Height above the pad in meters that signals
+        launch when the IMU misses it.
+    :param float burnout_accel: Acceleration magnitude in m/s^2 below which the
+        motor is considered burnt out.
+    :param int max_boost_ms: Force the COAST transition after this long in BOOST.
+    :param float apogee_drop: Meters below the peak altitude that confirm apogee.
+    :param float descent_drop: Meters below the peak altitude that confirm descent.
+    :param float landed_band: Altitude band in meters the vehicle must stay
+        within to be considered landed.
+    :param int landed_ms: How long the altitude must stay in ``landed_band``.
+    :param int debounce: Consecutive samples a condition must hold before the
+        transition is taken, counted separately for the altimeter and the IMU.
+    :param on_event: Optional callable ``on_event(elapsed_ms, state, altitude)``
+        called for every transition.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        *,
+        ground_altitude: Optional[float] = None,
+        launch_accel: float = 2.5 * STANDARD_GRAVITY,
+        launch_altitude: float = 20.0,
+        burnout_accel: float = 1.0 * STANDARD_GRAVITY,
+        max_boost_ms: int = 10000,
+        apogee_drop: float = 2.0,
+        descent_drop: float = 10.0,
+        landed_band: float = 5.0,
+        landed_ms: int = 5000,
+        debounce: int = 3,
+        on_event: Optional[Callable[[int, int, float], None]] = None,
+    ) -> None:
+        self.ground_altitude = ground_altitude
+        self.launch_accel = launch_accel
+        self.launch_altitude = launch_altitude
+        self.burnout_accel = burnout_accel
+        self.max_boost_ms = max_boost_ms
+        self.apogee_drop = apogee_drop
+        self.descent_drop = descent_drop
+        self.landed_band = landed_band
+        self.landed_ms = landed_ms
+        self.debounce = debounce
+        self.on_event = on_event
+
+        self.state = PAD
+        self.events = []
+        self.altitude = None
+        self.max_altitude = None
+        self.max_altitude_ms = None
+        self._start = None
+        self._state_start = None
+        self._baro_count = 0
+        self._imu_count = 0
+        self._landed_ref = None
+        self._landed_ref_ms = None
+
+    @property
+    def state_name(self) -> str:
+        """Name of the current flight state."""
+        return STATE_NAMES[self.state]
+
+    def _elapsed(self, now: int) -> int:
+        if self._start is None:
+            self._start = now
+            self._state_start = now
+        return ticks_diff(now, self._start)
+
+    def _baro_debounced(self, condition: bool) -> bool:
+        # The altimeter and the IMU keep separate counts: sharing one let the
+        # interleaved samples of the other sensor reset each debounce.
+        if condition:
+            self._baro_count += 1
+        else:
+            self._baro_count = 0
+        return self._baro_count >= self.debounce
+
+    def _imu_debounced(self, condition: bool) -> bool:
+        if condition:
+            self._imu_count += 1
+        else:
+            self._imu_count = 0
+        return self._imu_count >= self.debounce
+
+    def _transition(self, now: int, state: int) -> None:
+        self.state = state
+        self._state_start = now
+        self._baro_count = 0
+        self._imu_count = 0
+        altitude = self.altitude if self.altitude is not None else 0.0
+        elapsed = ticks_diff(now, self._start)
+        self.events.append((elapsed, state, altitude))
+        if self.on_event is not None:
+            self.on_event(elapsed, state, altitude)
+
+    def update_altitude(self, now: int, altitude: float) -> None:
+        """Feed one altimeter sample in meters taken at ``now`` ticks."""
+        elapsed = self._elapsed(now)
+        self.altitude = altitude
+        if self.ground_altitude is None:
+            self.ground_altitude = altitude
+        if self.max_altitude is None or altitude > self.max_altitude:
+            self.max_altitude = altitude
+            self.max_altitude_ms = elapsed
+
+        state = self.state
+        if state == PAD:
+            climb = altitude - self.ground_altitude
+            if self._baro_debounced(climb > self.launch_altitude):
+                self._transition(now, BOOST)
+        elif state == BOOST:
+            # Baro-only fallback for a missing or saturated IMU.
+            if ticks_diff(now, self._state_start) >= self.max_boost_ms:
+                self._transition(now, COAST)
+        elif state == COAST:
+            if self._baro_debounced(altitude < self.max_altitude - self.apogee_drop):
+                self._transition(now, APOGEE)
+        elif state == APOGEE:
+            if self._baro_debounced(altitude < self.max_altitude - self.descent_drop):
+                self._transition(now, DESCENT)
+                self._landed_ref = altitude
+                self._landed_ref_ms = now
+        elif state == DESCENT:
+            if abs(altitude - self._landed_ref) > self.landed_band:
+                self._landed_ref = altitude
+                self._landed_ref_ms = now
+            elif ticks_diff(now, self._landed_ref_ms) >= self.landed_ms:
+                self._transition(now, LANDED)
+
+    def update_acceleration(self, now: int, x: float, y: float, z: float) -> None:
+        """Feed one accelerometer sample in m/s^2 taken at ``now`` ticks."""
+        self._elapsed(now)
+        state = self.state
+        if state not in (PAD, BOOST):
+            return
+        magnitude = math.sqrt(x * x + y * y + z * z)
+        if state == PAD:
+            if self._imu_debounced(magnitude > self.launch_accel):
+                self._transition(now, BOOST)
+        elif self._imu_debounced(magnitude < self.burnout_accel):
+            self._transition(now, COAST)
+
+    def update_velocity(self, now: int, velocity: float) -> None:
+        """Feed one vertical velocity estimate in m/s, positive up, such as
+        :attr:`altitude_filter.AltitudeFilter.velocity`. In COAST apogee is
+        taken once it has been negative for ``debounce`` estimates, ahead of
+        the altitude drop check."""
+        self._elapsed(now)
+        if self.state != COAST:
+            return
+        # Velocity estimates arrive with the IMU samples, whose count is
+        # unused after BOOST.
+        if self._imu_debounced(velocity < 0.0):
+            self._transition(now, APOGEE)
+
+
+def format_event(event: Tuple[int, int, float]) -> str:
+    """Format one event log entry for printing."""
+    elapsed, state, altitude = event
+    return "T+%.3fs %s alt=%.1fm" % (elapsed / 1000, STATE_NAMES[state], altitude)
+
+
+class RateScheduler:
+    """Runs callbacks at fixed periods without drift.
+
+    Each task keeps its own deadline, which is advanced by exactly one period
+    per run, so a late run does not shift the following ones. When a task falls
+    more than a whole period behind, the missed runs are dropped and counted in
+    :attr:`overruns` rather than run back to back. A deadline that is due
+    exactly now is run, not missed, the same rule as `sampler.Sampler` uses.
+
+    :param clock: Callable returning the current ``ticks_ms`` value.
+    :param sleep: Callable taking seconds, used to wait for the next deadline.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], int] = ticks_ms,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._clock = clock
+        self._sleep = sleep
+        self._tasks = []
+        self.overruns = 0
+
+    def add(self, period_ms: int, callback: Callable[[int], None]) -> None:
+        """Call ``callback(now)`` every ``period_ms`` milliseconds."""
+        if period_ms <= 0:
+            raise ValueError("period_ms must be positive")
+        self._tasks.append([self._clock(), period_ms, callback])
+
+    def run_pending(self) -> int:
+        """Run every task whose deadline has passed. Returns the milliseconds
+        until the next deadline."""
+        now = self._clock()
+        wait = None
+        for task in self._tasks:
+            deadline, period, callback = task
+            if ticks_diff(now, deadline) >= 0:
+                callback(now)
+                deadline = ticks_add(deadline, period)
+                late = ticks_diff(now, deadline)
+                if late > 0:
+                    skipped = late // period + 1
+                    self.overruns += skipped
+                    deadline = ticks_add(deadline, skipped * period)
+                task[0] = deadline
+            remaining = ticks_diff(task[0], now)
+            if wait is None or remaining < wait:
+                wait = remaining
+        return wait if wait is not None else 0
+
+    def run(self, done: Callable[[], bool]) -> None:
+        """Run tasks until ``done()`` returns True."""
+        while not done():
+            wait = self.run_pending()
+            if wait > 0:
+                self._sleep(wait / 1000)
+
+
+def run_flight(  # pylint: disable=too-many-arguments
+    altimeter,
+    imu,
+    machine: FlightStateMachine,
+    *,
+    scheduler: Optional[RateScheduler] = None,
+    baro_period_ms: int = 50,
+    imu_period_ms: int = 10,
+    on_acceleration: Optional[Callable[[int, float, float, float], None]] = None,
+) -> FlightStateMachine:
+    """Sample ``altimeter.altitude`` and ``imu.acceleration`` at their own rates
+    and feed ``machine`` until it reaches LANDED.
+
+    ``on_acceleration(now, x, y, z)`` is also called with every IMU sample, for
+    consumers such as a peak tracker that run alongside the state machine.
+    """
+    if scheduler is None:
+        scheduler = RateScheduler()
+    scheduler.add(
+        baro_period_ms, lambda now: machine.update_altitude(now, altimeter.altitude)
+    )
+    if imu is not None:
+
+        def sample_imu(now: int) -> None:
+            x, y, z = imu.acceleration
+            machine.update_acceleration(now, x, y, z)
+            if on_acceleration is not None:
+                on_acceleration(now, x, y, z)
+
+        scheduler.add(imu_period_ms, sample_imu)
+    scheduler.run(lambda: machine.state == LANDED)
+    return machine
+
+
+class TraceClock:
+    """Virtual ``ticks_ms`` clock for replaying traces faster than real time.
+
+    ``sleep`` advances the clock instead of blocking.
+    """
+
+    def __init__(self, start: int = 0) -> None:
+        self.now = start
+
+    def ticks_ms(self) -> int:
+        """The current virtual time in milliseconds."""
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the virtual time by ``seconds``."""
+        self.now += max(1, int(seconds * 1000))
+
+
+class TraceSensor:
+    """Sample-and-hold view of a recorded trace as a sensor object.
+
+    Exposes the ``altitude`` and ``acceleration`` attributes of the live drivers,
+    returning the latest trace row at or before the clock's current time.
+
+    :param trace: Rows of ``(t_ms, altitude, ax, ay, az)`` in time order.
+    :param TraceClock clock: Clock the trace is replayed against.
+    """
+
+    def __init__(self, trace: Sequence[Sequence[float]], clock: TraceClock) -> None:
+        self._trace = trace
+        self._clock = clock
+        self._index = 0
+
+    def _row(self) -> Sequence[float]:
+        trace = self._trace
+        now = self._clock.now
+        index = self._index
+        while index + 1 < len(trace) and trace[index + 1][0] <= now:
+            index += 1
+        self._index = index
+        return trace[index]
+
+    @property
+    def ended(self) -> bool:
+        """True once the clock has run past the last trace row."""
+        return self._clock.now > self._trace[-1][0]
+
+    @property
+    def altitude(self) -> float:
+        """Trace altitude in meters."""
+        return self._row()[1]
+
+    @property
+    def acceleration(self) -> Tuple[float, float, float]:
+        """Trace acceleration in m/s^2."""
+        row = self._row()
+        return (row[2], row[3], row[4])
+
+
+def load_trace(path: str) -> List[Tuple[int, float, float, float, float]]:
+    """Load a ``t_ms,altitude,ax,ay,az`` CSV trace. A header line is skipped.
+
+    Traces of real flights come from the recorder's log, converted with
+    `flight_recorder.to_trace`; :func:`simulate_flight` makes synthetic ones.
+    """
+    trace = []
+    with open(path, "r") as trace_file:
+        for line in trace_file:
+            fields = line.strip().split(",")
+            if len(fields) < 5 or not fields[0].lstrip("-").isdigit():
+                continue
+            trace.append(
+                (
+                    int(fields[0]),
+                    float(fields[1]),
+                    float(fields[2]),
+                    float(fields[3]),
+                    float(fields[4]),
+                )
+            )
+    return trace
+
+
+def simulate_flight(  # pylint: disable=too-many-arguments,too-many-locals
+    *,
+    pad_ms: int = 5000,
+    thrust_accel: float = 60.0,
+    burn_ms: int = 2000,
+    drag: float = 0.0015,
+    descent_rate: float = 6.0,
+    baro_noise: float = 0.5,
+    accel_noise: float = 0.3,
+    step_ms: int = 5,
+    seed: int = 1,
+) -> Tuple[List[Tuple[int, float, float, float, float]], dict]:
+    """Generate a noisy single-stage flight trace.
+
+    Returns ``(trace, truth)`` where ``truth`` maps BOOST, COAST, APOGEE and
+    LANDED to the elapsed milliseconds at which they physically happened.
+    """
+    import random  # pylint: disable=import-outside-toplevel
+
+    rng = random.Random(seed)
+    trace = []
+    truth = {BOOST: pad_ms, COAST: pad_ms + burn_ms}
+    dt = step_ms / 1000
+    altitude = 0.0
+    velocity = 0.0
+    t = 0
+    landed_at = None
+    while landed_at is None or t < landed_at + 10000:
+        if t < pad_ms or landed_at is not None:
+            sensed = STANDARD_GRAVITY
+            velocity = 0.0
+        elif t < pad_ms + burn_ms:
+            sensed = thrust_accel - drag * velocity * abs(velocity)
+            velocity += (sensed - STANDARD_GRAVITY) * dt
+        elif APOGEE not in truth or velocity > -descent_rate:
+            sensed = -drag * velocity * abs(velocity)
+            velocity += (sensed - STANDARD_GRAVITY) * dt
+            if APOGEE not in truth and velocity <= 0:
+                truth[APOGEE] = t
+        else:
+            # Under the parachute: steady descent, the IMU feels ~1 g.
+            sensed = STANDARD_GRAVITY
+            velocity = -descent_rate
+        altitude += velocity * dt
+        if altitude <= 0.0 and t > pad_ms + burn_ms:
+            altitude = 0.0
+            if landed_at is None:
+                landed_at = t
+                truth[LANDED] = t
+        trace.append(
+            (
+                t,
+                altitude + rng.gauss(0, baro_noise),
+                rng.gauss(0, accel_noise),
+                rng.gauss(0, accel_noise),
+                sensed + rng.gauss(0, accel_noise),
+            )
+        )
+        t += step_ms
+    return trace, truth
+
+
+def replay(
+    trace: Sequence[Sequence[float]],
+    *,
+    baro_period_ms: int = 50,
+    imu_period_ms: int = 10,
+    **kwargs,
+) -> FlightStateMachine:
+    """Run a :class:`FlightStateMachine` over a recorded or simulated trace,
+    as loaded by :func:`load_trace` or made by :func:`simulate_flight`.
+
+    Extra keyword arguments are passed to :class:`FlightStateMachine`.
+    """
+    clock = TraceClock(trace[0][0])
+    sensor = TraceSensor(trace, clock)
+    machine = FlightStateMachine(**kwargs)
+    scheduler = RateScheduler(clock.ticks_ms, clock.sleep)
+    scheduler.add(
+        baro_period_ms, lambda now: machine.update_altitude(now, sensor.altitude)
+    )
+    scheduler.add(
+        imu_period_ms,
+        lambda now: machine.update_acceleration(now, *sensor.acceleration),
+    )
+    scheduler.run(lambda: machine.state == LANDED or sensor.ended)
+    return machine
+
+
+def transition_latency(machine: FlightStateMachine, truth: dict) -> dict:
+    """Milliseconds between each true event in ``truth`` and its detection.
+
+    States that were never detected are left out of the result.
+    """
+    detected = {state: elapsed for elapsed, state, _ in machine.events}
+    return {
+        STATE_NAMES[state]: detected[state] - truth[state]
+        for state in truth
+        if state in detected
+    }
+
+
+if __name__ == "__main__":
+    sim_trace, sim_truth = simulate_flight()
+    result = replay(sim_trace)
+    for entry in result.events:
+        print(format_event(entry))
+    print("Latency (ms):", transition_latency(result, sim_truth))
@@ -1,25 +1,56 @@
 # Imports
-import time
+import asyncio
+import os
+from array import array
+from binascii import hexlify
 import busio
+import digitalio
 from board import *
 from adafruit_bus_device.i2c_device import I2CDevice
 import adafruit_mpl3115a2
 from adafruit_lsm6ds.ism330dhcx import ISM330DHCX
+from adafruit_lsm6ds import AccelRange, FreeFallThreshold, FREE_FALL, WAKE_UP
+from adafruit_rfm.rfm9x import RFM9x
+from adafruit_ticks import ticks_ms
+from altitude_filter import AltitudeFilter
+from flight_state import FlightStateMachine, LANDED, format_event
+from flight_recorder import (
+    FileSink,
+    FlightRecorder,
+    HashingSink,
+    RECORD_BARO,
+    RECORD_EVENT,
+    RECORD_IMU,
+    RECORD_STATE,
+    native_digestmod,
+)
+from peak_tracker import PeakTracker
+from sampler import Sampler
+from telemetry import FLAG_FREE_FALL, FLAG_SHOCK, TelemetryDownlink
 
-required_alt = 500 
-
-def preflight_check(altimeter, ground_alt):
-    if((altimeter.altitude - ground_alt) > required_alt):
-        return True
-    return False
-
-# Start main
-armed = False
 # Pressure is in pascals, 1 kPa = 1000 Pa
 sea_pressure = 101016
 # Var defines
-max_alt = 0
 ALT_DELTA_LANDED = 5
+# Sensor sample rates in Hz
+BARO_RATE_HZ = 20
+IMU_RATE_HZ = 100
+EVENT_RATE_HZ = 10
+# Altimeter oversampling in flight, 34 ms per conversion
+FLIGHT_OVERSAMPLE = 8
+# Binary flight log, decode with flight_recorder.to_csv
+FLIGHT_LOG = "flight.bin"
+# Merkle tree of the log's 4 KB chunks, check with flight_recorder.verify_log.
+# Set FLIGHT_LOG_KEY in settings.toml to authenticate its root with an HMAC.
+FLIGHT_LOG_TREE = "flight.tree"
+# On-chip shock detection threshold in m/s^2
+SHOCK_THRESHOLD = 100
+# Telemetry radio, wired as on the RFM9x FeatherWing
+RADIO_FREQ_MHZ = 915.0
+RADIO_SPREADING_FACTOR = 9
+# State vectors per second and largest share of the time spent transmitting
+TELEMETRY_RATE_HZ = 10
+TELEMETRY_DUTY_CYCLE = 0.5
 
 # Main Func
 if __name__ == "__main__":
@@ -30,54 +61,164 @@ if __name__ == "__main__":
     altimeter = adafruit_mpl3115a2.MPL3115A2(i2c, address=altimeterid)
     altimeter.sealevel_pressure = sea_pressure
     accelerometer = ISM330DHCX(i2c, address=accelerometerid)
+    altimeter.i2c_device.timing = True
+    accelerometer.i2c_device.timing = True
+    accelerometer.accelerometer_range = AccelRange.RANGE_16G
+    # Latch shocks and free-fall on chip so they are caught between reads
+    accelerometer.wake_up_threshold = SHOCK_THRESHOLD
+    accelerometer.free_fall_threshold = FreeFallThreshold.THRESHOLD_312_MG
+    accelerometer.free_fall_duration = 6
+    spi = busio.SPI(SCK, MOSI, MISO)
+    radio = RFM9x(
+        spi, digitalio.DigitalInOut(D5), digitalio.DigitalInOut(D6), RADIO_FREQ_MHZ
+    )
+    radio.spreading_factor = RADIO_SPREADING_FACTOR
 
     #Get original pressure/temp/alt
     init_pressure = altimeter.pressure
-    print("Init pressure: " + init_pressure)
+    print("Init pressure: %.2f" % init_pressure)
     init_temp = altimeter.temperature
-    print("Init temperature: " + init_temp)
+    print("Init temperature: %.2f" % init_temp)
     init_alt = altimeter.altitude
-    print("Init altitude: " + init_alt)
-
-
-    # Check every second to see if we've started flying
-    while not preflight_check(altimeter, init_alt):
-        time.sleep(1)
-
-    armed = True
-    print("Arming triggered")
-   
-    # Continuously poll max_alt until we hit apogee and start coming down again
-    # Starts at our initial ground altitude
-    max_alt = init_alt
-    while altimeter.altitude > max_alt:
-        max_alt = altimeter.altitude
-        time.sleep(0.2)
+    print("Init altitude: %.2f" % init_alt)
+
+    # Sample the altimeter and the IMU at fixed rates and walk the flight
+    # states PAD -> BOOST -> COAST -> APOGEE -> DESCENT -> LANDED
+    # The log is only hashed in flight with a built-in SHA-256, the pure
+    # Python one would hold up the sampler
+    log_key = os.getenv("FLIGHT_LOG_KEY")
+    log_digest = native_digestmod()
+    log_sink = FileSink(FLIGHT_LOG)
+    if log_digest is not None:
+        log_sink = HashingSink(
+            log_sink,
+            FLIGHT_LOG_TREE,
+            key=log_key.encode() if log_key else None,
+            digestmod=log_digest,
+        )
+    else:
+        print("No built-in SHA-256, %s not written" % FLIGHT_LOG_TREE)
+    recorder = FlightRecorder(log_sink)
+
+    def on_event(elapsed, state, altitude):
+        print(format_event((elapsed, state, altitude)))
+        recorder.log(RECORD_STATE, ticks_ms(), (state, altitude, elapsed))
+
+    machine = FlightStateMachine(
+        ground_altitude=init_alt,
+        landed_band=ALT_DELTA_LANDED,
+        on_event=on_event,
+    )
+    peaks = PeakTracker()
+    accelerometer.motion_event_flags  # Clear anything latched on the pad
+    motion = array("f", (0.0,) * 6)
+    # Stream state vectors to the ground station as airtime allows
+    downlink = TelemetryDownlink(
+        radio, sample_rate_hz=TELEMETRY_RATE_HZ, duty_cycle=TELEMETRY_DUTY_CYCLE
+    )
+    # Altitude and vertical velocity fused from the altimeter and the IMU;
+    # the state machine sees the estimates rather than raw altitude
+    estimate = AltitudeFilter()
+
+    def on_record(channel, now, value):
+        if channel is baro:
+            estimate.update_altitude(now, value)
+            machine.update_altitude(now, estimate.altitude)
+            recorder.log(RECORD_BARO, now, (value,))
+        elif channel is imu:
+            estimate.update_motion(now, value)
+            machine.update_acceleration(now, value[0], value[1], value[2])
+            machine.update_velocity(now, estimate.velocity)
+            peaks.update_motion(now, value)
+            recorder.log(RECORD_IMU, now, value)
+            if machine.altitude is not None:
+                downlink.offer(
+                    now, machine.state, estimate.altitude, estimate.velocity, value
+                )
+        else:
+            peaks.record_events(now, value)
+            if value:
+                recorder.log(RECORD_EVENT, now, (value,))
+                downlink.offer(
+                    now,
+                    machine.state,
+                    machine.altitude or 0.0,
+                    estimate.velocity,
+                    motion,
+                    (FLAG_SHOCK if value & WAKE_UP else 0)
+                    | (FLAG_FREE_FALL if value & FREE_FALL else 0),
+                )
+        if machine.state == LANDED:
+            sampler.stop()
+            recorder.stop()
+            downlink.stop()
+
+    # Every sensor is read on one clock at its own rate
+    altimeter.oversample = FLIGHT_OVERSAMPLE
+    sampler = Sampler(on_record)
+    baro = sampler.add("baro", altimeter.asyncio_altitude, BARO_RATE_HZ, awaitable=True)
+    imu = sampler.add("imu", lambda: accelerometer.read_motion(motion), IMU_RATE_HZ)
+    sampler.add("events", lambda: accelerometer.motion_event_flags, EVENT_RATE_HZ)
+
+    async def fly():
+        # The recorder flushes to storage in its own task, between samples
+        await asyncio.gather(sampler.run(), recorder.run(), downlink.run())
+
+    asyncio.run(fly())
+    altimeter.oversample = 128
 
     # Do apogee-based stuff
-    print("Apogee: " + max_alt)
-
-    # Wait for the rocket to land, then collect ground data
-    current_alt = altimeter.altitude - ALT_DELTA_LANDED
-    while(current_alt > altimeter.altitude):
-        current_alt = altimeter.altitude - ALT_DELTA_LANDED
-        time.sleep(0.5)
+    print("Apogee: %.2f" % machine.max_altitude)
+    print("Altimeter samples rejected: %d" % estimate.rejected)
 
     # Print landing data
-    print("LZ Pressure: " + altimeter.pressure)
     lz_pressure = altimeter.pressure
-    print("LZ Temp: " + altimeter.temperature)
+    print("LZ Pressure: %.2f" % lz_pressure)
     lz_temp = altimeter.temperature
-    print("LZ Altitude: " + altimeter.altitude)
+    print("LZ Temp: %.2f" % lz_temp)
     lz_altitude = altimeter.altitude
+    print("LZ Altitude: %.2f" % lz_altitude)
 
     # Print postflight collected data
-    print("Maximum Acceleration: X:%.2f, Y: %.2f, Z: %.2f m/s^2" % (accelerometer.acceleration))
+    if peaks.count:
+        print("Maximum Acceleration: X:%.2f, Y: %.2f, Z: %.2f m/s^2" % tuple(peaks.maximum))
+        print("Minimum Acceleration: X:%.2f, Y: %.2f, Z: %.2f m/s^2" % tuple(peaks.minimum))
+        print("Peak Acceleration Magnitude: %.2f m/s^2" % peaks.peak_magnitude)
+        print("RMS Acceleration: X:%.2f, Y: %.2f, Z: %.2f m/s^2" % peaks.rms)
+    else:
+        print("No IMU samples recorded")
+    print("Shock events: %d, Free-fall events: %d" % (
+        peaks.shock_count, peaks.free_fall_count
+    ))
+
+    # Print sampling statistics and I2C bus usage
+    for line in sampler.report():
+        print(line)
+    for name, device in (
+        ("altimeter", altimeter.i2c_device),
+        ("IMU", accelerometer.i2c_device),
+    ):
+        print("I2C %s: %d transactions, %d locks, %.1f ms bus time" % (
+            name, device.transaction_count, device.lock_count, device.bus_time_ns / 1e6
+        ))
 
     # Print battery state
 
     # Print survivability metrics
 
     # Transmit ground data back to the flight station
+    downlink.offer(ticks_ms(), machine.state, lz_altitude, 0.0, motion)
+    asyncio.run(downlink.send_frame())
+    print("Telemetry: %d frames, %d failed, %d samples dropped, %.1f s airtime" % (
+        downlink.frames, downlink.failed, downlink.dropped, downlink.airtime_ms / 1000
+    ))
 
     # Save data to a file
+    recorder.close()
+    print("Logged %d records to %s, %d dropped" % (
+        recorder.records, FLIGHT_LOG, recorder.dropped
+    ))
+    if log_digest is not None:
+        print("Log root: %s, %d chunks in %s" % (
+            hexlify(log_sink.root).decode(), log_sink.tree.chunks, FLIGHT_LOG_TREE
+        ))
@@ -10,7 +10,7 @@
 import time
 
 try:
-    from typing import Optional, Type
+    from typing import List, Optional, Tuple, Type
     from types import TracebackType
     from circuitpython_typing import ReadableBuffer, WriteableBuffer
 
@@ -57,6 +57,17 @@ class I2CDevice:
     def __init__(self, i2c: I2C, device_address: int, probe: bool = True) -> None:
         self.i2c = i2c
         self.device_address = device_address
+        self.transaction_count = 0
+        """The number of reads and writes issued to the device"""
+        self.lock_count = 0
+        """The number of times the bus was locked for the device"""
+        self.bus_time_ns = 0
+        """Nanoseconds the bus was held locked for the device. Only counted while
+        `timing` is True"""
+        self.timing = False
+        """Set to True to accumulate `bus_time_ns`. Off by default because the
+        clock reads add overhead to every transaction"""
+        self._lock_start = 0
 
         if probe:
             self.__probe_for_device()
@@ -78,6 +89,7 @@ class I2CDevice:
         """
         if end is None:
             end = len(buf)
+        self.transaction_count += 1
         self.i2c.readfrom_into(self.device_address, buf, start=start, end=end)
 
     def write(
@@ -97,6 +109,7 @@ class I2CDevice:
         """
         if end is None:
             end = len(buf)
+        self.transaction_count += 1
         self.i2c.writeto(self.device_address, buf, start=start, end=end)
 
     # pylint: disable-msg=too-many-arguments
@@ -137,6 +150,7 @@ class I2CDevice:
         if in_end is None:
             in_end = len(in_buffer)
 
+        self.transaction_count += 1
         self.i2c.writeto_then_readfrom(
             self.device_address,
             out_buffer,
@@ -152,6 +166,9 @@ class I2CDevice:
     def __enter__(self) -> "I2CDevice":
         while not self.i2c.try_lock():
             time.sleep(0)
+        self.lock_count += 1
+        if self.timing:
+            self._lock_start = time.monotonic_ns()
         return self
 
     def __exit__(
@@ -160,9 +177,17 @@ class I2CDevice:
         exc_val: Optional[BaseException],
         exc_tb: Optional[TracebackType],
     ) -> bool:
+        if self.timing:
+            self.bus_time_ns += time.monotonic_ns() - self._lock_start
         self.i2c.unlock()
         return False
 
+    def reset_stats(self) -> None:
+        """Zero `transaction_count`, `lock_count` and `bus_time_ns`."""
+        self.transaction_count = 0
+        self.lock_count = 0
+        self.bus_time_ns = 0
+
     def __probe_for_device(self) -> None:
         """
         Try to read a byte from an address,
@@ -185,3 +210,107 @@ class I2CDevice:
                 # pylint: enable=raise-missing-from
         finally:
             self.i2c.unlock()
+
+
+class I2CBatch:
+    """
+    A reusable list of reads and writes to one device, run under a single bus
+    lock.
+
+    Transfers are queued once and replayed by every call to `run`. Buffers are
+    referenced rather than copied, so update their contents in place between
+    runs; running a batch allocates nothing and skips the per-transfer checks
+    of the `I2CDevice` methods.
+
+    :param I2CDevice device: The device the transfers are addressed to
+
+    Example:
+
+    .. code-block:: python
+
+        status = bytearray(1)
+        data = bytearray(5)
+        batch = I2CBatch(device)
+        batch.write_then_readinto(b"\\x00", status)
+        batch.write_then_readinto(b"\\x01", data)
+        batch.run()  # Both reads under one lock
+    """
+
+    def __init__(self, device: I2CDevice) -> None:
+        self.device = device
+        self._transfers = []  # type: List[Tuple]
+
+    def __len__(self) -> int:
+        return len(self._transfers)
+
+    def readinto(
+        self, buf: WriteableBuffer, *, start: int = 0, end: Optional[int] = None
+    ) -> "I2CBatch":
+        """Queue a read into ``buf[start:end]``. Returns the batch for chaining."""
+        if end is None:
+            end = len(buf)
+        self._transfers.append((None, 0, 0, buf, start, end))
+        return self
+
+    def write(
+        self, buf: ReadableBuffer, *, start: int = 0, end: Optional[int] = None
+    ) -> "I2CBatch":
+        """Queue a write of ``buf[start:end]``. Returns the batch for chaining."""
+        if end is None:
+            end = len(buf)
+        self._transfers.append((buf, start, end, None, 0, 0))
+        return self
+
+    # pylint: disable-msg=too-many-arguments
+    def write_then_readinto(
+        self,
+        out_buffer: ReadableBuffer,
+        in_buffer: WriteableBuffer,
+        *,
+        out_start: int = 0,
+        out_end: Optional[int] = None,
+        in_start: int = 0,
+        in_end: Optional[int] = None
+    ) -> "I2CBatch":
+        """Queue a write of ``out_buffer[out_start:out_end]`` followed by a
+        repeated-start read into ``in_buffer[in_start:in_end]``. Returns the batch
+        for chaining."""
+        if out_end is None:
+            out_end = len(out_buffer)
+        if in_end is None:
+            in_end = len(in_buffer)
+        self._transfers.append(
+            (out_buffer, out_start, out_end, in_buffer, in_start, in_end)
+        )
+        return self
+
+    # pylint: enable-msg=too-many-arguments
+
+    def clear(self) -> None:
+        """Remove every queued transfer."""
+        self._transfers = []
+
+    def run(self) -> None:
+        """Lock the bus once and run every queued transfer in order."""
+        device = self.device
+        i2c = device.i2c
+        address = device.device_address
+        with device:
+            for out_buf, out_start, out_end, in_buf, in_start, in_end in (
+                self._transfers
+            ):
+                if in_buf is None:
+                    i2c.writeto(address, out_buf, start=out_start, end=out_end)
+                elif out_buf is None:
+                    i2c.readfrom_into(address, in_buf, start=in_start, end=in_end)
+                else:
+                    i2c.writeto_then_readfrom(
+                        address,
+                        out_buf,
+                        in_buf,
+                        out_start=out_start,
+                        out_end=out_end,
+                        in_start=in_start,
+                        in_end=in_end,
+                    )
+            device.transaction_count += len(self._transfers)
@@ -26,7 +26,9 @@ Implementation Notes
   https://github.com/adafruit/circuitpython/releases
 
 """
+import struct
 import time
+from array import array
 from micropython import const
 
 try:
@@ -57,6 +59,31 @@ _VTG = 10
 _ST_MIN = _GLL
 _ST_MAX = _VTG
 
+# Streaming parser
+_MAX_SENTENCE = const(96)  # NMEA allows 82 characters
+_MAX_FIELDS = const(24)
+_RX_SIZE = const(64)
+_WAIT = const(0)
+_BODY = const(1)
+_CHECK_HIGH = const(2)
+_CHECK_LOW = const(3)
+_POWERS_OF_TEN = (1.0, 10.0, 100.0, 1e3, 1e4, 1e5, 1e6, 1e7, 1e8, 1e9)
+# UBX binary frames: 0xB5 0x62, class, id, length (LE), payload, Fletcher-8
+_UBX_SYNC = const(4)
+_UBX_HEADER = const(5)
+_UBX_PAYLOAD = const(6)
+_UBX_CK_A = const(7)
+_UBX_CK_B = const(8)
+_UBX_FRAME = const(9)  # A frame just completed; feed() turns it into _WAIT
+_UBX_MAX_PAYLOAD = const(100)
+_UBX_MAX_LENGTH = const(1024)  # Anything longer is a false sync
+_UBX_NAV_PVT_LENGTH = const(92)
+# iTOW, date and time, valid, tAcc, nano, fixType, flags, flags2, numSV,
+# lon, lat, height, hMSL, hAcc, vAcc, velN, velE, velD, gSpeed, headMot,
+# sAcc, headAcc, pDOP
+_UBX_NAV_PVT_FORMAT = "<IHBBBBBBIiBBBBiiiiIIiiiiiIIH"
+_MS_TO_KNOTS = 1.9438445
+
 _SENTENCE_PARAMS = (
     # 0 - _GLL
     "dcdcscC",
@@ -239,6 +266,53 @@ def _parse_data(sentence_type: int, data: List[str]) -> Optional[List]:
     return params
 
 
+def _hex_digit(char: int) -> int:
+    # Value of an ASCII hex digit, or -1.
+    if 0x30 <= char <= 0x39:
+        return char - 0x30
+    char |= 0x20  # lower case
+    if 0x61 <= char <= 0x66:
+        return char - 0x57
+    return -1
+
+
+def _field_int(buf: bytearray, start: int, end: int) -> Optional[int]:
+    # Integer from buf[start:end] without slicing, None if empty.
+    if start >= end:
+        return None
+    value = 0
+    for i in range(start, end):
+        digit = buf[i] - 0x30
+        if not 0 <= digit <= 9:
+            raise ValueError("GPS: bad integer field")
+        value = value * 10 + digit
+    return value
+
+
+def _field_float(buf: bytearray, start: int, end: int) -> Optional[float]:
+    # Float from buf[start:end] without slicing, None if empty.
+    if start >= end:
+        return None
+    negative = buf[start] == 0x2D  # '-'
+    if negative:
+        start += 1
+    value = 0
+    decimals = -1
+    for i in range(start, end):
+        char = buf[i]
+        if char == 0x2E and decimals < 0:  # '.'
+            decimals = 0
+            continue
+        digit = char - 0x30
+        if not 0 <= digit <= 9:
+            raise ValueError("GPS: bad number field")
+        value = value * 10 + digit
+        if decimals >= 0:
+            decimals += 1
+    result = value / _POWERS_OF_TEN[decimals] if decimals > 0 else float(value)
+    return -result if negative else result
+
+
 # pylint: disable-msg=too-many-instance-attributes
 class GPS:
     """GPS parsing module.  Can parse simple NMEA data sentences from serial
@@ -331,6 +405,40 @@ class GPS:
         self._magnetic_variation = None
         self.debug = debug
         """Toggles debug mode. When True, prints the incoming data sentence to the console"""
+        # Streaming parser state, see feed()
+        self._rx = bytearray(_RX_SIZE)
+        self._rx_view = memoryview(self._rx)
+        self._sentence = bytearray(_MAX_SENTENCE)
+        self._fields = array("H", (0,) * (_MAX_FIELDS + 1))
+        self._state = _WAIT
+        self._length = 0
+        self._checksum = 0
+        self._expected = 0
+        self._field_count = 0
+        self._utc_key = None
+        self.sentences = 0
+        """Sentences parsed by feed() and update_stream()"""
+        self.checksum_errors = 0
+        """Sentences dropped by feed() for a bad checksum or overflow"""
+        self._ubx_header = bytearray(4)
+        self._ubx_payload = bytearray(_UBX_MAX_PAYLOAD)
+        self._ubx_length = 0
+        self._ubx_position = 0
+        self._ck_a = 0
+        self._ck_b = 0
+        self._ck_a_ok = False
+        self.velocity_north = None
+        """North velocity in m/s (UBX NAV-PVT)"""
+        self.velocity_east = None
+        """East velocity in m/s (UBX NAV-PVT)"""
+        self.velocity_down = None
+        """Down velocity in m/s, positive when descending (UBX NAV-PVT)"""
+        self.horizontal_accuracy = None
+        """Estimated horizontal accuracy in m (UBX NAV-PVT)"""
+        self.vertical_accuracy = None
+        """Estimated vertical accuracy in m (UBX NAV-PVT)"""
+        self.ubx_ack = None
+        """(class, id, acknowledged) of the last UBX ACK-ACK or ACK-NAK"""
 
     def update(self) -> bool:
         """Check for updated data from the GPS module and process it
@@ -384,6 +492,513 @@ class GPS:
 
         return result
 
+    def update_stream(self) -> int:
+        """Read everything waiting in the UART and parse it with feed().
+        Returns the number of sentences parsed. Unlike update() this handles
+        every buffered sentence in one call, and needs no UART timeout.
+        """
+        count = 0
+        waiting = self.in_waiting
+        while waiting > 0:
+            read = self._readinto(min(waiting, _RX_SIZE))
+            if not read:
+                break
+            count += self.feed(self._rx, read)
+            waiting -= read
+        return count
+
+    def _readinto(self, num_bytes: int) -> int:
+        return self._uart.readinto(self._rx_view[:num_bytes]) or 0
+
+    def feed(self, data: ReadableBuffer, length: Optional[int] = None) -> int:
+        """Parse the first length bytes of data, which may start or end
+        anywhere in a sentence; the rest is kept for the next call. The
+        checksum is checked on the bytes, and GGA, RMC and VTG fields are
+        decoded in place into the numeric attributes without allocating.
+        Other sentences are handed to the same parsers as update(). UBX
+        binary frames may be mixed in with the NMEA, see ubx_enable_nav_pvt().
+        Returns the number of sentences and frames parsed.
+
+        nmea_sentence is not updated by this path unless debug is set.
+        """
+        if length is None:
+            length = len(data)
+        count = 0
+        sentence = self._sentence
+        fields = self._fields
+        state = self._state
+        position = self._length
+        checksum = self._checksum
+        field = self._field_count
+        for i in range(length):
+            char = data[i]
+            if state == _BODY and 0x2C < char < 0x7F and position < _MAX_SENTENCE:
+                # Most bytes: inside a sentence, not '*', ',', '$' or control
+                sentence[position] = char
+                position += 1
+                checksum ^= char
+            elif state > _UBX_SYNC or (state == _UBX_SYNC and char == 0x62):
+                # Inside a UBX frame any byte value is data, '$' included
+                state = self._ubx_byte(char, state)
+                if state == _UBX_FRAME:
+                    state = _WAIT
+                    count += 1
+            elif char == 0x24:  # '$' always starts a new sentence
+                state = _BODY
+                position = 0
+                checksum = 0
+                field = 0
+            elif char == 0xB5:  # UBX sync, never part of a NMEA sentence
+                state = _UBX_SYNC
+            elif state == _BODY:
+                if char == 0x2A:  # '*'
+                    state = _CHECK_HIGH
+                elif char < 0x20 or char > 0x7E or position == _MAX_SENTENCE:
+                    state = _WAIT  # Garbage or overlong, drop it
+                    self.checksum_errors += 1
+                else:
+                    if char == 0x2C:  # ','
+                        if field < _MAX_FIELDS - 1:
+                            field += 1
+                            fields[field] = position + 1
+                        else:
+                            state = _WAIT
+                            self.checksum_errors += 1
+                            continue
+                    sentence[position] = char
+                    position += 1
+                    checksum ^= char
+            elif state == _CHECK_HIGH:
+                digit = _hex_digit(char)
+                self._expected = digit << 4
+                state = _CHECK_LOW if digit >= 0 else _WAIT
+            elif state == _CHECK_LOW:
+                state = _WAIT
+                digit = _hex_digit(char)
+                if digit >= 0 and self._expected | digit == checksum:
+                    if self._dispatch(position, field):
+                        count += 1
+                else:
+                    self.checksum_errors += 1
+            elif state == _UBX_SYNC:
+                state = _WAIT  # 0xB5 without 0x62
+        self._state = state
+        self._length = position
+        self._checksum = checksum
+        self._field_count = field
+        self.sentences += count
+        return count
+
+    def _dispatch(self, length: int, count: int) -> bool:
+        # Parse a checksummed sentence of count comma-separated fields.
+        buf = self._sentence
+        fields = self._fields
+        fields[count + 1] = length + 1
+        if self.debug:
+            self._raw_sentence = "$" + str(buf[:length], "ascii")
+            print(self._raw_sentence)
+        if fields[1] < 6:
+            return False
+        if buf[0] != 0x47 or buf[1] not in b"ABILPQN":  # G plus a GNSS talker
+            return True  # Not a GNSS sentence; accept it like update() does
+        kind = buf[2] << 16 | buf[3] << 8 | buf[4]
+        try:
+            if kind == 0x474741:  # GGA
+                return count == 14 and self._stream_gga()
+            if kind == 0x524D43:  # RMC
+                return count in (12, 13) and self._stream_rmc()
+            if kind == 0x565447:  # VTG
+                return count == 9 and self._stream_vtg()
+        except (ValueError, IndexError):
+            return False
+        if kind in (0x475356, 0x475341, 0x474C4C):  # GSV, GSA, GLL
+            args = str(buf[fields[1] : length], "ascii").split(",")
+            talker = bytes(buf[0:2])
+            if kind == 0x475356:
+                return self._parse_gsv(talker, args)
+            if kind == 0x475341:
+                return self._parse_gsa(talker, args)
+            return self._parse_gll(args)
+        return True
+
+    # Field index counts from 1 after the sentence type; field i spans
+    # _fields[i] up to _fields[i + 1] - 1, the comma.
+    def _stream_float(self, index: int) -> Optional[float]:
+        fields = self._fields
+        return _field_float(self._sentence, fields[index], fields[index + 1] - 1)
+
+    def _stream_int(self, index: int) -> Optional[int]:
+        fields = self._fields
+        return _field_int(self._sentence, fields[index], fields[index + 1] - 1)
+
+    def _stream_char(self, index: int) -> int:
+        # The single character in a field, or 0 if it is empty.
+        start = self._fields[index]
+        return self._sentence[start] if self._fields[index + 1] - 1 > start else 0
+
+    def _stream_mode(self, index: int) -> None:
+        # FAA mode indicator, a single character or None, as update() keeps it.
+        mode = self._stream_char(index)
+        self._mode_indicator = chr(mode) if mode else None
+
+    def _stream_position(self, index: int) -> None:
+        # Latitude and longitude from ddmm.mmmm,N,dddmm.mmmm,E at index.
+        buf = self._sentence
+        fields = self._fields
+        for axis in (0, 1):
+            start = fields[index + axis * 2]
+            end = fields[index + axis * 2 + 1] - 1
+            if start >= end:
+                raise ValueError("GPS: empty position")
+            dot = start
+            while dot < end and buf[dot] != 0x2E:
+                dot += 1
+            whole = _field_int(buf, start, dot)
+            minutes = whole % 100 + (
+                _field_float(buf, dot, end) if dot + 1 < end else 0.0
+            )
+            degrees = whole // 100
+            hemisphere = self._stream_char(index + axis * 2 + 1) | 0x20
+            if hemisphere in (0x73, 0x77):  # 's', 'w'
+                degrees = -degrees
+                value = degrees - minutes / 60
+            else:
+                value = degrees + minutes / 60
+            if axis:
+                self.longitude = value
+                self.longitude_degrees = degrees
+                self.longitude_minutes = minutes
+            else:
+                self.latitude = value
+                self.latitude_degrees = degrees
+                self.latitude_minutes = minutes
+
+    def _stream_time(self, index: int, date_index: Optional[int] = None) -> None:
+        # Update timestamp_utc from hhmmss.sss (and ddmmyy), only allocating a
+        # new struct_time when the second changes.
+        buf = self._sentence
+        fields = self._fields
+        start = fields[index]
+        if fields[index + 1] - 1 - start < 6:
+            return
+        clock = _field_int(buf, start, start + 6)
+        date = None
+        if date_index is not None:
+            start = fields[date_index]
+            if fields[date_index + 1] - 1 - start == 6:
+                date = _field_int(buf, start, start + 6)
+        key = clock if date is None else date * 1000000 + clock
+        if key == self._utc_key:
+            return
+        self._utc_key = key
+        if date is None:
+            if self.timestamp_utc is None:
+                day, month, year = 0, 0, 0
+            else:
+                day = self.timestamp_utc.tm_mday
+                month = self.timestamp_utc.tm_mon
+                year = self.timestamp_utc.tm_year
+        else:
+            day = date // 10000
+            month = date // 100 % 100
+            year = 2000 + date % 100
+        self.timestamp_utc = time.struct_time(
+            (year, month, day, clock // 10000, clock // 100 % 100, clock % 100, 0, 0, -1)
+        )
+
+    def _stream_gga(self) -> bool:
+        fields = self._fields
+        if fields[4] - fields[3] != 2 or fields[6] - fields[5] != 2:
+            # No hemispheres, as sent before a fix: update() rejects these
+            # and leaves the other fields alone.
+            self.fix_quality = 0
+            return False
+        quality = self._stream_int(6)
+        if quality is None:
+            self.fix_quality = 0
+            return False
+        self._stream_time(1)
+        self.fix_quality = quality
+        if quality:
+            self._stream_position(2)
+        self.satellites = self._stream_int(7)
+        self.horizontal_dilution = self._stream_float(8)
+        self.altitude_m = self._stream_float(9)
+        self.height_geoid = self._stream_float(11)
+        return True
+
+    def _stream_rmc(self) -> bool:
+        status = self._stream_char(2)
+        self._stream_time(1, 9)
+        if status == 0x41:  # 'A'
+            self.isactivedata = "A"
+            if self.fix_quality == 0:
+                self.fix_quality = 1
+            self._stream_position(3)
+        else:
+            self.isactivedata = "V"
+            self.fix_quality = 0
+        self.speed_knots = self._stream_float(7)
+        self.track_angle_deg = self._stream_float(8)
+        fields = self._fields
+        start = fields[10]
+        end = fields[11] - 1
+        direction = self._stream_char(11)
+        variation = None
+        if end > start and direction:
+            # Rare, so parsed from text the way update() does it
+            degrees = _parse_degrees(str(self._sentence[start:end], "ascii"))
+            if degrees is not None:
+                variation = _read_degrees((degrees, chr(direction)), 0, "w")
+        self._magnetic_variation = variation
+        self._stream_mode(12)
+        return True
+
+    def _stream_vtg(self) -> bool:
+        self.track_angle_deg = self._stream_float(1)
+        self.speed_knots = self._stream_float(5)
+        self.speed_kmh = self._stream_float(7)
+        self._stream_mode(9)
+        return True
+
+    def _ubx_byte(self, char: int, state: int) -> int:
+        # Advance the UBX frame state machine by one byte past the first sync.
+        if state == _UBX_PAYLOAD:  # Most bytes
+            ck_a = (self._ck_a + char) & 0xFF
+            self._ck_a = ck_a
+            self._ck_b = (self._ck_b + ck_a) & 0xFF
+            position = self._ubx_position
+            # Frames longer than the buffer are checksummed but truncated
+            if position < _UBX_MAX_PAYLOAD:
+                self._ubx_payload[position] = char
+            position += 1
+            self._ubx_position = position
+            return _UBX_CK_A if position == self._ubx_length else state
+        if state == _UBX_SYNC:
+            self._ubx_position = 0
+            self._ck_a = 0
+            self._ck_b = 0
+            return _UBX_HEADER
+        if state == _UBX_CK_A:
+            self._ck_a_ok = char == self._ck_a
+            return _UBX_CK_B
+        if state == _UBX_CK_B:
+            if self._ck_a_ok and char == self._ck_b:
+                return _UBX_FRAME if self._dispatch_ubx() else _WAIT
+            self.checksum_errors += 1
+            return _WAIT
+        # Header: class, id and length
+        ck_a = (self._ck_a + char) & 0xFF
+        self._ck_a = ck_a
+        self._ck_b = (self._ck_b + ck_a) & 0xFF
+        position = self._ubx_position
+        header = self._ubx_header
+        header[position] = char
+        if position < 3:
+            self._ubx_position = position + 1
+            return state
+        self._ubx_length = header[2] | header[3] << 8
+        self._ubx_position = 0
+        if self._ubx_length > _UBX_MAX_LENGTH:
+            self.checksum_errors += 1
+            return _WAIT
+        return _UBX_PAYLOAD if self._ubx_length else _UBX_CK_A
+
+    def _dispatch_ubx(self) -> bool:
+        # Parse a checksummed UBX frame.
+        msg_class, msg_id = self._ubx_header[0], self._ubx_header[1]
+        payload = self._ubx_payload
+        if self.debug:
+            print("UBX", hex(msg_class), hex(msg_id), self._ubx_length)
+        if msg_class == 0x01 and msg_id == 0x07:  # NAV-PVT
+            return self._ubx_length == _UBX_NAV_PVT_LENGTH and self._ubx_nav_pvt()
+        if msg_class == 0x05 and self._ubx_length == 2:  # ACK-ACK, ACK-NAK
+            self.ubx_ack = (payload[0], payload[1], msg_id == 0x01)
+        return True
+
+    def _ubx_nav_pvt(self) -> bool:
+        (
+            _,  # iTOW
+            year,
+            month,
+            day,
+            hour,
+            minute,
+            second,
+            valid,
+            _,  # tAcc
+            _,  # nano
+            fix_type,
+            flags,
+            _,  # flags2
+            satellites,
+            longitude,
+            latitude,
+            _,  # height above ellipsoid
+            height_msl,
+            horizontal_accuracy,
+            vertical_accuracy,
+            velocity_north,
+            velocity_east,
+            velocity_down,
+            ground_speed,
+            heading,
+            _,  # sAcc
+            _,  # headAcc
+            pdop,
+        ) = struct.unpack_from(_UBX_NAV_PVT_FORMAT, self._ubx_payload)
+        if valid & 0x03 == 0x03:  # validDate and validTime
+            key = ((year * 100 + month) * 100 + day) * 1000000 + (
+                (hour * 100 + minute) * 100 + second
+            )
+            if key != self._utc_key:
+                self._utc_key = key
+                self.timestamp_utc = time.struct_time(
+                    (year, month, day, hour, minute, second, 0, 0, -1)
+                )
+        self.satellites = satellites
+        self.pdop = pdop / 100
+        # fixType 2 and 3 are 2D and 3D, as in GSA; 1 is dead reckoning only
+        self.fix_quality_3d = fix_type if fix_type in (2, 3) else 1
+        if not flags & 0x01:  # gnssFixOK
+            self.fix_quality = 0
+            self.isactivedata = "V"
+            return True
+        self.fix_quality = 6 if fix_type in (1, 4) else 1
+        self.isactivedata = "A"
+        self.latitude = latitude / 10000000
+        self.longitude = longitude / 10000000
+        for axis, value in ((0, self.latitude), (1, self.longitude)):
+            degrees = int(value)
+            minutes = abs(value - degrees) * 60
+            if axis:
+                self.longitude_degrees = degrees
+                self.longitude_minutes = minutes
+            else:
+                self.latitude_degrees = degrees
+                self.latitude_minutes = minutes
+        self.altitude_m = height_msl / 1000
+        self.horizontal_accuracy = horizontal_accuracy / 1000
+        self.vertical_accuracy = vertical_accuracy / 1000
+        self.velocity_north = velocity_north / 1000
+        self.velocity_east = velocity_east / 1000
+        self.velocity_down = velocity_down / 1000
+        self.speed_knots = ground_speed / 1000 * _MS_TO_KNOTS
+        self.speed_kmh = ground_speed * 0.0036
+        self.track_angle_deg = heading / 100000
+        return True
+
+    def send_ubx(
+        self, msg_class: int, msg_id: int, payload: ReadableBuffer = b""
+    ) -> None:
+        """Send a UBX binary message to a u-blox receiver, adding the sync
+        characters, length and checksum."""
+        header = bytearray(
+            (0xB5, 0x62, msg_class, msg_id, len(payload) & 0xFF, len(payload) >> 8)
+        )
+        ck_a = ck_b = 0
+        for part in (header[2:], payload):
+            for char in part:
+                ck_a = (ck_a + char) & 0xFF
+                ck_b = (ck_b + ck_a) & 0xFF
+        self.write(header)
+        if payload:
+            self.write(payload)
+        self.write(bytes((ck_a, ck_b)))
+
+    def ubx_configure_port(
+        self, baudrate: int = 115200, *, nmea: bool = False, port: int = 1
+    ) -> None:
+        """Set the baud rate and output protocols of a u-blox UART port
+        (CFG-PRT). With nmea False only UBX frames are sent. Change the
+        baudrate of the UART to match afterwards."""
+        self.send_ubx(
+            0x06,
+            0x00,
+            struct.pack(
+                "<BBHIIHHHH",
+                port,
+                0,
+                0,
+                0x08D0,  # 8 data bits, no parity, 1 stop bit
+                baudrate,
+                0x0003,  # Accept UBX and NMEA input
+                0x0003 if nmea else 0x0001,
+                0,
+                0,
+            ),
+        )
+
+    def ubx_set_rate(self, period_ms: int) -> None:
+        """Set the u-blox measurement period in milliseconds (CFG-RATE):
+        100 for 10 Hz, 40 for 25 Hz where the module supports it."""
+        self.send_ubx(0x06, 0x08, struct.pack("<HHH", period_ms, 1, 1))
+
+    def ubx_set_message_rate(self, msg_class: int, msg_id: int, rate: int) -> None:
+        """Output a UBX or NMEA message once every rate solutions on the
+        current port, or never with rate 0 (CFG-MSG)."""
+        self.send_ubx(0x06, 0x01, bytes((msg_class, msg_id, rate)))
+
+    def ubx_enable_nav_pvt(
+        self, period_ms: int = 100, baudrate: Optional[int] = 115200
+    ) -> None:
+        """Switch a u-blox receiver to binary NAV-PVT output every period_ms
+        with no NMEA, so each solution is one 100 byte frame. Parse it with
+        update_stream() or feed(); update() only reads NMEA. If baudrate is
+        given the port and the UART are both moved to it first."""
+        if baudrate is not None:
+            self.ubx_configure_port(baudrate)
+            self._follow_baudrate(baudrate)
+        self.ubx_set_message_rate(0x01, 0x07, 1)
+        self.ubx_set_rate(period_ms)
+
+    def _follow_baudrate(self, baudrate: int) -> None:
+        # Let the command go out at the old rate, then switch the UART.
+        if self._uart is not None:
+            time.sleep(0.1)
+            self._uart.baudrate = baudrate
+            time.sleep(0.1)
+
+    def pmtk_set_output(
+        self,
+        *,
+        gll: int = 0,
+        rmc: int = 1,
+        vtg: int = 0,
+        gga: int = 1,
+        gsa: int = 0,
+        gsv: int = 0,
+    ) -> None:
+        """Choose which sentences an MTK receiver outputs and how often, in
+        fixes per sentence (PMTK314). The default of RMC and GGA alone is the
+        least that gives position, altitude, speed and time."""
+        self.send_command(
+            bytes(
+                "PMTK314,%d,%d,%d,%d,%d,%d,0,0,0,0,0,0,0,0,0,0,0,0,0"
+                % (gll, rmc, vtg, gga, gsa, gsv),
+                "ascii",
+            )
+        )
+
+    def pmtk_set_update_rate(self, period_ms: int) -> None:
+        """Set the MTK fix interval in milliseconds (PMTK220); 100, or 10 Hz,
+        is the fastest an MTK3339 supports."""
+        self.send_command(bytes("PMTK220,%d" % period_ms, "ascii"))
+
+    def pmtk_set_baudrate(self, baudrate: int) -> None:
+        """Set the MTK UART baud rate (PMTK251). Change the baudrate of the
+        UART to match afterwards."""
+        self.send_command(bytes("PMTK251,%d" % baudrate, "ascii"))
+
+    def pmtk_high_rate(self, period_ms: int = 100, baudrate: int = 115200) -> None:
+        """Set an MTK receiver up for high rate fixes: RMC and GGA only, every
+        period_ms, with the receiver and the UART moved to baudrate. At 10 Hz
+        these need about 1500 bytes a second, more than 9600 baud carries."""
+        self.pmtk_set_output()
+        self.pmtk_set_baudrate(baudrate)
+        self._follow_baudrate(baudrate)
+        self.pmtk_set_update_rate(period_ms)
+
     def send_command(self, command: bytes, add_checksum: bool = True) -> None:
         """Send a command string to the GPS.  If add_checksum is True (the
         default) a NMEA checksum will automatically be computed and added.
@@ -822,6 +1437,12 @@ class GPS_GtopI2C(GPS):
         with self._i2c as i2c:
             i2c.write(bytestr)
 
+    def _readinto(self, num_bytes: int) -> int:
+        # Burst read; the newline padding sent when idle is skipped by feed().
+        with self._i2c as i2c:
+            i2c.readinto(self._rx, end=num_bytes)
+        return num_bytes
+
     @property
     def in_waiting(self) -> Literal[16]:
         """Returns number of bytes available in UART read buffer, always 16
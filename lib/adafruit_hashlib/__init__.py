@@ -30,8 +30,7 @@ except ImportError:
 
 
 try:
-    from hashlib import md5, sha1, sha224, sha256, sha512
-    from hashlib import sha3_384 as sha384
+    from hashlib import md5, sha1, sha224, sha256, sha384, sha512
 except ImportError:
     from adafruit_hashlib._sha256 import sha224, sha256
     from adafruit_hashlib._sha512 import sha384, sha512
@@ -58,6 +57,30 @@ def new(algo, data: Optional[bytes] = b"") -> Union[md5, sha1, sha224, sha256, s
         raise ValueError(algo) from err
 
 
+def update_from_file(hash_object, stream, buffer_size: int = 4096):
+    """Updates a hash object with the rest of a binary stream, such as a file
+    opened with ``"rb"``, read into a single buffer of ``buffer_size``
+    bytes. Works with the built-in hash objects as well as this library's.
+    Returns the hash object.
+
+    .. code-block:: python
+
+        with open("/sd/flight.bin", "rb") as log:
+            print(adafruit_hashlib.update_from_file(sha256(), log).hexdigest())
+
+    :param hash_object: The hash object to update
+    :param stream: Any stream that implements ``readinto()``
+    :param int buffer_size: Bytes read at a time
+    """
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    while True:
+        count = stream.readinto(buffer)
+        if not count:
+            return hash_object
+        hash_object.update(view[:count])
+
+
 @property
 def algorithms_available() -> List[str]:
     """Returns a list containing the names of the hash
@@ -0,0 +1,115 @@
+# SPDX-FileCopyrightText: 2017 Paul Sokolovsky
+# SPDX-FileCopyrightText: 2019 Brent Rubell for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`_blockhash.py`
+======================================================
+Buffering, padding and digest output shared by the Merkle-Damgard hashes
+(MD5, SHA-1 and SHA-2). Subclasses only provide the compression function.
+
+Input is consumed through a `memoryview`: whole blocks are compressed straight
+from the caller's buffer and only a partial block is copied, into a buffer
+allocated once per hash object. The chaining state is an `array` of words.
+"""
+
+import struct
+from array import array
+from binascii import hexlify
+
+try:
+    from typing import Optional, Union
+    from circuitpython_typing import ReadableBuffer
+except ImportError:
+    # suppress because typing does not exist on circuitpython
+    pass
+
+
+# pylint: disable=protected-access
+class BlockHash:
+    """Base class of the pure Python hash objects.
+
+    :param bytes data: Optional data to process
+    """
+
+    block_size = 64
+    digest_size = 32
+    name = ""
+    # array typecode of the state words, the words the state starts as, the
+    # struct format that serializes them and the size and byte order of the
+    # bit length in the final block
+    _typecode = "I"
+    _initial = ()
+    _digest_format = ""
+    _length_size = 8
+    _byteorder = "big"
+
+    def __init__(self, data: Optional[Union[str, ReadableBuffer]] = None) -> None:
+        self._state = array(self._typecode, self._initial)
+        self._buffer = bytearray(self.block_size)
+        self._buffered = 0
+        self._length = 0
+        if data:
+            self.update(data)
+
+    def _compress(self, data: ReadableBuffer, offset: int) -> None:
+        """Compress the block at ``offset`` of ``data`` into the state."""
+        raise NotImplementedError()
+
+    def update(self, data: Union[str, ReadableBuffer]) -> None:
+        """Updates the hash object with a bytes-like object. Whole blocks are
+        hashed in place, without copying.
+
+        :param bytes data: bytes, bytearray, memoryview or ASCII str
+        """
+        if isinstance(data, str):
+            data = data.encode("ascii")
+        view = memoryview(data)
+        length = len(view)
+        self._length += length
+        block_size = self.block_size
+        position = 0
+        buffered = self._buffered
+        if buffered:
+            position = min(block_size - buffered, length)
+            self._buffer[buffered : buffered + position] = view[:position]
+            buffered += position
+            if buffered < block_size:
+                self._buffered = buffered
+                return
+            self._compress(self._buffer, 0)
+        compress = self._compress
+        while position + block_size <= length:
+            compress(view, position)
+            position += block_size
+        self._buffer[: length - position] = view[position:]
+        self._buffered = length - position
+
+    def copy(self) -> "BlockHash":
+        """Return a copy (“clone”) of the hash object."""
+        new = self.__class__()
+        new._state = array(self._typecode, self._state)
+        new._buffer[:] = self._buffer
+        new._buffered = self._buffered
+        new._length = self._length
+        return new
+
+    def digest(self) -> bytes:
+        """Returns the digest of the data passed to the update()
+        method so far."""
+        final = self.copy()
+        padding = (self.block_size - self._length_size - 1 - self._length) % (
+            self.block_size
+        )
+        bits = self._length * 8
+        final.update(
+            b"\x80" + bytes(padding) + bits.to_bytes(self._length_size, self._byteorder)
+        )
+        return struct.pack(self._digest_format, *final._state)[: self.digest_size]
+
+    def hexdigest(self) -> str:
+        """Like digest() except the digest is returned as a string object of
+        double length, containing only hexadecimal digits.
+        """
+        return hexlify(self.digest()).decode("ascii")
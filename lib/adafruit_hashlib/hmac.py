@@ -0,0 +1,141 @@
+# SPDX-FileCopyrightText: 2017 Paul Sokolovsky
+# SPDX-FileCopyrightText: 2019 Brent Rubell for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`adafruit_hashlib.hmac`
+======================================================
+Keyed-hashing for message authentication (HMAC, RFC 2104) over the hash
+objects of `adafruit_hashlib`, with the API of CPython's ``hmac`` module.
+
+.. code-block:: python
+
+    from adafruit_hashlib import hmac
+
+    tag = hmac.new(b"key", b"message", "sha256").hexdigest()
+"""
+
+from binascii import hexlify
+import adafruit_hashlib
+
+try:
+    from typing import Callable, Optional, Union
+    from circuitpython_typing import ReadableBuffer
+except ImportError:
+    # suppress because typing does not exist on circuitpython
+    pass
+
+
+def _constructor(digestmod: Union[str, Callable]) -> Callable:
+    """Return a hash constructor for a name or a constructor."""
+    if isinstance(digestmod, str):
+        if digestmod not in adafruit_hashlib.ALGOS_AVAIL:
+            raise ValueError(digestmod)
+        return getattr(adafruit_hashlib, digestmod)
+    if digestmod is None:
+        raise TypeError("Missing required parameter 'digestmod'.")
+    return digestmod
+
+
+def _keyed(key: ReadableBuffer, digest_cons: Callable) -> tuple:
+    """Return the inner and outer hash objects with the padded key hashed in."""
+    inner = digest_cons()
+    outer = digest_cons()
+    block_size = getattr(inner, "block_size", 64)
+    if len(key) > block_size:
+        key = digest_cons(key).digest()
+    key = bytes(key) + bytes(block_size - len(key))
+    inner.update(bytes(b ^ 0x36 for b in key))
+    outer.update(bytes(b ^ 0x5C for b in key))
+    return inner, outer
+
+
+class HMAC:
+    """RFC 2104 HMAC. The key is hashed into the inner and outer states once,
+    so the cost per message is that of the digest plus two extra blocks.
+
+    :param bytes key: The secret key
+    :param bytes msg: Optional data to process
+    :param digestmod: A hash name such as ``"sha256"`` or a constructor such
+        as `adafruit_hashlib.sha256`
+    """
+
+    def __init__(
+        self,
+        key: ReadableBuffer,
+        msg: Optional[ReadableBuffer] = None,
+        digestmod: Union[str, Callable] = None,
+    ) -> None:
+        self._inner, self._outer = _keyed(key, _constructor(digestmod))
+        self.digest_size = self._inner.digest_size
+        self.block_size = getattr(self._inner, "block_size", 64)
+        self.name = "hmac-" + getattr(self._inner, "name", "")
+        if msg is not None:
+            self.update(msg)
+
+    def update(self, msg: ReadableBuffer) -> None:
+        """Feed data into this hashing object."""
+        self._inner.update(msg)
+
+    def copy(self) -> "HMAC":
+        """Return a separate copy of this hashing object."""
+        new = self.__class__.__new__(self.__class__)
+        new.digest_size = self.digest_size
+        new.block_size = self.block_size
+        new.name = self.name
+        new._inner = self._inner.copy()  # pylint: disable=protected-access
+        new._outer = self._outer.copy()  # pylint: disable=protected-access
+        return new
+
+    def digest(self) -> bytes:
+        """Return the hash value of this hashing object. The object can still
+        be updated afterwards."""
+        outer = self._outer.copy()
+        outer.update(self._inner.copy().digest())
+        return outer.digest()
+
+    def hexdigest(self) -> str:
+        """Like digest(), but returns a string of hexadecimal digits."""
+        return hexlify(self.digest()).decode("ascii")
+
+
+def new(
+    key: ReadableBuffer,
+    msg: Optional[ReadableBuffer] = None,
+    digestmod: Union[str, Callable] = None,
+) -> HMAC:
+    """Create a new hashing object and return it.
+
+    :param bytes key: The secret key
+    :param bytes msg: Optional data to process
+    :param digestmod: A hash name or constructor
+    """
+    return HMAC(key, msg, digestmod)
+
+
+def digest(key: ReadableBuffer, msg: ReadableBuffer, digest: Union[str, Callable]):
+    """Return the HMAC of ``msg`` under ``key`` in one call. Unlike `HMAC`,
+    this works with hash objects that cannot be copied, such as those of
+    CircuitPython's ``hashlib``.
+
+    :param bytes key: The secret key
+    :param bytes msg: The data to authenticate
+    :param digest: A hash name or constructor
+    """
+    # pylint: disable=redefined-outer-name
+    inner, outer = _keyed(key, _constructor(digest))
+    inner.update(msg)
+    outer.update(inner.digest())
+    return outer.digest()
+
+
+def compare_digest(a: ReadableBuffer, b: ReadableBuffer) -> bool:
+    """Compare two digests in a time that depends on their length only, not on
+    where they first differ."""
+    result = len(a) ^ len(b)
+    if result:
+        b = a
+    for x, y in zip(a, b):
+        result |= x ^ y
+    return result == 0
@@ -0,0 +1,211 @@
+# SPDX-FileCopyrightText: 2017 Paul Sokolovsky
+# SPDX-FileCopyrightText: 2019 Brent Rubell for Adafruit Industries
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`adafruit_hashlib.merkle`
+======================================================
+Chunked Merkle-tree digest of a stream, built as the data arrives.
+
+The data is cut into fixed-size chunks (4 KB by default). Each chunk is hashed
+incrementally while it fills, into a leaf ``H(0x00 || chunk)``; leaves are
+paired into nodes ``H(0x01 || left || right)`` as soon as both exist, so only
+one partial subtree per level is held and the root costs a handful of node
+hashes at any time. Leaves can be streamed out to a file as they complete:
+checking a copy of the data later takes the chunk digests of the copy, and a
+corrupted chunk is found by comparing leaves, without a second pass to build
+the tree. The tree shape is that of RFC 6962: for ``n`` leaves the left
+subtree holds the largest power of two below ``n``.
+
+.. code-block:: python
+
+    from adafruit_hashlib.merkle import MerkleHash
+
+    tree = MerkleHash(leaf_stream=open("flight.tree", "wb"))
+    tree.update(block)  # as each block is written
+    root = tree.finish()
+"""
+
+from binascii import hexlify
+from adafruit_hashlib.hmac import _constructor
+
+try:
+    from typing import Callable, Iterable, Iterator, Optional, Union
+    from circuitpython_typing import ReadableBuffer
+except ImportError:
+    # suppress because typing does not exist on circuitpython
+    pass
+
+CHUNK_SIZE = 4096
+
+_LEAF = b"\x00"
+_NODE = b"\x01"
+
+
+class MerkleHash:
+    """Merkle-tree digest over fixed-size chunks of a stream.
+
+    :param int chunk_size: Bytes hashed into each leaf
+    :param digestmod: A hash name or constructor, SHA-256 by default
+    :param leaf_stream: Optional stream that each leaf digest is written to as
+        its chunk completes, such as a file opened with ``"wb"``
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = CHUNK_SIZE,
+        digestmod: Union[str, Callable] = "sha256",
+        leaf_stream=None,
+    ) -> None:
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self.chunk_size = chunk_size
+        self._digest_cons = _constructor(digestmod)
+        self._leaf_stream = leaf_stream
+        self._chunk = self._digest_cons(_LEAF)
+        self._filled = 0
+        # Roots of the complete subtrees, largest first; their sizes are the
+        # set bits of the leaf count
+        self._stack = []
+        self.chunks = 0
+        self.digest_size = self._chunk.digest_size
+
+    def _node(self, left: bytes, right: bytes) -> bytes:
+        node = self._digest_cons(_NODE)
+        node.update(left)
+        node.update(right)
+        return node.digest()
+
+    def add_leaf(self, leaf: bytes) -> None:
+        """Append the digest of a whole chunk and merge the subtrees it
+        completes."""
+        stack = self._stack
+        stack.append(leaf)
+        self.chunks += 1
+        count = self.chunks
+        while not count & 1:
+            right = stack.pop()
+            stack.append(self._node(stack.pop(), right))
+            count >>= 1
+        if self._leaf_stream is not None:
+            self._leaf_stream.write(leaf)
+
+    def update(self, data: ReadableBuffer) -> None:
+        """Hash data into the current chunk, completing leaves as chunks fill.
+
+        :param bytes data: bytes, bytearray or memoryview
+        """
+        view = memoryview(data)
+        length = len(view)
+        chunk_size = self.chunk_size
+        position = 0
+        while position < length:
+            take = min(chunk_size - self._filled, length - position)
+            self._chunk.update(view[position : position + take])
+            position += take
+            self._filled += take
+            if self._filled == chunk_size:
+                self.add_leaf(self._chunk.digest())
+                self._chunk = self._digest_cons(_LEAF)
+                self._filled = 0
+
+    def _fold(self, stack: list) -> bytes:
+        if not stack:
+            return self._digest_cons().digest()
+        root = stack[-1]
+        for index in range(len(stack) - 2, -1, -1):
+            root = self._node(stack[index], root)
+        return root
+
+    def digest(self) -> bytes:
+        """Return the root over the data so far, counting a partly filled last
+        chunk as a leaf. The tree can still be updated afterwards."""
+        stack = self._stack
+        if self._filled:
+            stack = stack + [self._chunk.digest()]
+        return self._fold(stack)
+
+    def hexdigest(self) -> str:
+        """Like digest(), but returns a string of hexadecimal digits."""
+        return hexlify(self.digest()).decode("ascii")
+
+    def finish(self) -> bytes:
+        """Close a partly filled last chunk as a leaf, writing it to the leaf
+        stream, and return the root. Call it once, after the last update."""
+        if self._filled:
+            self.add_leaf(self._chunk.digest())
+            self._chunk = self._digest_cons(_LEAF)
+            self._filled = 0
+        return self._fold(self._stack)
+
+
+def chunk_digests(
+    stream,
+    chunk_size: int = CHUNK_SIZE,
+    digestmod: Union[str, Callable] = "sha256",
+    buffer: Optional[bytearray] = None,
+) -> Iterator[bytes]:
+    """Yield the leaf digest of each chunk of the rest of a binary stream,
+    read with ``readinto()`` into one reused buffer. The last chunk may be
+    short.
+
+    :param stream: Any stream that implements ``readinto()``
+    :param int chunk_size: Bytes hashed into each leaf
+    :param digestmod: A hash name or constructor, SHA-256 by default
+    :param bytearray buffer: Optional buffer of ``chunk_size`` bytes to read into
+    """
+    digest_cons = _constructor(digestmod)
+    if buffer is None:
+        buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    while True:
+        filled = 0
+        while filled < chunk_size:
+            count = stream.readinto(view[filled:])
+            if not count:
+                break
+            filled += count
+        if not filled:
+            return
+        leaf = digest_cons(_LEAF)
+        leaf.update(view[:filled])
+        yield leaf.digest()
+        if filled < chunk_size:
+            return
+
+
+def merkle_root(
+    leaves: Iterable[bytes], digestmod: Union[str, Callable] = "sha256"
+) -> bytes:
+    """Return the root of the tree over a sequence of leaf digests.
+
+    :param leaves: Leaf digests, in chunk order
+    :param digestmod: A hash name or constructor, SHA-256 by default
+    """
+    tree = MerkleHash(digestmod=digestmod)
+    for leaf in leaves:
+        tree.add_leaf(leaf)
+    return tree.finish()
+
+
+def compare_leaves(expected: Iterable[bytes], actual: Iterable[bytes]) -> list:
+    """Return the indices of the chunks whose leaves differ, including chunks
+    present in only one of the two sequences.
+
+    :param expected: Leaf digests recorded when the data was written
+    :param actual: Leaf digests of the data as it is now
+    """
+    expected = iter(expected)
+    actual = iter(actual)
+    mismatched = []
+    index = 0
+    while True:
+        want = next(expected, None)
+        have = next(actual, None)
+        if want is None and have is None:
+            return mismatched
+        if want != have:
+            mismatched.append(index)
+        index += 1
+
@@ -60,11 +60,20 @@ Attributes
 import time
 import sys
 import os
+import struct
 from collections import namedtuple
 
+try:
+    from supervisor import ticks_ms as _ticks_ms
+except ImportError:
+
+    def _ticks_ms() -> int:
+        return (time.monotonic_ns() // 1000000) & (_TICKS_PERIOD - 1)
+
+
 try:
     # pylint: disable=deprecated-class
-    from typing import Optional, Hashable, Dict
+    from typing import Optional, Hashable, Dict, Iterator
     from typing_extensions import Protocol
 
     class WriteableStream(Protocol):
@@ -98,6 +107,12 @@ __all__ = [
     "Logger",
     "NullHandler",
     "FileHandler",
+    "RotatingFileHandler",
+    "MemoryHandler",
+    "BufferedFileHandler",
+    "BinaryHandler",
+    "readBinaryLog",
+    "expandBinaryLog",
     "LogRecord",
 ]
 
@@ -115,6 +130,16 @@ LEVELS = [
 for __value, __name in LEVELS:
     globals()[__name] = __value
 
+# Binary log records, see BinaryHandler
+_TICKS_PERIOD = 1 << 29  # supervisor.ticks_ms wraps around at this value
+_BINARY_HEADER = "<BBHI"
+_BINARY_HEADER_SIZE = 8
+_BINARY_TEXT = 0xFD
+_BINARY_DEFINE = 0xFE
+_BINARY_START = 0xFF
+_BINARY_MAX_ARGS = 16
+_BINARY_MAX_STRING = 32
+
 
 def _level_for(value: int) -> str:
     """Convert a numeric level to the most appropriate name.
@@ -138,7 +163,7 @@ be retrieved from it:
 - ``name`` - The name of the logger
 - ``levelno`` - The log level number
 - ``levelname`` - The log level name
-- ``msg`` - The log message
+- ``msg`` - The log message, before ``args`` are merged into it
 - ``created`` - When the log record was created
 - ``args`` - The additional positional arguments provided
 """
@@ -148,6 +173,31 @@ def _logRecordFactory(name, level, msg, args):
     return LogRecord(name, level, _level_for(level), msg, time.monotonic(), args)
 
 
+def _getMessage(record: LogRecord) -> str:
+    """The message of a record with its arguments merged in. This is only
+    done when the record is formatted, so a buffering handler pays for it at
+    flush time, and a record no handler formats never pays for it at all.
+
+    :param record: The record (message object) to be logged
+    """
+    return (record.msg % record.args) if record.args else record.msg
+
+
+def _recordSize(record: LogRecord) -> int:
+    """An estimate of the formatted size of a record in bytes, taken without
+    formatting it.
+
+    :param record: The record (message object) to be logged
+    """
+    msg = record.msg
+    if not isinstance(msg, str):
+        msg = str(msg)  # Any object can be the message, such as an exception
+    size = 32 + len(msg)  # Timestamp, level name and terminator
+    for arg in record.args:
+        size += len(arg) if isinstance(arg, str) else 8
+    return size
+
+
 class Formatter:
     """
     Responsible for converting a LogRecord to an output string to be
@@ -187,13 +237,13 @@ class Formatter:
         Format the given LogRecord into an output string
         """
         if self.fmt is None:
-            return record.msg
+            return _getMessage(record)
 
         vals = {
             "name": record.name,
             "levelno": record.levelno,
             "levelname": record.levelname,
-            "message": record.msg,
+            "message": _getMessage(record),
             "created": record.created,
             "args": record.args,
         }
@@ -242,7 +292,7 @@ class Handler:
         """
         if self.formatter:
             return self.formatter.format(record)
-        return f"{record.created:<0.3f}: {record.levelname} - {record.msg}"
+        return f"{record.created:<0.3f}: {record.levelname} - {_getMessage(record)}"
 
     def emit(self, record: LogRecord) -> None:
         """Send a message where it should go.
@@ -331,7 +381,14 @@ class FileHandler(StreamHandler):
 
         :param record: The record (message object) to be logged
         """
-        super().emit(record)
+        self._write(self.format(record) + self.terminator)
+
+    def _write(self, text: str) -> None:
+        """Write formatted text to the file and flush it.
+
+        :param str text: One or more formatted, terminated records
+        """
+        self.stream.write(text)
         self.stream.flush()
 
 
@@ -376,6 +433,9 @@ class RotatingFileHandler(FileHandler):
 
         # Open the file and save the handle to self.stream
         super().__init__(self._LogFileName, mode=self._WriteMode)
+        # The size is tracked as records are written, so the file only has
+        # to be stat'ed once, here, rather than before every record
+        self._LogFileSize = self.GetLogSize() or 0
 
     def doRollover(self) -> None:
         """Roll over the log files. This should not need to be called directly"""
@@ -406,6 +466,7 @@ class RotatingFileHandler(FileHandler):
         # Reopen the file.
         # pylint: disable=consider-using-with
         self.stream = open(self._LogFileName, mode=self._WriteMode)
+        self._LogFileSize = 0
 
     def GetLogSize(self) -> int:
         """Check the size of the log file."""
@@ -420,18 +481,394 @@ class RotatingFileHandler(FileHandler):
                 raise e
         return LogFileSize
 
-    def emit(self, record: LogRecord) -> None:
-        """Generate the message and write it to the file.
+    def _write(self, text: str) -> None:
+        """Roll the log over if it has reached maxBytes, then write formatted
+        text to it and flush it.
 
-        :param record: The record (message object) to be logged
+        :param str text: One or more formatted, terminated records
         """
         if (
-            (self.GetLogSize() >= self._maxBytes)
+            (self._LogFileSize >= self._maxBytes)
             and (self._maxBytes > 0)
             and (self._backupCount > 0)
         ):
             self.doRollover()
-        super().emit(record)
+        super()._write(text)
+        # Characters rather than bytes, which only differ for non-ASCII text
+        self._LogFileSize += len(text)
+
+
+class MemoryHandler(Handler):
+    """Handler that keeps records in RAM and passes them on to a target
+    handler in batches. Records are stored as they were logged and only
+    formatted by the target when the buffer is flushed.
+
+    The buffer is flushed when a record at or above ``flushLevel`` arrives,
+    when the buffered records would take more than ``capacity`` bytes once
+    formatted, and when a record arrives ``flushInterval`` seconds or more
+    after the last flush. Nothing flushes the buffer between records, so call
+    `flush` before anything that can lose power, such as a deployment.
+
+    Unlike CPython, ``capacity`` is a byte budget, estimated from the message
+    and argument sizes, rather than a number of records.
+
+    :param int capacity: Approximate number of bytes of formatted text to
+        buffer before flushing
+    :param int flushLevel: Records at or above this level are written out at
+        once, together with everything buffered before them; default is
+        ``ERROR``
+    :param Handler target: The handler to pass the records to; records are
+        buffered without limit while there is none
+    :param bool flushOnClose: Whether `close` flushes the buffer
+    :param float flushInterval: Seconds after which a new record flushes the
+        buffer, or ``None`` to only flush on level and capacity
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        capacity: int,
+        flushLevel: int = ERROR,
+        target: Optional[Handler] = None,
+        flushOnClose: bool = True,
+        flushInterval: Optional[float] = None,
+    ) -> None:
+        super().__init__()
+        self.capacity = capacity
+        self.flushLevel = flushLevel
+        self.target = target
+        self.flushOnClose = flushOnClose
+        self.flushInterval = flushInterval
+        self.buffer = []
+        """The records waiting to be flushed"""
+        self._bufferSize = 0
+        self._lastFlush = time.monotonic()
+
+    def setTarget(self, target: Handler) -> None:
+        """Set the handler buffered records are passed to.
+
+        :param Handler target: The handler to pass the records to
+        """
+        self.target = target
+
+    def shouldFlush(self, record: LogRecord) -> bool:
+        """Whether the buffer should be flushed after adding a record.
+
+        :param record: The record (message object) just buffered
+        """
+        if self.target is None:
+            return False
+        return (
+            record.levelno >= self.flushLevel
+            or self._bufferSize >= self.capacity
+            or (
+                self.flushInterval is not None
+                and record.created - self._lastFlush >= self.flushInterval
+            )
+        )
+
+    def emit(self, record: LogRecord) -> None:
+        """Buffer the record, and flush the buffer if `shouldFlush` says so.
+
+        :param record: The record (message object) to be logged
+        """
+        self.buffer.append(record)
+        self._bufferSize += _recordSize(record)
+        if self.shouldFlush(record):
+            self.flush()
+
+    def flush(self) -> None:
+        """Pass every buffered record to the target and flush it."""
+        if self.target is None:
+            return
+        if self.buffer:
+            self._flushRecords(self.buffer)
+        self.buffer = []
+        self._bufferSize = 0
+        self._lastFlush = time.monotonic()
+
+    def _flushRecords(self, records: list) -> None:
+        """Pass a batch of records to the target.
+
+        :param list records: The buffered records, oldest first
+        """
+        for record in records:
+            if record.levelno >= self.target.level:
+                self.target.emit(record)
+        self.target.flush()
+
+    def close(self) -> None:
+        """Flush the buffer if ``flushOnClose`` is set, and drop the target."""
+        if self.flushOnClose:
+            self.flush()
+        self.buffer = []
+        self._bufferSize = 0
+        self.target = None
+
+
+class BufferedFileHandler(MemoryHandler):
+    """File handler for logging from time critical code, such as a flight loop,
+    to an SD card or flash. Records are kept in RAM and written to the file in
+    batches, formatted into a single write followed by a single flush, so the
+    filesystem is touched once per batch rather than once per record. When
+    rotation is enabled, the file size is tracked in RAM as well.
+
+    See `MemoryHandler` for when the buffer is flushed; records still in RAM
+    are lost on a reset, so keep ``flushInterval`` short enough for that to be
+    acceptable and call `close` when logging ends.
+
+    :param str filename: The filename of the log file
+    :param str mode: Whether to write ('w') or append ('a'); default is to append
+    :param int capacity: Approximate number of bytes of formatted text to
+        buffer before writing
+    :param int flushLevel: Records at or above this level are written out at
+        once; default is ``ERROR``
+    :param float flushInterval: Seconds after which a new record writes the
+        buffer out, or ``None`` to only write on level and capacity
+    :param int maxBytes: The max allowable size of the log file in bytes, see
+        `RotatingFileHandler`
+    :param int backupCount: The number of old log files to keep
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        filename: str,
+        mode: str = "a",
+        capacity: int = 4096,
+        flushLevel: int = ERROR,
+        flushInterval: Optional[float] = 5.0,
+        maxBytes: int = 0,
+        backupCount: int = 0,
+    ) -> None:
+        super().__init__(
+            capacity,
+            flushLevel,
+            RotatingFileHandler(filename, mode, maxBytes, backupCount),
+            True,
+            flushInterval,
+        )
+
+    def setFormatter(self, formatter: Formatter) -> None:
+        """
+        Set the Formatter to be used when the records are written out.
+        """
+        self.formatter = formatter
+        self.target.setFormatter(formatter)
+
+    def _flushRecords(self, records: list) -> None:
+        """Format a batch of records and write them to the file at once.
+
+        :param list records: The buffered records, oldest first
+        """
+        target = self.target
+        terminator = target.terminator
+        target._write(  # pylint: disable=protected-access
+            "".join([target.format(record) + terminator for record in records])
+        )
+
+    def close(self) -> None:
+        """Write out the buffer and close the file."""
+        target = self.target
+        super().close()
+        target.close()
+
+
+class BinaryHandler(Handler):
+    """Handler that logs compact binary records instead of text, for high rate
+    logging to an SD card or flash. Nothing is formatted when a message is
+    logged: a record holds the level, the ``ticks_ms`` value, a message ID and
+    the raw arguments, packed into a buffer allocated once. Use
+    `expandBinaryLog` to turn a log back into text, offline.
+
+    Each message string gets an ID the first time it is logged, and its text
+    is written to the log once, at that point. Log with constant message
+    strings and pass the changing values as arguments, as in
+    ``logger.debug("alt %f vel %f", altitude, velocity)``: each such record
+    takes 8 bytes plus 5 per number. Once ``maxMessages`` IDs are taken,
+    further new messages are written as text records, so messages built at
+    run time, such as exceptions, cannot grow the table without bound.
+
+    Integer and float arguments are stored as they are, floats in single
+    precision; any other argument is stored as text, cut to 32 bytes. At most
+    16 arguments are kept. A message that is not a string, such as an
+    exception, is logged as its ``str()``. Logger names are not stored.
+
+    Every handler starts its output with a start record, so several runs
+    appended to the same file expand correctly.
+
+    :param stream: A binary stream to log to, such as a file opened with
+        mode ``"ab"``; anything that implements ``stream.write()`` with bytes
+    :param int maxMessages: The number of message strings given an ID
+    """
+
+    def __init__(self, stream, maxMessages: int = 256) -> None:
+        super().__init__()
+        self.stream = stream
+        """The stream to log to"""
+        self.maxMessages = maxMessages
+        self._ids = {}
+        self._buffer = bytearray(
+            _BINARY_HEADER_SIZE
+            + _BINARY_MAX_ARGS * (2 + max(8, _BINARY_MAX_STRING))
+        )
+        self._view = memoryview(self._buffer)
+        struct.pack_into(
+            _BINARY_HEADER, self._buffer, 0, _BINARY_START, 1, 0, _ticks_ms()
+        )
+        stream.write(self._view[:_BINARY_HEADER_SIZE])
+
+    def _writeText(self, kind: int, value: int, text: str) -> None:
+        data = text.encode()[:0xFFFF]
+        self.stream.write(
+            struct.pack(_BINARY_HEADER, kind, value, len(data), _ticks_ms())
+        )
+        self.stream.write(data)
+
+    def emit(self, record: LogRecord) -> None:
+        """Pack the record and write it to the stream.
+
+        :param record: The record (message object) to be logged
+        """
+        msg = str(record.msg)
+        msgId = self._ids.get(msg)
+        if msgId is None:
+            msgId = len(self._ids)
+            if msgId >= self.maxMessages:
+                self._writeText(
+                    _BINARY_TEXT, record.levelno, str(_getMessage(record))
+                )
+                return
+            self._ids[msg] = msgId
+            self._writeText(_BINARY_DEFINE, 0, msg)
+        buf = self._buffer
+        position = _BINARY_HEADER_SIZE
+        count = 0
+        for arg in record.args:
+            if count == _BINARY_MAX_ARGS:
+                break
+            count += 1
+            if isinstance(arg, float):
+                buf[position] = 0x66  # f
+                struct.pack_into("<f", buf, position + 1, arg)
+                position += 5
+            elif isinstance(arg, int) and -0x80000000 <= arg <= 0x7FFFFFFF:
+                buf[position] = 0x69  # i
+                struct.pack_into("<i", buf, position + 1, arg)
+                position += 5
+            elif isinstance(arg, int) and -(1 << 63) <= arg < 1 << 63:
+                buf[position] = 0x71  # q
+                struct.pack_into("<q", buf, position + 1, arg)
+                position += 9
+            else:
+                data = str(arg).encode()[:_BINARY_MAX_STRING]
+                buf[position] = 0x73  # s
+                buf[position + 1] = len(data)
+                position += 2
+                buf[position : position + len(data)] = data
+                position += len(data)
+        struct.pack_into(
+            _BINARY_HEADER, buf, 0, record.levelno, count, msgId, _ticks_ms()
+        )
+        self.stream.write(self._view[:position])
+
+    def flush(self) -> None:
+        """Flush the stream."""
+        self.stream.flush()
+
+    def close(self) -> None:
+        """Flush and close the stream."""
+        self.stream.flush()
+        self.stream.close()
+
+
+def readBinaryLog(data: bytes) -> Iterator[LogRecord]:
+    """Decode a log written by `BinaryHandler` into `LogRecord` objects.
+
+    ``created`` is in seconds since the ``ticks_ms`` origin of the record's
+    run, unwrapped assuming records are less than three days apart. ``name``
+    is empty, as logger names are not stored. A truncated record at the end of
+    the data, as left by a reset during a write, is ignored. String arguments
+    are cut to 32 bytes when logged, which can split a character; the broken
+    character decodes as U+FFFD.
+
+    :param bytes data: The contents of the log
+    """
+    messages = {}
+    position = 0
+    previous = None
+    offset = 0
+    end = len(data)
+    while position + _BINARY_HEADER_SIZE <= end:
+        kind, value, msgId, ticks = struct.unpack_from(_BINARY_HEADER, data, position)
+        position += _BINARY_HEADER_SIZE
+        if kind == _BINARY_START:
+            # A new run, appended to the log, with its own ticks origin
+            messages = {}
+            previous = None
+            offset = 0
+        if previous is not None and ticks < previous:
+            offset += _TICKS_PERIOD
+        previous = ticks
+        created = (ticks + offset) / 1000
+        if kind == _BINARY_START:
+            continue
+        if kind in (_BINARY_DEFINE, _BINARY_TEXT):
+            if position + msgId > end:
+                return
+            text = bytes(data[position : position + msgId]).decode(errors="replace")
+            position += msgId
+            if kind == _BINARY_DEFINE:
+                messages[len(messages)] = text
+            else:
+                yield LogRecord("", value, _level_for(value), text, created, ())
+            continue
+        args = []
+        for _ in range(value):
+            if position + 2 > end:
+                return
+            code = data[position]
+            if code == 0x73:  # s
+                length = data[position + 1]
+                text = bytes(data[position + 2 : position + 2 + length])
+                args.append(text.decode(errors="replace"))
+                position += 2 + length
+            elif code == 0x71:  # q
+                args.append(struct.unpack_from("<q", data, position + 1)[0])
+                position += 9
+            else:
+                number = "<f" if code == 0x66 else "<i"
+                args.append(struct.unpack_from(number, data, position + 1)[0])
+                position += 5
+        if position > end:
+            return
+        args = tuple(args)
+        msg = messages.get(msgId)
+        if msg is None:
+            # The start of the log, with the definition, is missing
+            msg = "<unknown message %d> %r" % (msgId, args)
+            args = ()
+        yield LogRecord("", kind, _level_for(kind), msg, created, args)
+
+
+def expandBinaryLog(
+    data: bytes, formatter: Optional[Formatter] = None
+) -> Iterator[str]:
+    """Turn a log written by `BinaryHandler` back into lines of text, formatted
+    as a `Handler` would have, or with ``formatter``. Run it on a computer:
+
+    .. code-block:: python
+
+        with open("flight.bin", "rb") as log:
+            for line in adafruit_logging.expandBinaryLog(log.read()):
+                print(line)
+
+    :param bytes data: The contents of the log
+    :param Formatter formatter: Formats each record, instead of the default
+        timestamped line
+    """
+    handler = Handler()
+    handler.setFormatter(formatter)
+    for record in readBinaryLog(data):
+        yield handler.format(record)
 
 
 class NullHandler(Handler):
@@ -521,10 +958,21 @@ class Logger:
         """Whether any handlers have been set for this logger"""
         return len(self._handlers) > 0
 
+    def isEnabledFor(self, level: int) -> bool:
+        """Whether a message at this level would be processed. Use it to skip
+        computing expensive arguments for messages that would be dropped.
+
+        :param int level: the priority level to check
+        """
+        return level >= self._level
+
     def _log(self, level: int, msg: str, *args) -> None:
-        record = _logRecordFactory(
-            self.name, level, (msg % args) if args else msg, args
-        )
+        if level < self._level:
+            # Dropped before a record is made or any argument is looked at
+            return
+        # The arguments are merged into the message by the handlers that
+        # format the record, see _getMessage
+        record = _logRecordFactory(self.name, level, msg, args)
         self.handle(record)
 
     def handle(self, record: LogRecord) -> None:
@@ -56,6 +56,7 @@ __version__ = "4.5.13"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_LSM6DS.git"
 
 import struct
+from array import array
 from time import sleep
 from math import radians
 from micropython import const
@@ -136,11 +137,89 @@ AccelHPF.add_values(
     )
 )
 
+class FIFOMode(CV):
+    """Options for ``fifo_mode``"""
+
+
+FIFOMode.add_values(
+    (
+        ("BYPASS", 0, "Bypass", None),
+        ("FIFO", 1, "FIFO", None),
+        ("CONTINUOUS_TO_FIFO", 3, "Continuous-to-FIFO", None),
+        ("BYPASS_TO_CONTINUOUS", 4, "Bypass-to-Continuous", None),
+        ("CONTINUOUS", 6, "Continuous", None),
+        ("BYPASS_TO_FIFO", 7, "Bypass-to-FIFO", None),
+    )
+)
+
+
+class TemperatureBatchRate(CV):
+    """Options for ``fifo_temperature_batch_rate``"""
+
+
+TemperatureBatchRate.add_values(
+    (
+        ("NOT_BATCHED", 0, 0, None),
+        ("RATE_1_6_HZ", 1, 1.6, None),
+        ("RATE_12_5_HZ", 2, 12.5, None),
+        ("RATE_52_HZ", 3, 52.0, None),
+    )
+)
+
+
+class TimestampDecimation(CV):
+    """Options for ``fifo_timestamp_decimation``"""
+
+
+TimestampDecimation.add_values(
+    (
+        ("NOT_BATCHED", 0, 0, None),
+        ("DECIMATION_1", 1, 1, None),
+        ("DECIMATION_8", 2, 8, None),
+        ("DECIMATION_32", 3, 32, None),
+    )
+)
+
+class FreeFallThreshold(CV):
+    """Options for ``free_fall_threshold``"""
+
+
+FreeFallThreshold.add_values(
+    (
+        ("THRESHOLD_156_MG", 0, 156, None),
+        ("THRESHOLD_219_MG", 1, 219, None),
+        ("THRESHOLD_250_MG", 2, 250, None),
+        ("THRESHOLD_312_MG", 3, 312, None),
+        ("THRESHOLD_344_MG", 4, 344, None),
+        ("THRESHOLD_406_MG", 5, 406, None),
+        ("THRESHOLD_469_MG", 6, 469, None),
+        ("THRESHOLD_500_MG", 7, 500, None),
+    )
+)
+
 LSM6DS_DEFAULT_ADDRESS = const(0x6A)
 
 LSM6DS_CHIP_ID = const(0x6C)
 
+# Bytes per FIFO word in a read_fifo buffer: one tag byte and six data bytes
+FIFO_WORD_SIZE = const(7)
+FIFO_TAG_GYRO = const(0x01)
+FIFO_TAG_ACCEL = const(0x02)
+FIFO_TAG_TEMPERATURE = const(0x03)
+FIFO_TAG_TIMESTAMP = const(0x04)
+
+# Bits of ``motion_event_flags``
+WAKE_UP_Z = const(0x01)
+WAKE_UP_Y = const(0x02)
+WAKE_UP_X = const(0x04)
+WAKE_UP = const(0x08)
+FREE_FALL = const(0x20)
+
 _LSM6DS_MLC_INT1 = const(0x0D)
+_LSM6DS_FIFO_CTRL1 = const(0x07)
+_LSM6DS_FIFO_CTRL2 = const(0x08)
+_LSM6DS_FIFO_CTRL3 = const(0x09)
+_LSM6DS_FIFO_CTRL4 = const(0x0A)
 _LSM6DS_WHOAMI = const(0xF)
 _LSM6DS_CTRL1_XL = const(0x10)
 _LSM6DS_CTRL2_G = const(0x11)
@@ -149,17 +228,32 @@ _LSM6DS_CTRL8_XL = const(0x17)
 _LSM6DS_CTRL9_XL = const(0x18)
 _LSM6DS_CTRL10_C = const(0x19)
 _LSM6DS_ALL_INT_SRC = const(0x1A)
+_LSM6DS_WAKE_UP_SRC = const(0x1B)
 _LSM6DS_OUT_TEMP_L = const(0x20)
 _LSM6DS_OUTX_L_G = const(0x22)
 _LSM6DS_OUTX_L_A = const(0x28)
+_LSM6DS_MOTION_BYTES = const(12)  # OUTX_L_G through OUTZ_H_A
 _LSM6DS_MLC_STATUS = const(0x38)
+_LSM6DS_FIFO_STATUS1 = const(0x3A)
 _LSM6DS_STEP_COUNTER = const(0x4B)
 _LSM6DS_TAP_CFG0 = const(0x56)
 _LSM6DS_TAP_CFG = const(0x58)
+_LSM6DS_WAKE_UP_THS = const(0x5B)
+_LSM6DS_WAKE_UP_DUR = const(0x5C)
+_LSM6DS_FREE_FALL = const(0x5D)
+_LSM6DS_MD1_CFG = const(0x5E)
 _LSM6DS_MLC0_SRC = const(0x70)
+_LSM6DS_FIFO_DATA_OUT_TAG = const(0x78)
 _MILLI_G_TO_ACCEL = 0.00980665
 _TEMPERATURE_SENSITIVITY = 256
 _TEMPERATURE_OFFSET = 25.0
+_TIMESTAMP_LSB = 0.000025
+_FIFO_DIFF_MASK = const(0x03FF)
+_FIFO_OVR_LATCHED = const(0x0800)
+_FIFO_FULL_IA = const(0x2000)
+_FIFO_OVR_IA = const(0x4000)
+_FIFO_WTM_IA = const(0x8000)
+_MOTION_EVENT_MASK = const(0x2F)
 
 _LSM6DS_EMB_FUNC_EN_A = const(0x04)
 _LSM6DS_EMB_FUNC_EN_B = const(0x05)
@@ -221,6 +315,12 @@ class LSM6DS:  # pylint: disable=too-many-instance-attributes
     ) -> None:
         self._cached_accel_range = None
         self._cached_gyro_range = None
+        # Combined scale factors from raw counts, kept in sync with the ranges
+        self._accel_scale = 0.0
+        self._gyro_scale = 0.0
+        # Register address followed by the gyro and accel output registers
+        self._motion_buffer = bytearray(1 + _LSM6DS_MOTION_BYTES)
+        self._motion_buffer[0] = _LSM6DS_OUTX_L_G
 
         self.i2c_device = i2c_device.I2CDevice(i2c_bus, address)
         if self.CHIP_ID is None:
@@ -291,6 +391,38 @@ class LSM6DS:  # pylint: disable=too-many-instance-attributes
         x, y, z = [radians(self._scale_gyro_data(i)) for i in raw_gyro_data]
         return (x, y, z)
 
+    def read_motion(self, into: Optional[array] = None) -> array:
+        """Read acceleration and angular velocity together in one transaction.
+
+        The twelve gyro and accelerometer output bytes are read in a single
+        burst and scaled with factors precomputed when the ranges were set, so
+        passing the same ``into`` array on every call reads without allocating.
+
+        :param array into: A float array of at least 6 elements to store the
+            result in. A new ``array("f", 6)`` is created if not given.
+        :return: ``into``, holding the x, y, z acceleration in m / s ^ 2
+            followed by the x, y, z angular velocity in radians / second
+        """
+        if into is None:
+            into = array("f", (0.0,) * 6)
+        buf = self._motion_buffer
+        with self.i2c_device as i2c:
+            i2c.write_then_readinto(buf, buf, out_end=1, in_start=1)
+        accel_scale = self._accel_scale
+        gyro_scale = self._gyro_scale
+        # The gyro registers come first; decode by hand to avoid the tuple
+        # struct.unpack_from would allocate.
+        for i in range(3):
+            gyro = buf[2 * i + 1] | (buf[2 * i + 2] << 8)
+            accel = buf[2 * i + 7] | (buf[2 * i + 8] << 8)
+            if gyro & 0x8000:
+                gyro -= 0x10000
+            if accel & 0x8000:
+                accel -= 0x10000
+            into[i] = accel * accel_scale
+            into[i + 3] = gyro * gyro_scale
+        return into
+
     def _scale_xl_data(self, raw_measurement: int) -> float:
         return (
             raw_measurement
@@ -314,6 +446,7 @@ class LSM6DS:  # pylint: disable=too-many-instance-attributes
             raise AttributeError("range must be an `AccelRange`")
         self._accel_range = value
         self._cached_accel_range = value
+        self._accel_scale = AccelRange.lsb[value] * _MILLI_G_TO_ACCEL
         sleep(0.2)  # needed to let new range settle
 
     @property
@@ -341,6 +474,7 @@ class LSM6DS:  # pylint: disable=too-many-instance-attributes
             self._gyro_range_125dps = True
 
         self._cached_gyro_range = value  # needed to let new range settle
+        self._gyro_scale = radians(GyroRange.lsb[value] / 1000)
 
     @property
     def accelerometer_data_rate(self) -> int:
@@ -460,3 +594,298 @@ class LSM6DS:  # pylint: disable=too-many-instance-attributes
             buf = self._mlc0_src
             self._mem_bank = 0
         return buf
+
+
+class TaggedFIFOMixin:
+    """The tagged on-chip FIFO of the LSM6DSOX, LSM6DSO32 and ISM330DHCX, mixed
+    into their drivers ahead of `LSM6DS`. The LSM6DS33/LSM6DS3 family has a
+    different, untagged FIFO at other registers, so their drivers leave it out.
+    """
+
+    _timestamp_enable = RWBit(_LSM6DS_CTRL10_C, 5)
+    _fifo_watermark = RWBits(9, _LSM6DS_FIFO_CTRL1, 0, register_width=2)
+    _fifo_stop_on_wtm = RWBit(_LSM6DS_FIFO_CTRL2, 7)
+    _fifo_accel_bdr = RWBits(4, _LSM6DS_FIFO_CTRL3, 0)
+    _fifo_gyro_bdr = RWBits(4, _LSM6DS_FIFO_CTRL3, 4)
+    _fifo_mode = RWBits(3, _LSM6DS_FIFO_CTRL4, 0)
+    _fifo_temp_bdr = RWBits(2, _LSM6DS_FIFO_CTRL4, 4)
+    _fifo_ts_decimation = RWBits(2, _LSM6DS_FIFO_CTRL4, 6)
+    _fifo_status = ROUnaryStruct(_LSM6DS_FIFO_STATUS1, "<H")
+    # Register address sent ahead of a FIFO burst read
+    _FIFO_DATA_OUT = bytes((_LSM6DS_FIFO_DATA_OUT_TAG,))
+
+    @property
+    def fifo_mode(self) -> int:
+        """The FIFO operating mode. Must be a ``FIFOMode``.
+
+        ``FIFOMode.BYPASS`` disables the FIFO and discards its contents,
+        ``FIFOMode.CONTINUOUS`` keeps the newest samples and overwrites the oldest
+        when full, ``FIFOMode.FIFO`` stops collecting once full and
+        ``FIFOMode.CONTINUOUS_TO_FIFO`` streams continuously until an event
+        trigger, then freezes the FIFO so the data around the event is kept.
+        """
+        return self._fifo_mode
+
+    @fifo_mode.setter
+    def fifo_mode(self, value: int) -> None:
+        if not FIFOMode.is_valid(value):
+            raise AttributeError("fifo_mode must be a `FIFOMode`")
+        self._fifo_mode = value
+
+    @property
+    def fifo_watermark(self) -> int:
+        """The number of FIFO words, 0 to 511, at which the watermark flag is
+        raised. See `fifo_watermark_reached`"""
+        return self._fifo_watermark
+
+    @fifo_watermark.setter
+    def fifo_watermark(self, value: int) -> None:
+        if not 0 <= value <= 511:
+            raise AttributeError("fifo_watermark must be between 0 and 511")
+        self._fifo_watermark = value
+
+    @property
+    def fifo_stop_on_watermark(self) -> bool:
+        """When True the FIFO depth is limited to `fifo_watermark` words"""
+        return self._fifo_stop_on_wtm
+
+    @fifo_stop_on_watermark.setter
+    def fifo_stop_on_watermark(self, value: bool) -> None:
+        self._fifo_stop_on_wtm = value
+
+    @property
+    def fifo_accel_batch_rate(self) -> int:
+        """The rate at which accelerometer samples are written to the FIFO. Must be
+        a ``Rate``; ``Rate.RATE_SHUTDOWN`` stops batching accelerometer data.
+        Should not exceed `accelerometer_data_rate`"""
+        return self._fifo_accel_bdr
+
+    @fifo_accel_batch_rate.setter
+    def fifo_accel_batch_rate(self, value: int) -> None:
+        if not Rate.is_valid(value):
+            raise AttributeError("fifo_accel_batch_rate must be a `Rate`")
+        self._fifo_accel_bdr = value
+
+    @property
+    def fifo_gyro_batch_rate(self) -> int:
+        """The rate at which gyro samples are written to the FIFO. Must be a
+        ``Rate``; ``Rate.RATE_SHUTDOWN`` stops batching gyro data. Should not
+        exceed `gyro_data_rate`"""
+        return self._fifo_gyro_bdr
+
+    @fifo_gyro_batch_rate.setter
+    def fifo_gyro_batch_rate(self, value: int) -> None:
+        if not Rate.is_valid(value):
+            raise AttributeError("fifo_gyro_batch_rate must be a `Rate`")
+        self._fifo_gyro_bdr = value
+
+    @property
+    def fifo_temperature_batch_rate(self) -> int:
+        """The rate at which temperature samples are written to the FIFO. Must be
+        a ``TemperatureBatchRate``"""
+        return self._fifo_temp_bdr
+
+    @fifo_temperature_batch_rate.setter
+    def fifo_temperature_batch_rate(self, value: int) -> None:
+        if not TemperatureBatchRate.is_valid(value):
+            raise AttributeError(
+                "fifo_temperature_batch_rate must be a `TemperatureBatchRate`"
+            )
+        self._fifo_temp_bdr = value
+
+    @property
+    def fifo_timestamp_decimation(self) -> int:
+        """How often a timestamp word is written to the FIFO, relative to the
+        fastest batched sensor. Must be a ``TimestampDecimation``. Batching
+        timestamps also enables the timestamp counter."""
+        return self._fifo_ts_decimation
+
+    @fifo_timestamp_decimation.setter
+    def fifo_timestamp_decimation(self, value: int) -> None:
+        if not TimestampDecimation.is_valid(value):
+            raise AttributeError(
+                "fifo_timestamp_decimation must be a `TimestampDecimation`"
+            )
+        if value:
+            self._timestamp_enable = True
+        self._fifo_ts_decimation = value
+
+    @property
+    def fifo_level(self) -> int:
+        """The number of unread words in the FIFO"""
+        return self._fifo_status & _FIFO_DIFF_MASK
+
+    @property
+    def fifo_watermark_reached(self) -> bool:
+        """True when the FIFO holds at least `fifo_watermark` words"""
+        return self._fifo_status & _FIFO_WTM_IA > 0
+
+    @property
+    def fifo_overrun(self) -> bool:
+        """True when unread FIFO data has been overwritten since the last status
+        read"""
+        return self._fifo_status & (_FIFO_OVR_IA | _FIFO_OVR_LATCHED) > 0
+
+    @property
+    def fifo_full(self) -> bool:
+        """True when the FIFO will be full at the next sample"""
+        return self._fifo_status & _FIFO_FULL_IA > 0
+
+    def read_fifo(self, buf: bytearray, max_words: Optional[int] = None) -> int:
+        """Drain FIFO words into ``buf`` in a single burst transaction.
+
+        Each word takes `FIFO_WORD_SIZE` bytes: a tag byte whose top five bits
+        identify the source (``FIFO_TAG_ACCEL``, ``FIFO_TAG_GYRO``,
+        ``FIFO_TAG_TEMPERATURE`` or ``FIFO_TAG_TIMESTAMP``) followed by six
+        little-endian data bytes. Only as many words as are available and fit
+        in ``buf`` are read, so a caller-owned buffer can be reused for every
+        drain without allocating. Use `unpack_fifo` to convert the words.
+
+        :param bytearray buf: The buffer to read words into
+        :param int max_words: Read at most this many words
+        :return: The number of words read
+        """
+        words = min(self.fifo_level, len(buf) // FIFO_WORD_SIZE)
+        if max_words is not None:
+            words = min(words, max_words)
+        if words:
+            # The output registers roll over from 0x7E back to the tag at
+            # 0x78, so consecutive words stream out of one read.
+            with self.i2c_device as i2c:
+                i2c.write_then_readinto(
+                    self._FIFO_DATA_OUT, buf, in_end=words * FIFO_WORD_SIZE
+                )
+        return words
+
+    def unpack_fifo(self, buf: bytearray, words: int):
+        """Generator over the first ``words`` words of a `read_fifo` buffer.
+
+        Yields ``(tag, x, y, z)`` tuples. Accelerometer words are in m / s ^ 2
+        and gyro words in radians / second, scaled with the current ranges.
+        Temperature words give Celsius in ``x``, and timestamp words give
+        seconds since the counter was enabled in ``x``; the unused fields are 0.
+        Words with other tags are yielded as raw integers.
+        """
+        for offset in range(0, words * FIFO_WORD_SIZE, FIFO_WORD_SIZE):
+            tag = buf[offset] >> 3
+            if tag == FIFO_TAG_TIMESTAMP:
+                ticks = struct.unpack_from("<I", buf, offset + 1)[0]
+                yield (tag, ticks * _TIMESTAMP_LSB, 0, 0)
+                continue
+            x, y, z = struct.unpack_from("<hhh", buf, offset + 1)
+            if tag == FIFO_TAG_ACCEL:
+                yield (
+                    tag,
+                    self._scale_xl_data(x),
+                    self._scale_xl_data(y),
+                    self._scale_xl_data(z),
+                )
+            elif tag == FIFO_TAG_GYRO:
+                yield (
+                    tag,
+                    radians(self._scale_gyro_data(x)),
+                    radians(self._scale_gyro_data(y)),
+                    radians(self._scale_gyro_data(z)),
+                )
+            elif tag == FIFO_TAG_TEMPERATURE:
+                yield (tag, x / _TEMPERATURE_SENSITIVITY + _TEMPERATURE_OFFSET, 0, 0)
+            else:
+                yield (tag, x, y, z)
+
+
+class MotionEventMixin:
+    """Latched wake-up (shock) and free-fall detection routed to INT1, as laid
+    out on the LSM6DSOX, LSM6DSO32 and ISM330DHCX, mixed into their drivers
+    ahead of `LSM6DS`. The LSM6DS33/LSM6DS3 family keeps these settings at
+    other bits, so their drivers leave it out.
+    """
+
+    _interrupts_enable = RWBit(_LSM6DS_TAP_CFG, 7)
+    _wake_up_ths = RWBits(6, _LSM6DS_WAKE_UP_THS, 0)
+    _wake_up_dur = RWBits(2, _LSM6DS_WAKE_UP_DUR, 5)
+    _ff_dur5 = RWBit(_LSM6DS_WAKE_UP_DUR, 7)
+    _ff_ths = RWBits(3, _LSM6DS_FREE_FALL, 0)
+    _ff_dur = RWBits(5, _LSM6DS_FREE_FALL, 3)
+    _int1_wu = RWBit(_LSM6DS_MD1_CFG, 5)
+    _int1_ff = RWBit(_LSM6DS_MD1_CFG, 4)
+    _wake_up_src = ROUnaryStruct(_LSM6DS_WAKE_UP_SRC, "<B")
+
+    def _enable_event_interrupts(self) -> None:
+        # Latch the event sources until WAKE_UP_SRC is read so events between
+        # host reads are not lost, and route them to INT1.
+        self._tap_latch = True
+        self._interrupts_enable = True
+
+    @property
+    def wake_up_threshold(self) -> float:
+        """The acceleration in m / s ^ 2 on any axis, after the slope filter, that
+        raises a wake-up event; 0 disables wake-up detection. The threshold
+        resolution is 1/64 of `accelerometer_range`, and the setting is converted
+        with the range in effect when it is set, so set the range first."""
+        return self._wake_up_ths * self._wake_up_lsb()
+
+    @wake_up_threshold.setter
+    def wake_up_threshold(self, value: float) -> None:
+        raw = int(value / self._wake_up_lsb() + 0.5)
+        if not 0 <= raw <= 63:
+            raise AttributeError(
+                "wake_up_threshold must be between 0 and 63/64 of the range"
+            )
+        self._wake_up_ths = raw
+        self._int1_wu = raw > 0
+        if raw:
+            self._enable_event_interrupts()
+
+    def _wake_up_lsb(self) -> float:
+        return (
+            AccelRange.string[self._cached_accel_range]
+            * _MILLI_G_TO_ACCEL
+            * 1000
+            / 64
+        )
+
+    @property
+    def wake_up_duration(self) -> int:
+        """The number of accelerometer samples, 0 to 3, the acceleration must stay
+        above `wake_up_threshold` before a wake-up event is raised"""
+        return self._wake_up_dur
+
+    @wake_up_duration.setter
+    def wake_up_duration(self, value: int) -> None:
+        if not 0 <= value <= 3:
+            raise AttributeError("wake_up_duration must be between 0 and 3")
+        self._wake_up_dur = value
+
+    @property
+    def free_fall_threshold(self) -> int:
+        """The acceleration magnitude below which free-fall is detected. Must be a
+        ``FreeFallThreshold``. Setting it enables free-fall detection"""
+        return self._ff_ths
+
+    @free_fall_threshold.setter
+    def free_fall_threshold(self, value: int) -> None:
+        if not FreeFallThreshold.is_valid(value):
+            raise AttributeError("free_fall_threshold must be a `FreeFallThreshold`")
+        self._ff_ths = value
+        self._int1_ff = True
+        self._enable_event_interrupts()
+
+    @property
+    def free_fall_duration(self) -> int:
+        """The number of accelerometer samples, 0 to 63, the acceleration must stay
+        below `free_fall_threshold` before a free-fall event is raised"""
+        return self._ff_dur | (self._ff_dur5 << 5)
+
+    @free_fall_duration.setter
+    def free_fall_duration(self, value: int) -> None:
+        if not 0 <= value <= 63:
+            raise AttributeError("free_fall_duration must be between 0 and 63")
+        self._ff_dur = value & 0x1F
+        self._ff_dur5 = value > 0x1F
+
+    @property
+    def motion_event_flags(self) -> int:
+        """The wake-up and free-fall events latched since the last read, as a
+        combination of ``WAKE_UP``, ``WAKE_UP_X``, ``WAKE_UP_Y``, ``WAKE_UP_Z`` and
+        ``FREE_FALL``. Reading clears the latched events."""
+        return self._wake_up_src & _MOTION_EVENT_MASK
@@ -6,7 +6,15 @@ This module provides the `adafruit_lsm6ds.ism330dhcx` subclass of LSM6DS sensors
 ==================================================================================
 """
 from time import sleep
-from . import LSM6DS, LSM6DS_DEFAULT_ADDRESS, GyroRange, RWBit, const
+from . import (
+    LSM6DS,
+    TaggedFIFOMixin,
+    MotionEventMixin,
+    LSM6DS_DEFAULT_ADDRESS,
+    GyroRange,
+    RWBit,
+    const,
+)
 
 try:
     import typing  # pylint: disable=unused-import
@@ -17,7 +25,9 @@ except ImportError:
 _LSM6DS_CTRL2_G = const(0x11)
 
 
-class ISM330DHCX(LSM6DS):  # pylint: disable=too-many-instance-attributes
+class ISM330DHCX(  # pylint: disable=too-many-instance-attributes
+    TaggedFIFOMixin, MotionEventMixin, LSM6DS
+):
 
     """Driver for the ISM330DHCX 6-axis accelerometer and gyroscope.
 
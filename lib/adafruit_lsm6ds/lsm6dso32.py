@@ -5,7 +5,14 @@
 This module provides the `adafruit_lsm6ds.lsm6dso32` subclass of LSM6DS sensors
 =================================================================================
 """
-from . import LSM6DS, LSM6DS_CHIP_ID, LSM6DS_DEFAULT_ADDRESS, AccelRange
+from . import (
+    LSM6DS,
+    MotionEventMixin,
+    TaggedFIFOMixin,
+    LSM6DS_CHIP_ID,
+    LSM6DS_DEFAULT_ADDRESS,
+    AccelRange,
+)
 
 try:
     import typing  # pylint: disable=unused-import
@@ -14,7 +21,9 @@ except ImportError:
     pass
 
 
-class LSM6DSO32(LSM6DS):  # pylint: disable=too-many-instance-attributes
+class LSM6DSO32(  # pylint: disable=too-many-instance-attributes
+    TaggedFIFOMixin, MotionEventMixin, LSM6DS
+):
 
     """Driver for the LSM6DSO32 6-axis accelerometer and gyroscope.
 
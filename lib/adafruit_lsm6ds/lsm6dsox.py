@@ -5,7 +5,13 @@
 This module provides the `adafruit_lsm6ds.lsm6dsox` subclass of LSM6DS sensors
 ==============================================================================
 """
-from . import LSM6DS, LSM6DS_DEFAULT_ADDRESS, LSM6DS_CHIP_ID
+from . import (
+    LSM6DS,
+    TaggedFIFOMixin,
+    MotionEventMixin,
+    LSM6DS_DEFAULT_ADDRESS,
+    LSM6DS_CHIP_ID,
+)
 
 try:
     import typing  # pylint: disable=unused-import
@@ -14,7 +20,9 @@ except ImportError:
     pass
 
 
-class LSM6DSOX(LSM6DS):  # pylint: disable=too-many-instance-attributes
+class LSM6DSOX(  # pylint: disable=too-many-instance-attributes
+    TaggedFIFOMixin, MotionEventMixin, LSM6DS
+):
 
     """Driver for the LSM6DSOX 6-axis accelerometer and gyroscope.
 
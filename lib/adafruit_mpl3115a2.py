@@ -25,6 +25,9 @@ Implementation Notes
 
 * Adafruit's Bus Device library: https://github.com/adafruit/Adafruit_CircuitPython_BusDevice
 
+* Adafruit's asyncio library (for the ``asyncio_`` read methods):
+  https://github.com/adafruit/Adafruit_CircuitPython_asyncio
+
 """
 import struct
 import time
@@ -88,6 +91,17 @@ _MPL3115A2_CTRL_REG1_OS128 = const(0x38)
 
 _MPL3115A2_REGISTER_STARTCONVERSION = const(0x12)
 
+_MPL3115A2_CTRL_REG1_OS_MASK = const(0x38)
+_MPL3115A2_CTRL_REG2_ST_MASK = const(0x0F)
+
+# Oversample ratios in the order of their CTRL_REG1 OS field values.
+_OVERSAMPLE_RATIOS = (1, 2, 4, 8, 16, 32, 64, 128)
+# Minimum time between samples in milliseconds for each oversample ratio,
+# from the datasheet's CTRL_REG1 description.
+_CONVERSION_TIME_MS = (6, 10, 18, 34, 66, 130, 258, 512)
+# Interval between data-ready polls in the asyncio reads, in seconds.
+_ASYNC_POLL_INTERVAL = 0.002
+
 
 class MPL3115A2:
     """Instance of the MPL3115A2 sensor.
@@ -129,9 +143,17 @@ class MPL3115A2:
     # _BUFFER size was previously 4. It was increased as the current configuration
     # creates a flag in _MPL3115A2_REGISTER_STATUS that we were not clearing depending
     # on the properties reading order
+    # Burst buffer for read_all: STATUS, OUT_P (3 bytes) and OUT_T (2 bytes).
+    _BURST = bytearray(6)
 
     def __init__(self, i2c, *, address=_MPL3115A2_ADDRESS):
-        self._device = i2c_device.I2CDevice(i2c, address)
+        self.i2c_device = i2c_device.I2CDevice(i2c, address)
+        # Mode write then OST write, queued once and run under one bus lock
+        # for each one-shot conversion.
+        self._mode_write = bytearray((_MPL3115A2_CTRL_REG1, 0))
+        self._ost_write = bytearray((_MPL3115A2_CTRL_REG1, 0))
+        self._trigger = i2c_device.I2CBatch(self.i2c_device)
+        self._trigger.write(self._mode_write).write(self._ost_write)
         # Validate the chip ID.
         if self._read_u8(_MPL3115A2_WHOAMI) != 0xC4:
             raise RuntimeError("Failed to find MPL3115A2, check your wiring!")
@@ -151,6 +173,7 @@ class MPL3115A2:
             self._poll_reg1(_MPL3115A2_CTRL_REG1_RST)
         # Configure the chip registers with default values.
         self._ctrl_reg1 = _MPL3115A2_CTRL_REG1_OS128 | _MPL3115A2_CTRL_REG1_ALT
+        self._continuous = False
         self._write_u8(_MPL3115A2_CTRL_REG1, self._ctrl_reg1)
         self._write_u8(
             _MPL3115A2_PT_DATA_CFG,
@@ -165,7 +188,7 @@ class MPL3115A2:
         # otherwise count bytes are copied in.
         if count is None:
             count = len(buf)
-        with self._device as i2c:
+        with self.i2c_device as i2c:
             i2c.write_then_readinto(bytes([address & 0xFF]), buf, in_end=count)
 
     def _read_u8(self, address):
@@ -175,7 +198,7 @@ class MPL3115A2:
 
     def _write_u8(self, address, val):
         # Write an 8-bit unsigned value to the specified 8-bit address.
-        with self._device as i2c:
+        with self.i2c_device as i2c:
             self._BUFFER[0] = address & 0xFF
             self._BUFFER[1] = val & 0xFF
             i2c.write(self._BUFFER, end=2)
@@ -183,28 +206,40 @@ class MPL3115A2:
     def _write_u16_be(self, address, val):
         # Write a 16-bit big endian unsigned value to the specified 8-bit
         # address.
-        with self._device as i2c:
+        with self.i2c_device as i2c:
             self._BUFFER[0] = address & 0xFF
             self._BUFFER[1] = (val >> 8) & 0xFF
             self._BUFFER[2] = val & 0xFF
             i2c.write(self._BUFFER, end=3)
 
+    def _start_one_shot(self):
+        # Write the current mode bits, then set OST to start a conversion.
+        self._mode_write[1] = self._ctrl_reg1 & 0xFF
+        self._ctrl_reg1 |= _MPL3115A2_CTRL_REG1_OST
+        self._ost_write[1] = self._ctrl_reg1 & 0xFF
+        self._trigger.run()
+
     def _poll_reg1(self, mask):
         # Poll the CTRL REG1 value for the specified masked bits to NOT be
         # present.
         while self._read_u8(_MPL3115A2_CTRL_REG1) & mask > 0:
             time.sleep(0.01)
 
+    def _check_one_shot(self):
+        # The one-shot properties toggle OST and ALT, which would disturb a
+        # running continuous acquisition.
+        if self._continuous:
+            raise RuntimeError("Sensor is in continuous mode, use read_all()")
+
     @property
     def pressure(self):
         """Read the barometric pressure detected by the sensor in Hectopascals."""
+        self._check_one_shot()
         # First poll for a measurement to be finished.
         self._poll_reg1(_MPL3115A2_CTRL_REG1_OST)
         # Set control bits for pressure reading.
         self._ctrl_reg1 &= ~0b10000000  # Turn off bit 7, ALT.
-        self._write_u8(_MPL3115A2_CTRL_REG1, self._ctrl_reg1)
-        self._ctrl_reg1 |= 0b00000010  # Set OST to 1 to start measurement.
-        self._write_u8(_MPL3115A2_CTRL_REG1, self._ctrl_reg1)
+        self._start_one_shot()
         # Poll status for PDR to be set = press conversion complete
         while (
             self._read_u8(_MPL3115A2_REGISTER_STATUS) & _MPL3115A2_REGISTER_STATUS_PDR
@@ -228,13 +263,12 @@ class MPL3115A2:
         value in meters.  Set the sea-level pressure by updating the
         :attr:`sealevel_pressure` property first to get a more accurate altitude value.
         """
+        self._check_one_shot()
         # First poll for a measurement to be finished.
         self._poll_reg1(_MPL3115A2_CTRL_REG1_OST)
         # Set control bits for pressure reading.
         self._ctrl_reg1 |= 0b10000000  # Turn on bit 0, ALT.
-        self._write_u8(_MPL3115A2_CTRL_REG1, self._ctrl_reg1)
-        self._ctrl_reg1 |= 0b00000010  # Set OST to 1 to start measurement.
-        self._write_u8(_MPL3115A2_CTRL_REG1, self._ctrl_reg1)
+        self._start_one_shot()
         # Poll status for PDR to be set.
         while (
             self._read_u8(_MPL3115A2_REGISTER_STATUS) & _MPL3115A2_REGISTER_STATUS_PDR
@@ -255,6 +289,7 @@ class MPL3115A2:
     @property
     def temperature(self):
         """Read the temperature as measured by the sensor in Celsius."""
+        self._check_one_shot()
         # First poll for a measurement to be finished.
         self._poll_reg1(_MPL3115A2_CTRL_REG1_OST)
         # Initatiate a one-shot measurement
@@ -291,3 +326,224 @@ class MPL3115A2:
         # Convert from hectopascals to bars of pressure and write to the sealevel register.
         bars = int(val * 50)
         self._write_u16_be(_MPL3115A2_BAR_IN_MSB, bars)
+
+    @property
+    def continuous(self):
+        """True while the sensor is in active (continuous acquisition) mode.
+        See :meth:`start_continuous`."""
+        return self._continuous
+
+    def start_continuous(self, *, oversample=None, time_step=0, altitude=True):
+        """Put the sensor in active mode so it acquires samples on its own.
+
+        While active, new samples are picked up with :meth:`read_all`, which
+        only returns data once the sensor has flagged it ready, so no read ever
+        waits on a conversion. The one-shot :attr:`pressure`, :attr:`altitude`
+        and :attr:`temperature` properties are unavailable until
+        :meth:`stop_continuous` is called.
+
+        :param int oversample: Oversample ratio, see :attr:`oversample`. Defaults
+            to the current setting.
+        :param int time_step: Auto-acquisition period of ``2 ** time_step``
+            seconds, from 0 (1 s) to 15 (9.1 hours).
+        :param bool altitude: Report altitude in meters rather than pressure
+            in hectopascals.
+        """
+        if oversample is None:
+            oversample = self.oversample
+        elif oversample not in _OVERSAMPLE_RATIOS:
+            raise ValueError("oversample must be a power of two from 1 to 128")
+        if not 0 <= time_step <= _MPL3115A2_CTRL_REG2_ST_MASK:
+            raise ValueError("time_step must be between 0 and 15")
+        # Mode changes must be made in standby.
+        self._ctrl_reg1 &= ~(
+            _MPL3115A2_CTRL_REG1_SBYB
+            | _MPL3115A2_CTRL_REG1_OST
+            | _MPL3115A2_CTRL_REG1_OS_MASK
+            | _MPL3115A2_CTRL_REG1_ALT
+        )
+        self._write_u8(_MPL3115A2_CTRL_REG1, self._ctrl_reg1)
+        self._write_u8(_MPL3115A2_CTRL_REG2, time_step)
+        self._ctrl_reg1 |= _OVERSAMPLE_RATIOS.index(oversample) << 3
+        if altitude:
+            self._ctrl_reg1 |= _MPL3115A2_CTRL_REG1_ALT
+        self._ctrl_reg1 |= _MPL3115A2_CTRL_REG1_SBYB
+        self._write_u8(_MPL3115A2_CTRL_REG1, self._ctrl_reg1)
+        self._continuous = True
+
+    def stop_continuous(self):
+        """Return the sensor to standby so the one-shot properties can be used."""
+        self._ctrl_reg1 &= ~_MPL3115A2_CTRL_REG1_SBYB
+        self._write_u8(_MPL3115A2_CTRL_REG1, self._ctrl_reg1)
+        self._continuous = False
+
+    @property
+    def oversample(self):
+        """The oversample ratio used for each conversion: 1, 2, 4, 8, 16, 32, 64
+        or 128. Defaults to 128.
+
+        Higher ratios average more internal samples, trading rate for noise.
+        The minimum time per conversion is:
+
+        ======== ================
+        Ratio    Conversion time
+        ======== ================
+        1        6 ms
+        2        10 ms
+        4        18 ms
+        8        34 ms
+        16       66 ms
+        32       130 ms
+        64       258 ms
+        128      512 ms
+        ======== ================
+
+        Ratios of 1 to 8 allow roughly 30 to 150 one-shot samples per second,
+        which suits fast-changing altitude; 128 gives the cleanest readings when
+        the altitude is steady.
+        """
+        return _OVERSAMPLE_RATIOS[
+            (self._ctrl_reg1 & _MPL3115A2_CTRL_REG1_OS_MASK) >> 3
+        ]
+
+    @oversample.setter
+    def oversample(self, ratio):
+        if ratio not in _OVERSAMPLE_RATIOS:
+            raise ValueError("oversample must be a power of two from 1 to 128")
+        active = self._ctrl_reg1 & _MPL3115A2_CTRL_REG1_SBYB
+        if active:
+            # OS can only be changed in standby.
+            self._write_u8(
+                _MPL3115A2_CTRL_REG1, self._ctrl_reg1 & ~_MPL3115A2_CTRL_REG1_SBYB
+            )
+        self._ctrl_reg1 &= ~_MPL3115A2_CTRL_REG1_OS_MASK
+        self._ctrl_reg1 |= _OVERSAMPLE_RATIOS.index(ratio) << 3
+        self._write_u8(_MPL3115A2_CTRL_REG1, self._ctrl_reg1)
+
+    @property
+    def conversion_time(self):
+        """Minimum time in seconds for one conversion at the current
+        :attr:`oversample` ratio."""
+        index = (self._ctrl_reg1 & _MPL3115A2_CTRL_REG1_OS_MASK) >> 3
+        return _CONVERSION_TIME_MS[index] / 1000
+
+    @property
+    def data_ready(self):
+        """True when a new pressure/altitude and temperature sample is ready."""
+        return (
+            self._read_u8(_MPL3115A2_REGISTER_DR_STATUS)
+            & _MPL3115A2_REGISTER_STATUS_PDR
+            > 0
+        )
+
+    def read_all(self):
+        """Read pressure or altitude and temperature in one burst transaction.
+
+        Returns ``(value, temperature)`` where ``value`` is altitude in meters
+        when the ALT bit is set and pressure in hectopascals otherwise, and
+        temperature is in Celsius.
+
+        In continuous mode the status byte is read in the same transaction and
+        ``None`` is returned when no new sample has been flagged ready, so this
+        never blocks. In one-shot mode a conversion is started and waited for.
+        """
+        buf = self._BURST
+        if not self._continuous:
+            self._poll_reg1(_MPL3115A2_CTRL_REG1_OST)
+            self._ctrl_reg1 |= _MPL3115A2_CTRL_REG1_OST
+            self._write_u8(_MPL3115A2_CTRL_REG1, self._ctrl_reg1)
+            while (
+                self._read_u8(_MPL3115A2_REGISTER_STATUS)
+                & _MPL3115A2_REGISTER_STATUS_PDR
+                == 0
+            ):
+                time.sleep(0.01)
+        # Register addresses auto-increment from STATUS through OUT_T_LSB.
+        self._read_into(_MPL3115A2_REGISTER_STATUS, buf)
+        if self._continuous and buf[0] & _MPL3115A2_REGISTER_STATUS_PDR == 0:
+            return None
+        return self._decode(buf)
+
+    def _decode(self, buf):
+        # Decode the OUT_P and OUT_T bytes that follow the status byte in buf.
+        if self._ctrl_reg1 & _MPL3115A2_CTRL_REG1_ALT:
+            # Signed Q16.4 meters in the top 20 bits.
+            raw = (buf[1] << 24) | (buf[2] << 16) | (buf[3] << 8)
+            if raw & 0x80000000:
+                raw -= 0x100000000
+            value = raw / 65535.0
+        else:
+            # Unsigned Q18.2 pascals in the top 20 bits.
+            value = ((buf[1] << 16) | (buf[2] << 8) | buf[3]) >> 4
+            value /= 400.0
+        # Signed Q8.4 degrees Celsius in the top 12 bits.
+        temperature = (buf[4] << 8) | buf[5]
+        if temperature & 0x8000:
+            temperature -= 0x10000
+        return (value, (temperature >> 4) / 16.0)
+
+    async def _asyncio_poll_reg1(self, mask):
+        # Like _poll_reg1 but yields to other tasks while waiting.
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        while self._read_u8(_MPL3115A2_CTRL_REG1) & mask > 0:
+            await asyncio.sleep(_ASYNC_POLL_INTERVAL)
+
+    async def _asyncio_one_shot(self, altitude):
+        # Run one conversion, yielding to other tasks instead of sleeping, and
+        # return the decoded (value, temperature). altitude selects the ALT
+        # bit, or None to leave it unchanged.
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        self._check_one_shot()
+        await self._asyncio_poll_reg1(_MPL3115A2_CTRL_REG1_OST)
+        if altitude is None:
+            self._ctrl_reg1 |= _MPL3115A2_CTRL_REG1_OST
+            self._write_u8(_MPL3115A2_CTRL_REG1, self._ctrl_reg1)
+        else:
+            if altitude:
+                self._ctrl_reg1 |= _MPL3115A2_CTRL_REG1_ALT
+            else:
+                self._ctrl_reg1 &= ~_MPL3115A2_CTRL_REG1_ALT
+            self._start_one_shot()
+        # Nothing can be ready before the conversion time has passed.
+        await asyncio.sleep(self.conversion_time)
+        buf = self._BURST
+        while True:
+            self._read_into(_MPL3115A2_REGISTER_STATUS, buf)
+            if buf[0] & _MPL3115A2_REGISTER_STATUS_PDR:
+                return self._decode(buf)
+            await asyncio.sleep(_ASYNC_POLL_INTERVAL)
+
+    async def asyncio_pressure(self):
+        """Asyncio version of :attr:`pressure` that yields to other tasks while
+        the conversion runs instead of blocking."""
+        return (await self._asyncio_one_shot(False))[0]
+
+    async def asyncio_altitude(self):
+        """Asyncio version of :attr:`altitude` that yields to other tasks while
+        the conversion runs instead of blocking."""
+        return (await self._asyncio_one_shot(True))[0]
+
+    async def asyncio_temperature(self):
+        """Asyncio version of :attr:`temperature` that yields to other tasks
+        while the conversion runs instead of blocking."""
+        return (await self._asyncio_one_shot(None))[1]
+
+    async def asyncio_read_all(self):
+        """Asyncio version of :meth:`read_all`.
+
+        In one-shot mode a conversion is started and awaited. In continuous
+        mode this waits for the next sample flagged ready. Either way other
+        tasks run while waiting, and a ``(value, temperature)`` tuple is always
+        returned.
+        """
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        if not self._continuous:
+            return await self._asyncio_one_shot(None)
+        while True:
+            sample = self.read_all()
+            if sample is not None:
+                return sample
+            await asyncio.sleep(_ASYNC_POLL_INTERVAL)
@@ -55,6 +55,12 @@ class RWBits:
         self.buffer = bytearray(1 + register_width)
         self.buffer[0] = register_address
         self.lsb_first = lsb_first
+        # Buffer indices from the most to the least significant byte, computed
+        # once rather than on every access.
+        if lsb_first:
+            self._read_order = tuple(range(register_width, 0, -1))
+        else:
+            self._read_order = tuple(range(1, register_width + 1))
         self.sign_bit = (1 << (num_bits - 1)) if signed else 0
 
     def __get__(
@@ -66,10 +72,7 @@ class RWBits:
             i2c.write_then_readinto(self.buffer, self.buffer, out_end=1, in_start=1)
         # read the number of bytes into a single variable
         reg = 0
-        order = range(len(self.buffer) - 1, 0, -1)
-        if not self.lsb_first:
-            order = reversed(order)
-        for i in order:
+        for i in self._read_order:
             reg = (reg << 8) | self.buffer[i]
         reg = (reg & self.bit_mask) >> self.lowest_bit
         # If the value is signed and negative, convert it
@@ -82,9 +85,7 @@ class RWBits:
         with obj.i2c_device as i2c:
             i2c.write_then_readinto(self.buffer, self.buffer, out_end=1, in_start=1)
             reg = 0
-            order = range(len(self.buffer) - 1, 0, -1)
-            if not self.lsb_first:
-                order = range(1, len(self.buffer))
+            order = self._read_order
             for i in order:
                 reg = (reg << 8) | self.buffer[i]
             # print("old reg: ", hex(reg))
@@ -18,11 +18,53 @@ __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_Register.git"
 import struct
 
 try:
-    from typing import Optional, Type, Tuple, Any, NoReturn
+    from typing import Optional, Type, Tuple, Any, NoReturn, List
+    from circuitpython_typing import WriteableBuffer
     from circuitpython_typing.device_drivers import I2CDeviceDriver
 except ImportError:
     pass
 
+# Integer format characters that can be decoded without struct: (size, signed)
+_INTEGER_CODES = {
+    "b": (1, True),
+    "B": (1, False),
+    "h": (2, True),
+    "H": (2, False),
+    "i": (4, True),
+    "I": (4, False),
+    "l": (4, True),
+    "L": (4, False),
+    "q": (8, True),
+    "Q": (8, False),
+}
+
+
+def _integer_fields(struct_format: str) -> Optional[List[Tuple[int, int, bool]]]:
+    """Return the ``(offset, size, signed)`` of each field of an integer-only,
+    explicitly little- or big-endian format, or None if the format has any other
+    kind of field and has to go through `struct`."""
+    if not struct_format or struct_format[0] not in "<>!":
+        return None
+    fields = []
+    offset = 0
+    count = ""
+    for code in struct_format[1:]:
+        if code.isdigit():
+            count += code
+            continue
+        repeat = int(count) if count else 1
+        count = ""
+        if code == "x":
+            offset += repeat
+            continue
+        if code not in _INTEGER_CODES:
+            return None
+        size, signed = _INTEGER_CODES[code]
+        for _ in range(repeat):
+            fields.append((offset, size, signed))
+            offset += size
+    return fields
+
 
 class Struct:
     """
@@ -39,15 +81,61 @@ class Struct:
         self.format = struct_format
         self.buffer = bytearray(1 + struct.calcsize(self.format))
         self.buffer[0] = register_address
+        self._fields = _integer_fields(struct_format)
+        self._big_endian = struct_format[0] in ">!"
 
     def __get__(
         self,
         obj: Optional[I2CDeviceDriver],
         objtype: Optional[Type[I2CDeviceDriver]] = None,
     ) -> Tuple:
+        if obj is None:
+            # Class access returns the descriptor itself, e.g. for readinto.
+            return self
         with obj.i2c_device as i2c:
             i2c.write_then_readinto(self.buffer, self.buffer, out_end=1, in_start=1)
-        return struct.unpack_from(self.format, memoryview(self.buffer)[1:])
+        return struct.unpack_from(self.format, self.buffer, 1)
+
+    def readinto(
+        self, obj: I2CDeviceDriver, into: WriteableBuffer, start: int = 0
+    ) -> WriteableBuffer:
+        """Read the register and store its values in ``into`` starting at index
+        ``start``, instead of returning a new tuple.
+
+        Integer-only formats with an explicit byte order are decoded straight
+        from the shared buffer, so reading into a preallocated `array.array` or
+        list allocates nothing. Other formats are unpacked with `struct`.
+        Access the descriptor through the class to call this, for example
+        ``type(sensor)._raw_accel_data.readinto(sensor, values)``.
+
+        :param obj: The driver instance the register belongs to.
+        :param into: A mutable sequence with room for every value in the struct.
+        :param int start: The index in ``into`` of the first value.
+        :return: ``into``
+        """
+        buf = self.buffer
+        with obj.i2c_device as i2c:
+            i2c.write_then_readinto(buf, buf, out_end=1, in_start=1)
+        fields = self._fields
+        if fields is None:
+            for value in struct.unpack_from(self.format, buf, 1):
+                into[start] = value
+                start += 1
+            return into
+        big_endian = self._big_endian
+        for offset, size, signed in fields:
+            value = 0
+            if big_endian:
+                for i in range(1 + offset, 1 + offset + size):
+                    value = (value << 8) | buf[i]
+            else:
+                for i in range(offset + size, offset, -1):
+                    value = (value << 8) | buf[i]
+            if signed and buf[1 + offset if big_endian else offset + size] & 0x80:
+                value -= 1 << (8 * size)
+            into[start] = value
+            start += 1
+        return into
 
     def __set__(self, obj: I2CDeviceDriver, value: Tuple) -> None:
         struct.pack_into(self.format, self.buffer, 1, *value)
@@ -69,21 +157,22 @@ class UnaryStruct:
     def __init__(self, register_address: int, struct_format: str) -> None:
         self.format = struct_format
         self.address = register_address
+        # Sized once and shared by every access, like Struct's buffer.
+        self.buffer = bytearray(1 + struct.calcsize(self.format))
+        self.buffer[0] = register_address
 
     def __get__(
         self,
         obj: Optional[I2CDeviceDriver],
         objtype: Optional[Type[I2CDeviceDriver]] = None,
     ) -> Any:
-        buf = bytearray(1 + struct.calcsize(self.format))
-        buf[0] = self.address
+        buf = self.buffer
         with obj.i2c_device as i2c:
             i2c.write_then_readinto(buf, buf, out_end=1, in_start=1)
         return struct.unpack_from(self.format, buf, 1)[0]
 
     def __set__(self, obj: I2CDeviceDriver, value: Any) -> None:
-        buf = bytearray(1 + struct.calcsize(self.format))
-        buf[0] = self.address
+        buf = self.buffer
         struct.pack_into(self.format, buf, 1, value)
         with obj.i2c_device as i2c:
             i2c.write(buf)
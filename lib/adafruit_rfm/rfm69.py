@@ -38,7 +38,7 @@ try:
 
     import busio
     import digitalio
-    from circuitpython_typing import ReadableBuffer
+    from circuitpython_typing import ReadableBuffer, WriteableBuffer
 
 except ImportError:
     pass
@@ -648,3 +648,13 @@ class RFM69(RFMSPI):
             # read the packet
             self.read_into(_RF69_REG_00_FIFO, packet, fifo_length)
         return packet
+
+    def read_fifo_into(self, buf: WriteableBuffer) -> int:
+        """Read the received packet into buf without allocating and return its
+        length, or 0 if the FIFO is empty. A packet longer than buf is
+        truncated."""
+        fifo_length = self.read_u8(_RF69_REG_00_FIFO)
+        if fifo_length > 0:
+            fifo_length = min(fifo_length, len(buf))
+            self.read_into(_RF69_REG_00_FIFO, buf, fifo_length)
+        return fifo_length
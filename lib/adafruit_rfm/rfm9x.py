@@ -20,7 +20,7 @@ from adafruit_rfm.rfm_common import RFMSPI
 try:
     import busio
     import digitalio
-    from circuitpython_typing import ReadableBuffer
+    from circuitpython_typing import ReadableBuffer, WriteableBuffer
 
     try:
         from typing import Literal
@@ -531,3 +531,15 @@ class RFM9x(RFMSPI):
             # clear interrupt
             self.write_u8(_RF95_REG_12_IRQ_FLAGS, 0xFF)
         return packet
+
+    def read_fifo_into(self, buf: WriteableBuffer) -> int:
+        """Read the received packet into buf without allocating and return its
+        length, or 0 if the FIFO is empty. A packet longer than buf is
+        truncated. Unlike read_fifo() the interrupt flags are left set."""
+        fifo_length = self.read_u8(_RF95_REG_13_RX_NB_BYTES)
+        if fifo_length > 0:
+            current_addr = self.read_u8(_RF95_REG_10_FIFO_RX_CURRENT_ADDR)
+            self.write_u8(_RF95_REG_0D_FIFO_ADDR_PTR, current_addr)
+            fifo_length = min(fifo_length, len(buf))
+            self.read_into(_RF95_REG_00_FIFO, buf, fifo_length)
+        return fifo_length
@@ -22,7 +22,7 @@ try:
 
     import busio
     import digitalio
-    from circuitpython_typing import ReadableBuffer
+    from circuitpython_typing import ReadableBuffer, WriteableBuffer
 
     try:
         from typing import Literal
@@ -572,3 +572,13 @@ class RFM9xFSK(RFMSPI):
             # read the packet
             self.read_into(_RF95_REG_00_FIFO, packet, fifo_length)
         return packet
+
+    def read_fifo_into(self, buf: WriteableBuffer) -> int:
+        """Read the received packet into buf without allocating and return its
+        length, or 0 if the FIFO is empty. A packet longer than buf is
+        truncated."""
+        fifo_length = self.read_u8(_RF95_REG_00_FIFO)
+        if fifo_length > 0:
+            fifo_length = min(fifo_length, len(buf))
+            self.read_into(_RF95_REG_00_FIFO, buf, fifo_length)
+        return fifo_length
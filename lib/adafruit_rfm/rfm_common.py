@@ -93,6 +93,57 @@ async def asyncio_check_timeout(flag: Callable, limit: float, timeout_poll: floa
     return timed_out
 
 
+class DIOWatcher:
+    """Completion signal from one of the radio's DIO pins.
+
+    Rising edges are counted in hardware with `countio` where the port and the
+    pin support it, so an edge is not lost while the event loop is busy.
+    Otherwise the pin level is read, which works because the radio holds DIO
+    high until its IRQ flags are cleared. Either way, checking the pin costs no SPI transaction.
+
+    :param ~microcontroller.Pin pin: The pin wired to the radio's DIO output.
+    """
+
+    def __init__(self, pin) -> None:
+        self._counter = None
+        self._pin = None
+        try:
+            import countio  # pylint: disable=import-outside-toplevel
+
+            self._counter = countio.Counter(pin, edge=countio.Edge.RISE)
+        except (
+            ImportError,
+            AttributeError,
+            NotImplementedError,
+            RuntimeError,
+            ValueError,
+        ):
+            # No countio, or a pin the port cannot count on, such as a
+            # non-PWM B pin on the RP2040
+            import digitalio  # pylint: disable=import-outside-toplevel,redefined-outer-name
+
+            self._pin = digitalio.DigitalInOut(pin)
+            self._pin.switch_to_input()
+
+    def __call__(self) -> bool:
+        """True if the radio signalled since the last :meth:`clear`."""
+        if self._counter is not None:
+            return self._counter.count > 0
+        return self._pin.value
+
+    def clear(self) -> None:
+        """Forget the edges counted so far."""
+        if self._counter is not None:
+            self._counter.reset()
+
+    def deinit(self) -> None:
+        """Release the pin."""
+        if self._counter is not None:
+            self._counter.deinit()
+        else:
+            self._pin.deinit()
+
+
 # pylint: disable=too-many-instance-attributes
 # pylint: disable=too-many-nested-blocks
 class RFMSPI:
@@ -215,12 +266,52 @@ class RFMSPI:
 
         self.crc_error_count = 0
         self.timeout_poll = 0.001
+        self.dio0 = None
+        """The `DIOWatcher` set up by attach_dio0(), or None to poll registers."""
 
     # pylint: enable-msg=too-many-arguments
 
     # Global buffer for SPI commands
     _BUFFER = bytearray(4)
 
+    def attach_dio0(self, pin) -> None:
+        """Wait for send and receive completion on the radio's DIO0 pin
+        instead of reading its IRQ flags over SPI every timeout_poll.
+        The flags are read once to confirm an edge, so a spurious edge
+        cannot return an empty FIFO. Checking the pin is cheap, so
+        timeout_poll can be lowered to cut receive latency."""
+        self.detach_dio0()
+        self.dio0 = DIOWatcher(pin)
+
+    def detach_dio0(self) -> None:
+        """Release the DIO0 pin and go back to polling registers."""
+        if self.dio0 is not None:
+            self.dio0.deinit()
+            self.dio0 = None
+
+    async def asyncio_wait_for(self, flag: Callable, limit: float) -> bool:
+        """Wait up to limit seconds for the radio flag, a method such as
+        payload_ready, using DIO0 when attached. Returns True on timeout."""
+        dio0 = self.dio0
+        if dio0 is None:
+            return await asyncio_check_timeout(flag, limit, self.timeout_poll)
+
+        def ready() -> bool:
+            if not dio0():
+                return False
+            if flag():
+                return True
+            # Stale edge, e.g. from a packet dropped by idle(); wait for the next.
+            dio0.clear()
+            return False
+
+        return await asyncio_check_timeout(ready, limit, self.timeout_poll)
+
+    def _clear_interrupt(self) -> None:
+        if self.dio0 is not None:
+            self.dio0.clear()
+        self.clear_interrupt()
+
     # pylint: disable=no-member
     # Reconsider pylint: disable when this can be tested
     def read_into(self, address: int, buf: WriteableBuffer, length: Optional[int] = None) -> None:
@@ -319,20 +410,20 @@ class RFMSPI:
         else:
             payload = data
         self.fill_fifo(payload)
+        if self.dio0 is not None:
+            self.dio0.clear()
         # Turn on transmit mode to send out the packet.
         self.transmit()
-        # Wait for packet_sent interrupt with explicit polling (not ideal but
-        # best that can be done right now without interrupts).
-        timed_out = await asyncio_check_timeout(
-            self.packet_sent, self.xmit_timeout, self.timeout_poll
-        )
+        # Wait for the packet_sent interrupt, on DIO0 if attached or else by
+        # polling the register.
+        timed_out = await self.asyncio_wait_for(self.packet_sent, self.xmit_timeout)
         # Listen again if necessary and return the result packet.
         if keep_listening:
             self.listen()
         else:
             # Enter idle mode to stop receiving other packets.
             self.idle()
-        self.clear_interrupt()
+        self._clear_interrupt()
         return not timed_out
 
     send = asyncio_to_blocking(asyncio_send)
@@ -410,13 +501,12 @@ class RFMSPI:
         if timeout is None:
             timeout = self.receive_timeout
         if timeout is not None:
-            # Wait for the payloadready signal.  This is not ideal and will
-            # surely miss or overflow the FIFO when packets aren't read fast
-            # enough, however it's the best that can be done from Python without
-            # interrupt supports.
+            # Wait for the payloadready signal, on DIO0 if attached or else by
+            # polling the register. Packets arriving while the radio is idle
+            # between calls are still missed.
             # Make sure we are listening for packets.
             self.listen()
-            timed_out = await asyncio_check_timeout(self.payload_ready, timeout, self.timeout_poll)
+            timed_out = await self.asyncio_wait_for(self.payload_ready, timeout)
         # Payload ready is set, a packet is in the FIFO.
         packet = None
         # save last RSSI reading
@@ -449,7 +539,7 @@ class RFMSPI:
         else:
             # Enter idle mode to stop receiving other packets.
             self.idle()
-        self.clear_interrupt()
+        self._clear_interrupt()
         return packet
 
     receive = asyncio_to_blocking(asyncio_receive)
@@ -483,13 +573,12 @@ class RFMSPI:
         if timeout is None:
             timeout = self.receive_timeout
         if timeout is not None:
-            # Wait for the payloadready signal.  This is not ideal and will
-            # surely miss or overflow the FIFO when packets aren't read fast
-            # enough, however it's the best that can be done from Python without
-            # interrupt supports.
+            # Wait for the payloadready signal, on DIO0 if attached or else by
+            # polling the register. Packets arriving while the radio is idle
+            # between calls are still missed.
             # Make sure we are listening for packets.
             self.listen()
-            timed_out = await asyncio_check_timeout(self.payload_ready, timeout, self.timeout_poll)
+            timed_out = await self.asyncio_wait_for(self.payload_ready, timeout)
         # Payload ready is set, a packet is in the FIFO.
         packet = None
         # save last RSSI reading
@@ -548,10 +637,185 @@ class RFMSPI:
         else:
             # Enter idle mode to stop receiving other packets.
             self.idle()
-        self.clear_interrupt()
+        self._clear_interrupt()
         return packet
 
     receive_with_ack = asyncio_to_blocking(asyncio_receive_with_ack)
     """Non-asyncio wrapper to Receive a packet
     using the same arguments and keywords as asyncio_receive_with_ack()
     """
+
+
+def _ticks_ms() -> int:
+    if HAS_SUPERVISOR:
+        return supervisor.ticks_ms()
+    return int(time.monotonic() * 1000) & _TICKS_MAX
+
+
+class ReceivedPacket:
+    """One preallocated slot of a `PacketQueue`.
+
+    The buffer holds the packet as read from the FIFO, including the RadioHead
+    header when the radio is in RadioHead mode. The fields are overwritten when
+    the slot is reused.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.buffer = bytearray(size)
+        self._view = memoryview(self.buffer)
+        self.length = 0
+        """Number of bytes received, header included."""
+        self.offset = 0
+        """Start of the payload: 4 in RadioHead mode, else 0."""
+        self.rssi = 0.0
+        """RSSI of the packet in dBm."""
+        self.snr = None
+        """SNR of the packet in dB, or None if the radio does not report it."""
+        self.ticks = 0
+        """supervisor.ticks_ms() when the packet was taken from the FIFO."""
+
+    @property
+    def payload(self) -> memoryview:
+        """The payload without the RadioHead header, as a view of the buffer."""
+        return self._view[self.offset : self.length]
+
+    @property
+    def header(self) -> memoryview:
+        """The 4 byte RadioHead header (To, From, ID, Flags)."""
+        return self._view[0 : self.offset]
+
+
+class PacketQueue:
+    """Receives packets in the background into a fixed pool of buffers.
+
+    run() keeps the radio listening and moves each packet out of the FIFO as
+    soon as it arrives, with its RSSI, SNR and arrival time, so back-to-back
+    packets are not lost while the consumer is busy. Iterate the queue with
+    ``async for`` to consume them. A slot is reused once the iteration moves
+    past it, so copy anything needed later. Nothing is allocated per packet.
+
+    When every slot is full, new packets are read and discarded, counted in
+    dropped. Packets that fail the CRC are counted in the radio's
+    crc_error_count. In RadioHead mode, packets too short for the header or
+    addressed to another node are counted in rejected. No ACKs are sent, so use
+    asyncio_receive_with_ack() for reliable datagrams. Call send methods with
+    keep_listening=True while the queue runs, so the radio returns to receive
+    mode afterwards.
+
+    :param radio: An RFM9x, RFM9xFSK or RFM69 instance.
+    :param int slots: Number of packet buffers.
+    :param int size: Bytes per buffer, at least the FIFO size.
+    """
+
+    def __init__(self, radio: "RFMSPI", *, slots: int = 8, size: int = 256) -> None:
+        if slots < 1:
+            raise ValueError("slots must be at least 1")
+        self.radio = radio
+        self._slots = [ReceivedPacket(size) for _ in range(slots)]
+        self._discard = bytearray(size)
+        self._read = 0
+        self._count = 0
+        self._held = False
+        self._ready = asyncio.Event()
+        self._running = False
+        self._stopped = False
+        self.received = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.high_water = 0
+
+    def __len__(self) -> int:
+        """Packets waiting to be consumed."""
+        return self._count - self._held
+
+    def _payload_ready(self) -> bool:
+        dio0 = self.radio.dio0
+        if dio0 is not None and not dio0():
+            return False
+        return self.radio.payload_ready()
+
+    def _accept(self, packet: ReceivedPacket) -> bool:
+        radio = self.radio
+        if not radio.radiohead:
+            packet.offset = 0
+            return True
+        packet.offset = 4
+        if packet.length < 5:
+            return False
+        to = packet.buffer[0]
+        return (
+            radio.node == _RH_BROADCAST_ADDRESS or to in (_RH_BROADCAST_ADDRESS, radio.node)
+        )
+
+    def drain(self) -> bool:
+        """Move a packet from the FIFO into the queue if one is ready. Returns
+        True if a packet was taken. run() calls this; use it directly only
+        when not running the task."""
+        if not self._payload_ready():
+            return False
+        radio = self.radio
+        if radio.enable_crc and radio.crc_error:
+            radio.crc_error_count += 1
+        elif self._count == len(self._slots):
+            radio.read_fifo_into(self._discard)
+            self.dropped += 1
+        else:
+            packet = self._slots[(self._read + self._count) % len(self._slots)]
+            packet.ticks = _ticks_ms()
+            packet.rssi = radio.rssi
+            packet.snr = radio.snr
+            packet.length = radio.read_fifo_into(packet.buffer)
+            if self._accept(packet):
+                self._count += 1
+                self.received += 1
+                self.high_water = max(self.high_water, self._count)
+                self._ready.set()
+            else:
+                self.rejected += 1
+        radio._clear_interrupt()  # pylint: disable=protected-access
+        return True
+
+    async def run(self) -> None:
+        """Listen and queue packets until stop() is called."""
+        self._running = True
+        self._stopped = False
+        self.radio.listen()
+        while self._running:
+            if self.drain():
+                await asyncio.sleep(0)
+            else:
+                await asyncio.sleep(self.radio.timeout_poll)
+
+    def stop(self) -> None:
+        """Make run() return and end any ``async for`` once the queue is empty."""
+        self._running = False
+        self._stopped = True
+        self._ready.set()
+
+    def _release(self) -> None:
+        if self._held:
+            self._held = False
+            self._read = (self._read + 1) % len(self._slots)
+            self._count -= 1
+
+    def get_nowait(self) -> Optional[ReceivedPacket]:
+        """The next packet, or None if the queue is empty. The packet returned
+        before it is released."""
+        self._release()
+        if not self._count:
+            self._ready.clear()
+            return None
+        self._held = True
+        return self._slots[self._read]
+
+    def __aiter__(self) -> "PacketQueue":
+        return self
+
+    async def __anext__(self) -> ReceivedPacket:
+        while True:
+            packet = self.get_nowait()
+            if packet is not None:
+                return packet
+            if self._stopped:
+                raise StopAsyncIteration
+            await self._ready.wait()
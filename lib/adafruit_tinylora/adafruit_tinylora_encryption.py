@@ -8,25 +8,32 @@
 ======================================================
 Required tinyLoRA Encryption Methods for AES and
 Message Integrity checks.
+
+AES-128 is table driven: the round keys of each session key are expanded once
+and cached, and a block is encrypted in local variables, with the S-box and
+its products by 2 and 3 in GF(2^8) looked up from 256 byte tables. Every value
+stays a byte, so nothing is allocated per block, as 32-bit T-table words
+would be on CircuitPython.
+
 * Author(s): adafruit
 """
 
 try:  # typing
-    from typing import Annotated, List, Tuple, TypeAlias
+    from typing import Annotated, Tuple, TypeAlias
 
     # pylint: disable=invalid-name
     bytearray2: TypeAlias = Annotated[bytearray, 2]
     bytearray4: TypeAlias = Annotated[bytearray, 4]
     bytearray16: TypeAlias = Annotated[bytearray, 16]
 
-    StateMatrix: TypeAlias = List[bytearray4]
+    KeySchedule: TypeAlias = Annotated[bytes, 176]
 except ImportError:
     pass
 
 
 # from http://cs.ucsb.edu/~koc/cs178/projects/JT/aes.c
 def xtime(col: int) -> int:
-    """xtime impl. for _mix_single_column()"""
+    """Multiplication by 2 in GF(2^8), for MixColumns"""
     return (((col << 1) ^ 0x1B) & 0xFF) if (col & 0x80) else (col << 1)
 
 
@@ -52,8 +59,196 @@ S_BOX: Tuple[bytes, ...] = (
 )
 
 
+_SBOX = b"".join(S_BOX)
+# S-box multiplied by 2 and by 3 in GF(2^8), for MixColumns
+_SBOX2 = bytes(xtime(byte) for byte in _SBOX)
+_SBOX3 = bytes(xtime(byte) ^ byte for byte in _SBOX)
+
+# Key schedules by key, see key_schedule()
+_KEY_SCHEDULES = {}
+_CMAC_SUBKEYS = {}
+_MAX_KEYS = 4
+
+
+def key_schedule(key: bytearray16) -> KeySchedule:
+    """The 176 bytes of AES-128 round keys for ``key``. Schedules are cached,
+    so the keys of a session are only expanded once.
+
+    :param bytearray key: The 16 byte key
+    """
+    key = bytes(key)
+    schedule = _KEY_SCHEDULES.get(key)
+    if schedule is None:
+        if len(_KEY_SCHEDULES) >= _MAX_KEYS:
+            _KEY_SCHEDULES.clear()
+        expanded = bytearray(176)
+        expanded[0:16] = key
+        round_const = 0x01
+        for i in range(16, 176, 4):
+            byte0, byte1, byte2, byte3 = expanded[i - 4 : i]
+            if i % 16 == 0:
+                byte0, byte1, byte2, byte3 = (
+                    _SBOX[byte1] ^ round_const,
+                    _SBOX[byte2],
+                    _SBOX[byte3],
+                    _SBOX[byte0],
+                )
+                round_const = xtime(round_const)
+            expanded[i] = expanded[i - 16] ^ byte0
+            expanded[i + 1] = expanded[i - 15] ^ byte1
+            expanded[i + 2] = expanded[i - 14] ^ byte2
+            expanded[i + 3] = expanded[i - 13] ^ byte3
+        schedule = bytes(expanded)
+        _KEY_SCHEDULES[key] = schedule
+    return schedule
+
+
+def encrypt_block(block: bytearray16, schedule: KeySchedule) -> None:
+    """Encrypts a 16 byte block in place with AES-128.
+
+    :param bytearray block: The block to encrypt
+    :param bytes schedule: Round keys from `key_schedule`
+    """
+    # pylint: disable=too-many-locals
+    sbox = _SBOX
+    sbox2 = _SBOX2
+    sbox3 = _SBOX3
+    s0 = block[0] ^ schedule[0]
+    s1 = block[1] ^ schedule[1]
+    s2 = block[2] ^ schedule[2]
+    s3 = block[3] ^ schedule[3]
+    s4 = block[4] ^ schedule[4]
+    s5 = block[5] ^ schedule[5]
+    s6 = block[6] ^ schedule[6]
+    s7 = block[7] ^ schedule[7]
+    s8 = block[8] ^ schedule[8]
+    s9 = block[9] ^ schedule[9]
+    s10 = block[10] ^ schedule[10]
+    s11 = block[11] ^ schedule[11]
+    s12 = block[12] ^ schedule[12]
+    s13 = block[13] ^ schedule[13]
+    s14 = block[14] ^ schedule[14]
+    s15 = block[15] ^ schedule[15]
+    for k in range(16, 160, 16):
+        # SubBytes, ShiftRows, MixColumns and AddRoundKey for one column
+        # per row of four
+        s0, s1, s2, s3, s4, s5, s6, s7, s8, s9, s10, s11, s12, s13, s14, s15 = (
+            sbox2[s0] ^ sbox3[s5] ^ sbox[s10] ^ sbox[s15] ^ schedule[k],
+            sbox[s0] ^ sbox2[s5] ^ sbox3[s10] ^ sbox[s15] ^ schedule[k + 1],
+            sbox[s0] ^ sbox[s5] ^ sbox2[s10] ^ sbox3[s15] ^ schedule[k + 2],
+            sbox3[s0] ^ sbox[s5] ^ sbox[s10] ^ sbox2[s15] ^ schedule[k + 3],
+            sbox2[s4] ^ sbox3[s9] ^ sbox[s14] ^ sbox[s3] ^ schedule[k + 4],
+            sbox[s4] ^ sbox2[s9] ^ sbox3[s14] ^ sbox[s3] ^ schedule[k + 5],
+            sbox[s4] ^ sbox[s9] ^ sbox2[s14] ^ sbox3[s3] ^ schedule[k + 6],
+            sbox3[s4] ^ sbox[s9] ^ sbox[s14] ^ sbox2[s3] ^ schedule[k + 7],
+            sbox2[s8] ^ sbox3[s13] ^ sbox[s2] ^ sbox[s7] ^ schedule[k + 8],
+            sbox[s8] ^ sbox2[s13] ^ sbox3[s2] ^ sbox[s7] ^ schedule[k + 9],
+            sbox[s8] ^ sbox[s13] ^ sbox2[s2] ^ sbox3[s7] ^ schedule[k + 10],
+            sbox3[s8] ^ sbox[s13] ^ sbox[s2] ^ sbox2[s7] ^ schedule[k + 11],
+            sbox2[s12] ^ sbox3[s1] ^ sbox[s6] ^ sbox[s11] ^ schedule[k + 12],
+            sbox[s12] ^ sbox2[s1] ^ sbox3[s6] ^ sbox[s11] ^ schedule[k + 13],
+            sbox[s12] ^ sbox[s1] ^ sbox2[s6] ^ sbox3[s11] ^ schedule[k + 14],
+            sbox3[s12] ^ sbox[s1] ^ sbox[s6] ^ sbox2[s11] ^ schedule[k + 15],
+        )
+    # The last round has no MixColumns
+    block[0] = sbox[s0] ^ schedule[160]
+    block[1] = sbox[s5] ^ schedule[161]
+    block[2] = sbox[s10] ^ schedule[162]
+    block[3] = sbox[s15] ^ schedule[163]
+    block[4] = sbox[s4] ^ schedule[164]
+    block[5] = sbox[s9] ^ schedule[165]
+    block[6] = sbox[s14] ^ schedule[166]
+    block[7] = sbox[s3] ^ schedule[167]
+    block[8] = sbox[s8] ^ schedule[168]
+    block[9] = sbox[s13] ^ schedule[169]
+    block[10] = sbox[s2] ^ schedule[170]
+    block[11] = sbox[s7] ^ schedule[171]
+    block[12] = sbox[s12] ^ schedule[172]
+    block[13] = sbox[s1] ^ schedule[173]
+    block[14] = sbox[s6] ^ schedule[174]
+    block[15] = sbox[s11] ^ schedule[175]
+
+
+def ctr_xor(key: bytearray16, counter_block: bytearray16, data: bytearray) -> None:
+    """XORs ``data`` in place with an AES-128 counter mode keystream: the
+    encryptions of ``counter_block`` with its last byte set to 1, 2, 3 and so
+    on, as LoRaWAN encrypts payloads. The schedule is looked up once and the
+    keystream block reused, however long the data.
+
+    :param bytearray key: The 16 byte key
+    :param bytearray counter_block: The first 15 bytes of every counter block
+    :param bytearray data: The data to encrypt or decrypt, at most 255 blocks
+    """
+    schedule = key_schedule(key)
+    keystream = bytearray(16)
+    length = len(data)
+    counter = 1
+    for start in range(0, length, 16):
+        keystream[0:15] = counter_block[0:15]
+        keystream[15] = counter
+        encrypt_block(keystream, schedule)
+        for byte_index in range(start, min(start + 16, length)):
+            data[byte_index] ^= keystream[byte_index - start]
+        counter += 1
+
+
+def _cmac_subkeys(key: bytearray16, schedule: KeySchedule) -> Tuple[bytes, bytes]:
+    """The AES-CMAC subkeys K1 and K2 of ``key``, cached like its schedule."""
+    key = bytes(key)
+    subkeys = _CMAC_SUBKEYS.get(key)
+    if subkeys is None:
+        if len(_CMAC_SUBKEYS) >= _MAX_KEYS:
+            _CMAC_SUBKEYS.clear()
+        subkey = bytearray(16)
+        encrypt_block(subkey, schedule)
+        subkeys = []
+        for _ in range(2):
+            # Double in GF(2^128): shift left one bit, reducing by 0x87
+            carry = subkey[0] & 0x80
+            for byte_index in range(15):
+                subkey[byte_index] = ((subkey[byte_index] << 1) & 0xFF) | (
+                    subkey[byte_index + 1] >> 7
+                )
+            subkey[15] = (subkey[15] << 1) & 0xFF
+            if carry:
+                subkey[15] ^= 0x87
+            subkeys.append(bytes(subkey))
+        subkeys = tuple(subkeys)
+        _CMAC_SUBKEYS[key] = subkeys
+    return subkeys
+
+
+def cmac(key: bytearray16, data: bytearray) -> bytearray16:
+    """AES-CMAC (RFC 4493) of ``data``, the message integrity code of LoRaWAN.
+
+    :param bytearray key: The 16 byte key
+    :param bytearray data: The message
+    """
+    schedule = key_schedule(key)
+    key_1, key_2 = _cmac_subkeys(key, schedule)
+    mac = bytearray(16)
+    length = len(data)
+    last = max(0, (length - 1) // 16 * 16)
+    for start in range(0, last, 16):
+        for byte_index in range(16):
+            mac[byte_index] ^= data[start + byte_index]
+        encrypt_block(mac, schedule)
+    remainder = length - last
+    if remainder == 16:
+        for byte_index in range(16):
+            mac[byte_index] ^= data[last + byte_index] ^ key_1[byte_index]
+    else:
+        for byte_index in range(remainder):
+            mac[byte_index] ^= data[last + byte_index]
+        mac[remainder] ^= 0x80
+        for byte_index in range(16):
+            mac[byte_index] ^= key_2[byte_index]
+    encrypt_block(mac, schedule)
+    return mac
+
+
 class AES:
-    """TinyLoRA AES Implementation
+    """TinyLoRa AES Implementation
     Functions in this implementation are from and/or derived from AES-Python
     (https://github.com/bozhu/AES-Python) and TinyLoRa ()
     """
@@ -77,316 +272,37 @@ class AES:
         self.encrypt_payload(aes_data)
         return aes_data
 
+    def _fill_block(self, block: bytearray16, first: int) -> None:
+        """Fills in the A (encryption) or B0 (MIC) block of a frame.
+        :param bytearray block: 16 byte block, zeroed.
+        :param int first: 0x01 for A, 0x49 for B0.
+        """
+        block[0] = first
+        # block from device_address, MSB first
+        block[6] = self._device_address[3]
+        block[7] = self._device_address[2]
+        block[8] = self._device_address[1]
+        block[9] = self._device_address[0]
+        # block from frame counter
+        block[10] = self.frame_counter & 0x00FF
+        block[11] = (self.frame_counter >> 8) & 0x00FF
+
     def encrypt_payload(self, data: bytearray) -> None:
         """Encrypts data payload.
         :param bytearray data: Data to-be-encrypted.
         """
         block_a = bytearray(16)
-        # calculate required number of blocks
-        num_blocks = len(data) // 16
-        incomplete_block_size = len(data) % 16
-        if incomplete_block_size != 0:
-            num_blocks += 1
-
-        data_pointer = 0
-        block_counter = 1
-        while block_counter <= num_blocks:
-            block_a[0] = 0x01
-            block_a[1] = 0x00
-            block_a[2] = 0x00
-            block_a[3] = 0x00
-            block_a[4] = 0x00
-            block_a[5] = 0x00
-            # block from device_address, MSB first
-            block_a[6] = self._device_address[3]
-            block_a[7] = self._device_address[2]
-            block_a[8] = self._device_address[1]
-            block_a[9] = self._device_address[0]
-            # block from frame counter
-            block_a[10] = self.frame_counter & 0x00FF
-            block_a[11] = (self.frame_counter >> 8) & 0x00FF
-            block_a[12] = 0x00
-            block_a[13] = 0x00
-            block_a[14] = 0x00
-            block_a[15] = block_counter
-            # calculate S
-            self._aes_encrypt(block_a, self._app_key)
-            # check for last block
-            if block_counter != num_blocks:
-                for byte_index in range(16):
-                    data[data_pointer] ^= block_a[byte_index]
-                    data_pointer += 1
-            else:
-                if incomplete_block_size == 0:
-                    incomplete_block_size = 16
-                for byte_index in range(incomplete_block_size):
-                    data[data_pointer] ^= block_a[byte_index]
-                    data_pointer += 1
-            block_counter += 1
-
-    def _aes_encrypt(self, data: bytearray, key: bytearray) -> None:
-        """Performs 9 rounds of AES encryption on data per TinyLoRa spec.
-        NOTE: This is not an accurate aes_encrypt impl., tinylora performs
-        an additional key calculation after 9 rounds.
-        :param bytearray data: Data array.
-        :param bytearray key: Round Key Array.
-        """
-        state: StateMatrix = [
-            bytearray(b"0000"),
-            bytearray(b"0000"),
-            bytearray(b"0000"),
-            bytearray(b"0000"),
-        ]
-        # Copy Data to State Array for manipulation
-        for col in range(4):
-            for row in range(4):
-                state[col][row] = data[row + (col << 2)]
-        # copy key to round_key
-        round_key = bytearray(key)
-        self._aes_add_round_key(round_key, state)
-        # encrypt data 9x
-        for round_nums in range(1, 10):
-            self._round_encrypt(state, round_key, round_nums)
-        self._aes_sub_bytes(state)
-        self._aes_shift_rows(state)
-        self._aes_calculate_key(10, round_key)
-        self._aes_add_round_key(round_key, state)
-        for row in range(4):
-            for col in range(4):
-                data[col + (row << 2)] = state[row][col]
-
-    def _round_encrypt(
-        self, state: StateMatrix, key: bytearray, num_round: int
-    ) -> None:
-        """Performs one round of AES.
-        :param bytearray state: State array.
-        :param bytearray key: Round key array.
-        :param int round: AES round number.
-        """
-        self._aes_sub_bytes(state)
-        self._aes_shift_rows(state)
-        self._aes_mix_columns(state)
-        self._aes_calculate_key(num_round, key)
-        self._aes_add_round_key(key, state)
-
-    def _aes_calculate_key(self, num_round: int, round_key: bytearray) -> None:
-        """Performs round key calculation per TinyLoRa's spec.
-        :param int num_round: Round number
-        :param bytearray round_key: Round key array.
-        """
-        tmp_arr = bytearray(4)
-        round_const = 0x01
-        # add round_const calculation
-        while num_round != 1:
-            byte = round_const & 0x80
-            round_const <<= 1
-            round_const &= 0xFF
-            if byte == 0x80:
-                round_const ^= 0x1B
-            num_round -= 1
-        # Calculate first temp
-        tmp_arr[0] = self._aes_sub_byte(round_key[12 + 1])
-        tmp_arr[1] = self._aes_sub_byte(round_key[12 + 2])
-        tmp_arr[2] = self._aes_sub_byte(round_key[12 + 3])
-        tmp_arr[3] = self._aes_sub_byte(round_key[12 + 0])
-        # XOR tmp_arr[0] wth round_const first
-        tmp_arr[0] ^= round_const
-        # then calculate new round key
-        for row in range(4):
-            for col in range(4):
-                round_key[col + (row << 2)] ^= tmp_arr[col]
-                tmp_arr[col] = round_key[col + (row << 2)]
-
-    @staticmethod
-    def _aes_add_round_key(round_key: bytearray, state: StateMatrix) -> None:
-        """AES AddRoundKey Step: Round_Key combined with the state.
-        :param bytearray round_key: Subkey for each round.
-        :param bytearray state: State array.
-        """
-        for col in range(4):
-            for row in range(4):
-                state[col][row] ^= round_key[row + (col << 2)]
-
-    @staticmethod
-    def _aes_sub_byte(sub_byte: int) -> int:
-        """Sub-Byte Step: Used for returning specific byte
-        from the AES S_BOX.
-        :param byte sub_byte: byte to be replaced with S_BOX byte.
-        """
-        row = (sub_byte >> 4) & 0x0F
-        col = sub_byte & 0x0F
-        return S_BOX[row][col]
-
-    def _aes_sub_bytes(self, state: StateMatrix) -> None:
-        """AES SubBytes Step: Replace state arr. bytes w/sub-byte from S_BOX
-        :param bytearray s: State array.
-        """
-        for col in range(4):
-            for row in range(4):
-                state[row][col] = self._aes_sub_byte(state[row][col])
-
-    @staticmethod
-    def _mix_single_column(col: bytearray4) -> None:
-        """Mixes individual columns with state array
-        :param bytearray col: Column from statearray
-        """
-        temp = col[0] ^ col[1] ^ col[2] ^ col[3]
-        col_zero = col[0]
-        col[0] ^= temp ^ xtime(col[0] ^ col[1])
-        col[1] ^= temp ^ xtime(col[1] ^ col[2])
-        col[2] ^= temp ^ xtime(col[2] ^ col[3])
-        col[3] ^= temp ^ xtime(col[3] ^ col_zero)
-
-    def _aes_mix_columns(self, state: StateMatrix) -> None:
-        """AES MixColumns Step: Multiplies each column of the state array with xtime.
-        :param bytearray state: State array.
-        """
-        for column_index in range(4):
-            self._mix_single_column(state[column_index])
-
-    @staticmethod
-    def _aes_shift_rows(arr: StateMatrix) -> None:
-        """AES ShiftRows Step: State array's bytes shifted to the left.
-        :param bytearray state: State array.
-        """
-        arr[0][1], arr[1][1], arr[2][1], arr[3][1] = (
-            arr[1][1],
-            arr[2][1],
-            arr[3][1],
-            arr[0][1],
-        )
-        arr[0][2], arr[1][2], arr[2][2], arr[3][2] = (
-            arr[2][2],
-            arr[3][2],
-            arr[0][2],
-            arr[1][2],
-        )
-        arr[0][3], arr[1][3], arr[2][3], arr[3][3] = (
-            arr[3][3],
-            arr[0][3],
-            arr[1][3],
-            arr[2][3],
-        )
+        self._fill_block(block_a, 0x01)
+        ctr_xor(self._app_key, block_a, data)
 
     def calculate_mic(
         self, lora_packet: bytearray, lora_packet_length: int, mic: bytearray4
     ) -> bytearray4:
         """Calculates the validity of data messages, generates message integrity check bytearray."""
-        block_b = bytearray(16)
-        key_k1 = bytearray(16)
-        key_k2 = bytearray(16)
-        old_data = bytearray(16)
-        new_data = bytearray(16)
-        block_b[0] = 0x49
-        block_b[6] = self._device_address[3]
-        block_b[7] = self._device_address[2]
-        block_b[8] = self._device_address[1]
-        block_b[9] = self._device_address[0]
-        block_b[10] = self.frame_counter & 0x00FF
-        block_b[11] = (self.frame_counter >> 8) & 0x00FF
-        block_b[15] = lora_packet_length
-        # calculate num. of blocks and blocksz of last block
-        num_blocks = lora_packet_length // 16
-        incomplete_block_size = lora_packet_length % 16
-        if incomplete_block_size != 0:
-            num_blocks += 1
-        # generate keys
-        self._mic_generate_keys(key_k1, key_k2)
-        # aes encryption on block_b
-        self._aes_encrypt(block_b, self._network_key)
-        # copy block_b to old_data
-        for byte_index in range(16):
-            old_data[byte_index] = block_b[byte_index]
-        block_counter = 1
-        # calculate until n-1 packet blocks
-        data_pointer = 0
-        while block_counter < num_blocks:
-            # copy data into array
-            for byte_index in range(16):
-                new_data[byte_index] = lora_packet[data_pointer]
-                data_pointer += 1
-            # XOR new_data with old_data
-            self._xor_data(new_data, old_data)
-            # aes encrypt new_data
-            self._aes_encrypt(new_data, self._network_key)
-            # copy new_data to old_data
-            for byte_index in range(16):
-                old_data[byte_index] = new_data[byte_index]
-            # increase block_counter
-            block_counter += 1
-        # perform calculation on last block
-        if incomplete_block_size == 0:
-            for byte_index in range(16):
-                new_data[byte_index] = lora_packet[data_pointer]
-                data_pointer += 1
-            # xor with key 1
-            self._xor_data(new_data, key_k1)
-            # xor with old data
-            self._xor_data(new_data, old_data)
-            # aes routine
-            self._aes_encrypt(new_data, self._network_key)
-        else:
-            # copy the remaining data
-            for byte_index in range(16):
-                if byte_index < incomplete_block_size:
-                    new_data[byte_index] = lora_packet[data_pointer]
-                    data_pointer += 1
-                if byte_index == incomplete_block_size:
-                    new_data[byte_index] = 0x80
-                if byte_index > incomplete_block_size:
-                    new_data[byte_index] = 0x00
-            # perform xor with key 2
-            self._xor_data(new_data, key_k2)
-            # perform xor with old data
-            self._xor_data(new_data, old_data)
-            self._aes_encrypt(new_data, self._network_key)
-        # load MIC[] with data
-        mic[0] = new_data[0]
-        mic[1] = new_data[1]
-        mic[2] = new_data[2]
-        mic[3] = new_data[3]
+        message = bytearray(16 + lora_packet_length)
+        self._fill_block(message, 0x49)
+        message[15] = lora_packet_length
+        message[16:] = lora_packet[0:lora_packet_length]
+        mic[0:4] = cmac(self._network_key, message)[0:4]
         # return message integrity check array to calling method
         return mic
-
-    def _mic_generate_keys(self, key_1: bytearray16, key_2: bytearray16) -> None:
-        # encrypt the 0's in k1 with network key
-        self._aes_encrypt(key_1, self._network_key)
-        # perform gen_key on key_1
-        # check if key_1's msb is 1
-        msb_key = (key_1[0] & 0x80) == 0x80
-        # shift k1 left 1b
-        self._shift_left(key_1)
-        # check if msb is 1
-        if msb_key:
-            key_1[15] ^= 0x87
-        # perform gen_key on key_2
-        # copy key_1 to key_2
-        key_2[0:16] = key_1[0:16]
-        msb_key = (key_2[0] & 0x80) == 0x80
-        self._shift_left(key_2)
-        # check if msb is 1
-        if msb_key:
-            key_2[15] ^= 0x87
-
-    @staticmethod
-    def _shift_left(data: bytearray16) -> None:
-        """Shifts data bytearray left by 1"""
-        for byte_index in range(16):
-            if byte_index < 15:
-                if (data[byte_index + 1] & 0x80) == 0x80:
-                    overflow = 1
-                else:
-                    overflow = 0
-            else:
-                overflow = 0
-            # shift 1b left
-            data[byte_index] = ((data[byte_index] << 1) + overflow) & 0xFF
-
-    @staticmethod
-    def _xor_data(new_data: bytearray16, old_data: bytearray16) -> None:
-        """XOR two data arrays
-        :param bytearray new_data: Calculated data.
-        :param bytearray old_data: data to be xor'd.
-        """
-        for byte_index in range(16):
-            new_data[byte_index] ^= old_data[byte_index]
@@ -0,0 +1,269 @@
+"""
+`link_adapt`
+====================================================
+
+Adaptive data rate for the LoRa telemetry link.
+
+:class:`LinkAdapter` keeps the SNR of recently received packets and picks the
+fastest modem setting whose demodulation floor, plus a safety margin, is still
+below the worst recent SNR. It moves to slower settings at once and to faster
+settings one step at a time. LoRa reports the channel SNR whatever the spreading
+factor, so measurements carry over between settings.
+
+The SNR is measured by whichever end receives, so the side that adapts needs it
+fed back, for example in ACK packets. Both ends must also switch together:
+send the new :attr:`LinkAdapter.index` at the old setting before calling
+:meth:`LinkAdapter.apply`.
+
+:func:`simulate` replays a recorded ``t_ms,rssi,snr`` trace to compare the
+goodput of the adaptive link against a fixed SF12 one.
+"""
+
+from array import array
+
+from telemetry import RADIOHEAD_HEADER_SIZE, time_on_air_ms
+
+try:
+    from typing import List, Optional, Sequence, Tuple
+except ImportError:
+    pass
+
+# Lowest SNR in dB each spreading factor demodulates at, from the SX1276
+# datasheet.
+DEMODULATION_SNR = {
+    6: -5.0,
+    7: -7.5,
+    8: -10.0,
+    9: -12.5,
+    10: -15.0,
+    11: -17.5,
+    12: -20.0,
+}
+
+# (spreading factor, bandwidth, coding rate), fastest first.
+DEFAULT_RATES = (
+    (7, 125000, 5),
+    (8, 125000, 5),
+    (9, 125000, 5),
+    (10, 125000, 5),
+    (11, 125000, 5),
+    (12, 125000, 5),
+)
+
+
+def required_snr(spreading_factor: int, bandwidth: int = 125000) -> float:
+    """Demodulation floor in dB. Each doubling of bandwidth above 125 kHz
+    costs 3 dB, since it lets in twice the noise."""
+    floor = DEMODULATION_SNR[spreading_factor]
+    while bandwidth > 125000:
+        floor += 3.0
+        bandwidth //= 2
+    return floor
+
+
+class LinkAdapter:  # pylint: disable=too-many-instance-attributes
+    """Chooses a modem setting from recent SNR measurements.
+
+    :param rates: ``(spreading_factor, bandwidth, coding_rate)`` settings,
+        fastest first.
+    :param float margin_db: SNR to keep above the demodulation floor.
+    :param int window: Number of recent measurements considered.
+    :param int start: Index of the setting to start at, by default the slowest.
+    """
+
+    def __init__(
+        self,
+        rates: Sequence[Tuple[int, int, int]] = DEFAULT_RATES,
+        *,
+        margin_db: float = 5.0,
+        window: int = 8,
+        start: Optional[int] = None,
+    ) -> None:
+        if not rates:
+            raise ValueError("At least one rate is needed")
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        self.rates = tuple(rates)
+        self.margin_db = margin_db
+        self._floors = array("f", (required_snr(sf, bw) for sf, bw, _ in self.rates))
+        self._snr = array("f", (0.0,) * window)
+        self._count = 0
+        self._next = 0
+        self.index = len(self.rates) - 1 if start is None else start
+        self.changes = 0
+        self.losses = 0
+
+    @property
+    def rate(self) -> Tuple[int, int, int]:
+        """The current ``(spreading_factor, bandwidth, coding_rate)``."""
+        return self.rates[self.index]
+
+    def record(self, snr: float) -> int:
+        """Add the SNR of a received packet and return the index of the
+        setting to use now."""
+        self._snr[self._next] = snr
+        self._next = (self._next + 1) % len(self._snr)
+        self._count = min(self._count + 1, len(self._snr))
+        return self.choose()
+
+    def record_loss(self) -> int:
+        """Note a lost packet or missing ACK: drop the measurements and fall
+        back one step to a slower setting."""
+        self.losses += 1
+        self._count = 0
+        self._next = 0
+        return self._move(min(self.index + 1, len(self.rates) - 1))
+
+    @property
+    def worst_snr(self) -> Optional[float]:
+        """Lowest SNR in the window, or None before any measurement."""
+        if not self._count:
+            return None
+        return min(self._snr[i] for i in range(self._count))
+
+    def choose(self) -> int:
+        """Pick the setting for the current window and return its index."""
+        worst = self.worst_snr
+        if worst is None:
+            return self.index
+        usable = len(self.rates) - 1
+        for i, floor in enumerate(self._floors):
+            if floor + self.margin_db <= worst:
+                usable = i
+                break
+        if usable < self.index:
+            # Speed up one step at a time, so a lucky window cannot jump
+            # straight to the fastest setting.
+            usable = self.index - 1
+        return self._move(usable)
+
+    def _move(self, index: int) -> int:
+        if index != self.index:
+            self.index = index
+            self.changes += 1
+        return index
+
+    def apply(self, radio) -> None:
+        """Program the current setting into an `adafruit_rfm.rfm9x.RFM9x`,
+        writing only what changed. Call ``read_modem_config`` on a
+        `telemetry.TelemetryDownlink` afterwards so its airtime budget
+        follows."""
+        spreading_factor, bandwidth, coding_rate = self.rate
+        if radio.spreading_factor != spreading_factor:
+            radio.spreading_factor = spreading_factor
+        if radio.signal_bandwidth != bandwidth:
+            radio.signal_bandwidth = bandwidth
+        if radio.coding_rate != coding_rate:
+            radio.coding_rate = coding_rate
+        # Symbols longer than 16 ms need the low data rate optimization.
+        radio.low_datarate_optimize = (1 << spreading_factor) * 1000 / bandwidth > 16
+
+    def time_on_air(self, payload_length: int) -> float:
+        """Airtime in milliseconds of a RadioHead packet carrying
+        ``payload_length`` bytes at the current setting."""
+        spreading_factor, bandwidth, coding_rate = self.rate
+        return time_on_air_ms(
+            payload_length + RADIOHEAD_HEADER_SIZE,
+            spreading_factor,
+            bandwidth,
+            coding_rate,
+        )
+
+
+def load_trace(path: str) -> List[Tuple[int, float, float]]:
+    """Read a ``t_ms,rssi,snr`` CSV trace, as logged from a receiver's
+    ``last_rssi`` and ``last_snr``. A header row is skipped."""
+    trace = []
+    with open(path, "r") as trace_file:
+        for line in trace_file:
+            fields = line.strip().split(",")
+            if len(fields) < 3:
+                continue
+            try:
+                trace.append((int(fields[0]), float(fields[1]), float(fields[2])))
+            except ValueError:
+                continue
+    return trace
+
+
+def synthetic_trace(
+    *,
+    duration_ms: int = 300000,
+    step_ms: int = 1000,
+    start_snr: float = 10.0,
+    end_snr: float = -18.0,
+    fade_db: float = 3.0,
+    seed: int = 1,
+) -> List[Tuple[int, float, float]]:
+    """A ``(t_ms, rssi, snr)`` trace of a link fading as the rocket drifts
+    away, with random fades on top."""
+    import random  # pylint: disable=import-outside-toplevel
+
+    rng = random.Random(seed)
+    trace = []
+    for t in range(0, duration_ms, step_ms):
+        snr = start_snr + (end_snr - start_snr) * t / duration_ms
+        snr -= abs(rng.gauss(0, fade_db))
+        trace.append((t, -120.0 + snr, snr))
+    return trace
+
+
+def simulate(
+    trace: Sequence[Tuple[int, float, float]],
+    adapter: LinkAdapter,
+    payload_length: int = 200,
+    feedback_every: int = 1,
+) -> dict:
+    """Send packets back to back across ``trace`` and return the goodput.
+
+    A packet is delivered when the trace SNR at its start clears the floor of
+    the setting used. The adapter sees the SNR of every ``feedback_every``-th
+    delivered packet and every loss.
+    """
+    if not trace:
+        raise ValueError("Empty trace")
+    end = trace[-1][0]
+    t = trace[0][0]
+    position = 0
+    sent = delivered = 0
+    while t < end:
+        while position + 1 < len(trace) and trace[position + 1][0] <= t:
+            position += 1
+        snr = trace[position][2]
+        spreading_factor, bandwidth, _ = adapter.rate
+        airtime = adapter.time_on_air(payload_length)
+        sent += 1
+        if snr >= required_snr(spreading_factor, bandwidth):
+            delivered += 1
+            if delivered % feedback_every == 0:
+                adapter.record(snr)
+        else:
+            adapter.record_loss()
+        t += airtime
+    seconds = (end - trace[0][0]) / 1000
+    return {
+        "sent": sent,
+        "delivered": delivered,
+        "goodput_bps": delivered * payload_length * 8 / seconds,
+        "changes": adapter.changes,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    sim_trace = load_trace(sys.argv[1]) if len(sys.argv) > 1 else synthetic_trace()
+    adaptive = simulate(sim_trace, LinkAdapter())
+    fixed = simulate(sim_trace, LinkAdapter(DEFAULT_RATES[-1:]))
+    for name, result in (("adaptive", adaptive), ("fixed SF12", fixed)):
+        print(
+            "%s: %d/%d packets delivered, %.0f bit/s goodput, %d rate changes"
+            % (
+                name,
+                result["delivered"],
+                result["sent"],
+                result["goodput_bps"],
+                result["changes"],
+            )
+        )
+    print("Speedup: %.1fx" % (adaptive["goodput_bps"] / fixed["goodput_bps"]))
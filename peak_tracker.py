@@ -0,0 +1,126 @@
+"""
+`peak_tracker`
+====================================================
+
+Running acceleration peaks for the flight computer.
+
+:class:`PeakTracker` keeps per-axis maximum and minimum, the peak magnitude,
+the time each peak happened and the RMS of every sample fed to it, in constant
+memory however long the window is. It is fed alongside the IMU capture, and can
+also collect the wake-up (shock) and free-fall events the LSM6DS latches on
+chip, so short shocks between two host reads are still counted.
+"""
+
+import math
+
+from adafruit_lsm6ds import WAKE_UP, FREE_FALL
+
+try:
+    from typing import Optional, Sequence, Tuple
+except ImportError:
+    pass
+
+_INF = float("inf")
+
+
+class PeakTracker:  # pylint: disable=too-many-instance-attributes
+    """Tracks acceleration extremes and RMS over one window.
+
+    Times are the ``ticks_ms`` values passed in with each sample. Call
+    :meth:`reset` to start a new window.
+    """
+
+    def __init__(self) -> None:
+        self._sample = [0.0, 0.0, 0.0]  # Scratch for update()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all statistics and start a new window."""
+        self.maximum = [-_INF, -_INF, -_INF]
+        self.minimum = [_INF, _INF, _INF]
+        self.maximum_ticks = [None, None, None]
+        self.minimum_ticks = [None, None, None]
+        self.peak_magnitude_ticks = None
+        self.count = 0
+        self.shock_count = 0
+        self.free_fall_count = 0
+        self.last_shock_ticks = None
+        self.last_free_fall_ticks = None
+        self._peak_squared = 0.0
+        self._sum_squared = [0.0, 0.0, 0.0]
+
+    def update(self, now: int, x: float, y: float, z: float) -> None:
+        """Add one acceleration sample in m/s^2 taken at ``now`` ticks."""
+        sample = self._sample
+        sample[0] = x
+        sample[1] = y
+        sample[2] = z
+        self.update_motion(now, sample)
+
+    def update_motion(self, now: int, motion: Sequence[float]) -> None:
+        """Add the acceleration from a ``LSM6DS.read_motion`` array, or any
+        sequence whose first three values are x, y and z in m/s^2."""
+        self.count += 1
+        maximum = self.maximum
+        minimum = self.minimum
+        sum_squared = self._sum_squared
+        squared = 0.0
+        # Indexing over range() keeps the per-sample path free of tuples.
+        for axis in range(3):
+            value = motion[axis]
+            if value > maximum[axis]:
+                maximum[axis] = value
+                self.maximum_ticks[axis] = now
+            if value < minimum[axis]:
+                minimum[axis] = value
+                self.minimum_ticks[axis] = now
+            value *= value
+            sum_squared[axis] += value
+            squared += value
+        # Compare squared magnitudes so no sqrt is needed per sample.
+        if squared > self._peak_squared:
+            self._peak_squared = squared
+            self.peak_magnitude_ticks = now
+
+    def poll_events(self, now: int, sensor) -> int:
+        """Collect the wake-up and free-fall events latched by ``sensor``, an
+        LSM6DSOX, LSM6DSO32 or ISM330DHCX with `wake_up_threshold` or
+        `free_fall_threshold` configured.
+
+        Events that happened since the previous poll are stamped with ``now``.
+        Returns the raw ``motion_event_flags`` that were read.
+        """
+        flags = sensor.motion_event_flags
+        self.record_events(now, flags)
+        return flags
+
+    def record_events(self, now: int, flags: int) -> None:
+        """Count the events in ``motion_event_flags`` value ``flags`` read at
+        ``now`` ticks."""
+        if flags & WAKE_UP:
+            self.shock_count += 1
+            self.last_shock_ticks = now
+        if flags & FREE_FALL:
+            self.free_fall_count += 1
+            self.last_free_fall_ticks = now
+
+    @property
+    def peak_magnitude(self) -> float:
+        """The largest acceleration magnitude seen, in m/s^2."""
+        return math.sqrt(self._peak_squared)
+
+    @property
+    def rms(self) -> Optional[Tuple[float, float, float]]:
+        """Per-axis RMS acceleration in m/s^2, or None before the first sample."""
+        if not self.count:
+            return None
+        count = self.count
+        return tuple(math.sqrt(total / count) for total in self._sum_squared)
+
+    @property
+    def rms_magnitude(self) -> Optional[float]:
+        """RMS of the acceleration magnitude in m/s^2, or None before the first
+        sample."""
+        if not self.count:
+            return None
+        return math.sqrt(sum(self._sum_squared) / self.count)
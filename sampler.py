@@ -0,0 +1,172 @@
+"""
+`sampler`
+====================================================
+
+Multi-sensor sampler with a common timebase.
+
+Any driver read is registered as a :class:`Channel` with a target rate. Each
+channel runs as its own ``asyncio`` task on deadlines computed with
+`adafruit_ticks`, so a slow read on one sensor delays only that channel. Every
+record is stamped with the ``ticks_ms`` value its read finished at, taken from
+the one clock shared by all channels, so records reach ``on_record`` in stamp
+order even when a read is awaited. Each channel keeps jitter and
+missed-deadline statistics.
+"""
+
+import asyncio
+
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
+
+try:
+    from typing import Any, Callable, List, Optional
+except ImportError:
+    pass
+
+
+class Channel:  # pylint: disable=too-many-instance-attributes
+    """One periodic sensor read and its timing statistics.
+
+    Created by :meth:`Sampler.add`.
+
+    :param str name: Name the records are tagged with.
+    :param read: Callable returning the sample, or a coroutine function when
+        ``awaitable`` is True.
+    :param int period_ms: Target time between reads.
+    :param bool awaitable: Await ``read()`` instead of calling it directly.
+    """
+
+    def __init__(
+        self, name: str, read: Callable, period_ms: int, awaitable: bool = False
+    ) -> None:
+        self.name = name
+        self.read = read
+        self.period_ms = period_ms
+        self.awaitable = awaitable
+        self.last_ticks = None
+        self.last_value = None
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        """Zero the timing statistics."""
+        self.samples = 0
+        self.missed = 0
+        self.max_jitter_ms = 0
+        self.max_read_ms = 0
+        self._jitter_total = 0
+
+    def record(self, now: int, value: Any, jitter_ms: int, read_ms: int) -> None:
+        """Store a sample whose read finished at ``now`` ticks and update the
+        statistics."""
+        self.samples += 1
+        self._jitter_total += jitter_ms
+        if jitter_ms > self.max_jitter_ms:
+            self.max_jitter_ms = jitter_ms
+        if read_ms > self.max_read_ms:
+            self.max_read_ms = read_ms
+        self.last_ticks = now
+        self.last_value = value
+
+    @property
+    def mean_jitter_ms(self) -> float:
+        """Average lateness of a read against its deadline in milliseconds."""
+        if not self.samples:
+            return 0.0
+        return self._jitter_total / self.samples
+
+    @property
+    def rate_hz(self) -> float:
+        """The target rate in Hz."""
+        return 1000 / self.period_ms
+
+    def report(self) -> str:
+        """One-line summary of the channel's statistics."""
+        return "%s: %.1f Hz, %d samples, %d missed, jitter %.1f/%d ms, read %d ms" % (
+            self.name,
+            self.rate_hz,
+            self.samples,
+            self.missed,
+            self.mean_jitter_ms,
+            self.max_jitter_ms,
+            self.max_read_ms,
+        )
+
+
+class Sampler:
+    """Reads several sensors at their own rates on one clock.
+
+    :param on_record: Called as ``on_record(channel, ticks, value)`` after every
+        read.
+    :param clock: Callable returning the current ``ticks_ms`` value.
+    """
+
+    def __init__(
+        self,
+        on_record: Optional[Callable[[Channel, int, Any], None]] = None,
+        clock: Callable[[], int] = ticks_ms,
+    ) -> None:
+        self.on_record = on_record
+        self.channels = []  # type: List[Channel]
+        self._clock = clock
+        self._running = False
+
+    def add(
+        self, name: str, read: Callable, rate_hz: float, *, awaitable: bool = False
+    ) -> Channel:
+        """Register ``read`` to be sampled at ``rate_hz``.
+
+        ``read`` takes no arguments, so pass a bound method or a lambda such
+        as ``lambda: imu.read_motion(motion)``. Set ``awaitable`` for asyncio
+        reads such as ``altimeter.asyncio_altitude``.
+        """
+        if rate_hz <= 0:
+            raise ValueError("rate_hz must be positive")
+        channel = Channel(name, read, max(1, int(1000 / rate_hz + 0.5)), awaitable)
+        self.channels.append(channel)
+        return channel
+
+    def stop(self) -> None:
+        """Make :meth:`run` return once each channel's current read finishes.
+        Safe to call from ``on_record``."""
+        self._running = False
+
+    async def _run_channel(self, channel: Channel) -> None:
+        clock = self._clock
+        period = channel.period_ms
+        deadline = clock()
+        while self._running:
+            # Always yield, even when late, so one channel cannot starve the
+            # others.
+            await asyncio.sleep(max(0, ticks_diff(deadline, clock())) / 1000)
+            if not self._running:
+                break
+            start = clock()
+            if channel.awaitable:
+                value = await channel.read()
+            else:
+                value = channel.read()
+            # Stamped when the read returns: an awaited read lets other
+            # channels log in the meantime, and a start stamp would put this
+            # record behind theirs.
+            now = clock()
+            channel.record(
+                now, value, ticks_diff(start, deadline), ticks_diff(now, start)
+            )
+            if self.on_record is not None:
+                self.on_record(channel, now, value)
+            deadline = ticks_add(deadline, period)
+            late = ticks_diff(clock(), deadline)
+            if late > 0:
+                # Drop the deadlines that have already passed instead of
+                # bursting through them.
+                skipped = late // period + 1
+                channel.missed += skipped
+                deadline = ticks_add(deadline, skipped * period)
+
+    async def run(self) -> None:
+        """Sample every channel until :meth:`stop` is called."""
+        self._running = True
+        await asyncio.gather(*[self._run_channel(channel) for channel in self.channels])
+
+    def report(self) -> List[str]:
+        """Summary lines for every channel."""
+        return [channel.report() for channel in self.channels]
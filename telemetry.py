@@ -0,0 +1,531 @@
+"""
+`telemetry`
+====================================================
+
+Compact binary telemetry downlink over an `adafruit_rfm` LoRa radio.
+
+Each packet is one frame of state vectors: flight state, event flags,
+altitude, vertical velocity and acceleration, scaled to fixed point. The first
+sample of a frame is absolute and the rest are 8 bit deltas from the sample
+before, falling back to an absolute sample whenever a delta does not fit. Every
+frame decodes on its own, so a lost packet costs only its own samples.
+
+Frames fit the 252 byte radio payload. :class:`TelemetryDownlink` sends one
+whenever the airtime budget allows, computed from the radio's spreading factor,
+bandwidth and coding rate with :func:`time_on_air_ms`, so slow, long range
+settings send fewer but fuller frames. :class:`TelemetryDecoder` unpacks frames
+on the ground station and counts lost frames from the sequence numbers.
+
+Frame layout, little endian::
+
+    header    <BBHI    version, sample count, sequence, ticks_ms of sample 0
+    absolute  <BHih3h  tag, ms since sample 0, altitude, velocity, accel x/y/z
+    delta     <BB5b    tag, ms since previous sample, the same five deltas
+
+The tag holds the flight state in bits 0-2, the `FLAG_SHOCK` and
+`FLAG_FREE_FALL` event bits and `TAG_ABSOLUTE` in bit 7. Altitude, velocity
+and acceleration are in units of 0.1 m, 0.1 m/s and 0.1 m/s^2.
+"""
+
+import asyncio
+import math
+import struct
+
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
+
+try:
+    from typing import Callable, List, Optional, Sequence, Tuple
+except ImportError:
+    pass
+
+MAX_FRAME_SIZE = 252
+RADIOHEAD_HEADER_SIZE = 4
+
+FRAME_VERSION = 1
+HEADER_SIZE = 8
+ABSOLUTE_SIZE = 15
+DELTA_SIZE = 7
+
+TAG_ABSOLUTE = 0x80
+FLAG_SHOCK = 0x08
+FLAG_FREE_FALL = 0x10
+_STATE_MASK = 0x07
+_FLAG_MASK = FLAG_SHOCK | FLAG_FREE_FALL
+
+SCALE = 10
+
+_HEADER_FORMAT = "<BBHI"
+_ABSOLUTE_FORMAT = "<BHih3h"
+_DELTA_FORMAT = "<BB5b"
+
+
+def time_on_air_ms(  # pylint: disable=too-many-arguments
+    payload_length: int,
+    spreading_factor: int = 7,
+    bandwidth: int = 125000,
+    coding_rate: int = 5,
+    *,
+    preamble_length: int = 8,
+    crc: bool = True,
+    explicit_header: bool = True,
+    low_data_rate: Optional[bool] = None,
+) -> float:
+    """LoRa time on air of one packet in milliseconds, per the Semtech SX127x
+    datasheet.
+
+    :param int payload_length: Bytes sent, including the 4 byte RadioHead header.
+    :param int spreading_factor: 6 to 12.
+    :param int bandwidth: Signal bandwidth in Hz.
+    :param int coding_rate: The 4/x coding rate denominator, 5 to 8.
+    :param int preamble_length: Preamble symbols programmed in the radio.
+    :param bool crc: Payload CRC enabled.
+    :param bool explicit_header: Explicit header mode, the RadioHead default.
+    :param bool low_data_rate: Low data rate optimization. None enables it when
+        a symbol lasts longer than 16 ms, as the datasheet requires.
+    """
+    symbol_ms = (1 << spreading_factor) * 1000 / bandwidth
+    if low_data_rate is None:
+        low_data_rate = symbol_ms > 16
+    numerator = (
+        8 * payload_length
+        - 4 * spreading_factor
+        + 28
+        + (16 if crc else 0)
+        - (0 if explicit_header else 20)
+    )
+    denominator = 4 * (spreading_factor - (2 if low_data_rate else 0))
+    payload_symbols = 8 + max(math.ceil(numerator / denominator) * coding_rate, 0)
+    return (preamble_length + 4.25 + payload_symbols) * symbol_ms
+
+
+class TelemetryEncoder:  # pylint: disable=too-many-instance-attributes
+    """Packs state vectors into frames.
+
+    Two frame buffers are allocated up front and used in turn, so a finished
+    frame stays intact while the next one fills.
+
+    :param int max_size: Largest frame to build, at most `MAX_FRAME_SIZE`.
+    """
+
+    def __init__(self, max_size: int = MAX_FRAME_SIZE) -> None:
+        if not HEADER_SIZE + ABSOLUTE_SIZE <= max_size <= MAX_FRAME_SIZE:
+            raise ValueError("max_size must be between 23 and %d" % MAX_FRAME_SIZE)
+        self.max_size = max_size
+        self._buffers = (bytearray(max_size), bytearray(max_size))
+        self._views = (memoryview(self._buffers[0]), memoryview(self._buffers[1]))
+        self._current = 0
+        self.sequence = 0
+        self.absolute_samples = 0
+        self.delta_samples = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard the samples of the frame being built."""
+        self.count = 0
+        self._length = HEADER_SIZE
+        self._base_ticks = 0
+        self._last_ticks = 0
+        self._last = [0, 0, 0, 0, 0]
+
+    def __len__(self) -> int:
+        """Size of the frame being built, in bytes."""
+        return self._length if self.count else 0
+
+    def add(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        ticks: int,
+        state: int,
+        altitude: float,
+        velocity: float,
+        accel: Sequence[float],
+        flags: int = 0,
+    ) -> bool:
+        """Append a sample taken at ``ticks``. Returns False without changing
+        the frame when it has no room left, so send it and add again.
+
+        :param int ticks: ``ticks_ms`` of the sample.
+        :param int state: A `flight_state` state, 0 to 7.
+        :param float altitude: Altitude in meters.
+        :param float velocity: Vertical velocity in m/s.
+        :param accel: Acceleration x, y and z in m/s^2.
+        :param int flags: `FLAG_SHOCK` and `FLAG_FREE_FALL` bits.
+        """
+        values = (
+            _clamp(round(altitude * SCALE), -0x80000000, 0x7FFFFFFF),
+            _clamp(round(velocity * SCALE), -0x8000, 0x7FFF),
+            _clamp(round(accel[0] * SCALE), -0x8000, 0x7FFF),
+            _clamp(round(accel[1] * SCALE), -0x8000, 0x7FFF),
+            _clamp(round(accel[2] * SCALE), -0x8000, 0x7FFF),
+        )
+        tag = (state & _STATE_MASK) | (flags & _FLAG_MASK)
+        buf = self._buffers[self._current]
+        last = self._last
+        if self.count:
+            offset = ticks_diff(ticks, self._last_ticks)
+            if 0 <= offset <= 0xFF:
+                for i in range(5):
+                    if not -0x80 <= values[i] - last[i] <= 0x7F:
+                        break
+                else:
+                    if self._length + DELTA_SIZE > self.max_size:
+                        return False
+                    struct.pack_into(
+                        _DELTA_FORMAT,
+                        buf,
+                        self._length,
+                        tag,
+                        offset,
+                        values[0] - last[0],
+                        values[1] - last[1],
+                        values[2] - last[2],
+                        values[3] - last[3],
+                        values[4] - last[4],
+                    )
+                    self._commit(ticks, values, DELTA_SIZE)
+                    self.delta_samples += 1
+                    return True
+            offset = ticks_diff(ticks, self._base_ticks)
+            if not 0 <= offset <= 0xFFFF:
+                return False
+        else:
+            offset = 0
+            self._base_ticks = ticks
+        if self._length + ABSOLUTE_SIZE > self.max_size:
+            return False
+        struct.pack_into(
+            _ABSOLUTE_FORMAT, buf, self._length, tag | TAG_ABSOLUTE, offset, *values
+        )
+        self._commit(ticks, values, ABSOLUTE_SIZE)
+        self.absolute_samples += 1
+        return True
+
+    def _commit(self, ticks: int, values: Tuple[int, ...], size: int) -> None:
+        last = self._last
+        for i in range(5):
+            last[i] = values[i]
+        self._last_ticks = ticks
+        self._length += size
+        self.count += 1
+
+    def frame(self) -> Optional[memoryview]:
+        """Finish the current frame and start the next one. Returns the frame,
+        valid until the following call, or None if it had no samples."""
+        if not self.count:
+            return None
+        buf = self._buffers[self._current]
+        struct.pack_into(
+            _HEADER_FORMAT,
+            buf,
+            0,
+            FRAME_VERSION,
+            self.count,
+            self.sequence,
+            self._base_ticks & 0xFFFFFFFF,
+        )
+        frame = self._views[self._current][: self._length]
+        self._current ^= 1
+        self.sequence = (self.sequence + 1) & 0xFFFF
+        self.reset()
+        return frame
+
+
+def _clamp(value: int, low: int, high: int) -> int:
+    return low if value < low else high if value > high else value
+
+
+class TelemetryDownlink:  # pylint: disable=too-many-instance-attributes
+    """Sends telemetry frames within an airtime budget.
+
+    Samples offered faster than ``sample_rate_hz`` are skipped, except that
+    their event flags carry over to the next kept sample. After each packet
+    :meth:`run` keeps the radio quiet long enough that it transmits at most
+    ``duty_cycle`` of the time, and meanwhile the next frame fills, so the
+    frame rate follows the modem settings.
+
+    :param radio: An `adafruit_rfm.rfm9x.RFM9x`.
+    :param float sample_rate_hz: State vectors to send per second.
+    :param float duty_cycle: Largest fraction of the time spent transmitting.
+    :param int min_period_ms: Shortest time between the starts of two frames.
+    :param int max_frame_size: Largest frame, see `TelemetryEncoder`.
+    :param clock: Callable returning the current ``ticks_ms`` value.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        radio,
+        *,
+        sample_rate_hz: float = 10,
+        duty_cycle: float = 0.5,
+        min_period_ms: int = 0,
+        max_frame_size: int = MAX_FRAME_SIZE,
+        clock: Callable[[], int] = ticks_ms,
+    ) -> None:
+        if not 0 < duty_cycle <= 1:
+            raise ValueError("duty_cycle must be in (0, 1]")
+        self.radio = radio
+        self.encoder = TelemetryEncoder(max_frame_size)
+        self.sample_period_ms = max(1, int(1000 / sample_rate_hz + 0.5))
+        self.duty_cycle = duty_cycle
+        self.min_period_ms = min_period_ms
+        self._clock = clock
+        self._last_sample = None
+        self._flags = 0
+        self._running = False
+        self.frames = 0
+        self.failed = 0
+        self.dropped = 0
+        self.airtime_ms = 0.0
+        self.read_modem_config()
+
+    def read_modem_config(self) -> None:
+        """Read the modem settings used for the airtime budget. Call again
+        after changing the radio's spreading factor, bandwidth or coding rate."""
+        radio = self.radio
+        self.spreading_factor = radio.spreading_factor
+        self.bandwidth = radio.signal_bandwidth
+        self.coding_rate = radio.coding_rate
+        self.preamble_length = radio.preamble_length
+        self.crc = radio.enable_crc
+
+    def airtime(self, frame_size: int) -> float:
+        """Time on air in milliseconds of a frame of ``frame_size`` bytes."""
+        return time_on_air_ms(
+            frame_size + RADIOHEAD_HEADER_SIZE,
+            self.spreading_factor,
+            self.bandwidth,
+            self.coding_rate,
+            preamble_length=self.preamble_length,
+            crc=self.crc,
+        )
+
+    def offer(  # pylint: disable=too-many-arguments
+        self,
+        ticks: int,
+        state: int,
+        altitude: float,
+        velocity: float,
+        accel: Sequence[float],
+        flags: int = 0,
+    ) -> bool:
+        """Queue a sample if one is due. Returns True if it was kept. Samples
+        that do not fit in the pending frame are counted in :attr:`dropped`."""
+        self._flags |= flags
+        if (
+            self._last_sample is not None
+            and ticks_diff(ticks, self._last_sample) < self.sample_period_ms
+        ):
+            return False
+        self._last_sample = ticks
+        if not self.encoder.add(ticks, state, altitude, velocity, accel, self._flags):
+            self.dropped += 1
+            return False
+        self._flags = 0
+        return True
+
+    async def run(self, poll: float = 0.01) -> None:
+        """Send frames until :meth:`stop` is called, then send what is left."""
+        self._running = True
+        clock = self._clock
+        next_frame = clock()
+        while self._running:
+            if self.encoder.count and ticks_diff(clock(), next_frame) >= 0:
+                start = clock()
+                airtime = await self.send_frame()
+                quiet = max(airtime / self.duty_cycle, self.min_period_ms)
+                next_frame = ticks_add(start, int(quiet + 0.5))
+            await asyncio.sleep(poll)
+        if self.encoder.count:
+            await self.send_frame()
+
+    async def send_frame(self) -> float:
+        """Send the pending frame now. Returns its airtime in milliseconds."""
+        frame = self.encoder.frame()
+        if frame is None:
+            return 0.0
+        airtime = self.airtime(len(frame))
+        if await self.radio.asyncio_send(frame):
+            self.frames += 1
+        else:
+            self.failed += 1
+        self.airtime_ms += airtime
+        return airtime
+
+    def stop(self) -> None:
+        """Make :meth:`run` send the last frame and return."""
+        self._running = False
+
+
+def decode_frame(
+    packet: bytes,
+) -> Tuple[int, int, List[Tuple[int, int, int, float, float, float, float, float]]]:
+    """Unpack one frame into ``(sequence, ticks, samples)``.
+
+    Each sample is ``(ticks, state, flags, altitude, velocity, ax, ay, az)``
+    in meters, m/s and m/s^2. Raises ValueError on a malformed frame.
+    """
+    if len(packet) < HEADER_SIZE:
+        raise ValueError("Frame too short")
+    version, count, sequence, base_ticks = struct.unpack_from(_HEADER_FORMAT, packet)
+    if version != FRAME_VERSION:
+        raise ValueError("Unknown frame version %d" % version)
+    samples = []
+    offset = HEADER_SIZE
+    ticks = base_ticks
+    values = [0, 0, 0, 0, 0]
+    for _ in range(count):
+        if offset >= len(packet):
+            raise ValueError("Frame truncated")
+        tag = packet[offset]
+        if tag & TAG_ABSOLUTE:
+            if offset + ABSOLUTE_SIZE > len(packet):
+                raise ValueError("Frame truncated")
+            fields = struct.unpack_from(_ABSOLUTE_FORMAT, packet, offset)
+            ticks = base_ticks + fields[1]
+            values[:] = fields[2:]
+            offset += ABSOLUTE_SIZE
+        else:
+            if offset + DELTA_SIZE > len(packet):
+                raise ValueError("Frame truncated")
+            fields = struct.unpack_from(_DELTA_FORMAT, packet, offset)
+            ticks += fields[1]
+            for i in range(5):
+                values[i] += fields[2 + i]
+            offset += DELTA_SIZE
+        samples.append(
+            (ticks, tag & _STATE_MASK, tag & _FLAG_MASK)
+            + tuple(value / SCALE for value in values)
+        )
+    if offset != len(packet):
+        raise ValueError("Trailing bytes after frame")
+    return sequence, base_ticks, samples
+
+
+class TelemetryDecoder:  # pylint: disable=too-many-instance-attributes
+    """Ground-station side: decodes frames and tracks link quality.
+
+    Lost frames are counted from gaps in the 16 bit sequence number. A frame
+    arriving after a later one fills its gap again and is counted in
+    :attr:`late`; a repeat of the last frame is ignored.
+    """
+
+    def __init__(self) -> None:
+        self.frames = 0
+        self.samples = 0
+        self.lost = 0
+        self.late = 0
+        self.duplicates = 0
+        self.corrupt = 0
+        self.last_sequence = None
+        self.last_rssi = None
+        self.last_snr = None
+
+    def decode(
+        self, packet: bytes
+    ) -> List[Tuple[int, int, int, float, float, float, float, float]]:
+        """Decode a received frame and update the counters. Returns its
+        samples, see `decode_frame`, or an empty list if it was rejected."""
+        try:
+            sequence, _, samples = decode_frame(packet)
+        except (ValueError, struct.error):
+            self.corrupt += 1
+            return []
+        if self.last_sequence is not None:
+            gap = (sequence - self.last_sequence - 1) & 0xFFFF
+            if gap == 0xFFFF:
+                self.duplicates += 1
+                return []
+            if gap >= 0x8000:
+                self.late += 1
+                self.lost = max(self.lost - 1, 0)
+            else:
+                self.lost += gap
+                self.last_sequence = sequence
+        else:
+            self.last_sequence = sequence
+        self.frames += 1
+        self.samples += len(samples)
+        return samples
+
+    @property
+    def loss_ratio(self) -> float:
+        """Fraction of the frames sent so far that were lost."""
+        total = self.frames + self.lost
+        if not total:
+            return 0.0
+        return self.lost / total
+
+    def report(self) -> str:
+        """One-line summary of the link."""
+        line = "%d frames, %d samples, %d lost (%.1f%%), %d late, %d corrupt" % (
+            self.frames,
+            self.samples,
+            self.lost,
+            self.loss_ratio * 100,
+            self.late,
+            self.corrupt,
+        )
+        if self.last_rssi is not None:
+            line += ", RSSI %.0f dBm, SNR %.1f dB" % (self.last_rssi, self.last_snr)
+        return line
+
+    async def listen(
+        self,
+        radio,
+        on_sample: Callable[[Tuple[int, int, int, float, float, float, float, float]], None],
+        timeout: float = 1.0,
+    ) -> None:
+        """Receive and decode frames from ``radio`` forever, calling
+        ``on_sample`` for every sample."""
+        while True:
+            packet = await radio.asyncio_receive(timeout=timeout)
+            if packet is None:
+                continue
+            self.last_rssi = radio.last_rssi
+            self.last_snr = radio.last_snr
+            for sample in self.decode(packet):
+                on_sample(sample)
+
+
+if __name__ == "__main__":
+    import random
+
+    from flight_state import simulate_flight
+
+    sim_trace, _ = simulate_flight()
+    sim_encoder = TelemetryEncoder()
+    sim_decoder = TelemetryDecoder()
+    rng = random.Random(2)
+    sent = []
+    previous = None
+    for t_ms, sim_altitude, ax, ay, az in sim_trace[::20]:
+        sim_velocity = 0.0
+        if previous is not None:
+            sim_velocity = (sim_altitude - previous[1]) * 1000 / (t_ms - previous[0])
+        previous = (t_ms, sim_altitude)
+        sample = (t_ms, 0, sim_altitude, sim_velocity, (ax, ay, az))
+        if not sim_encoder.add(*sample):
+            sent.append(bytes(sim_encoder.frame()))
+            sim_encoder.add(*sample)
+    sent.append(bytes(sim_encoder.frame()))
+    for sim_frame in sent:
+        if rng.random() > 0.1:
+            sim_decoder.decode(sim_frame)
+    total = sum(len(sim_frame) for sim_frame in sent)
+    print(
+        "%d samples in %d frames, %.1f bytes/sample (%d absolute, %d delta)"
+        % (
+            sim_encoder.absolute_samples + sim_encoder.delta_samples,
+            len(sent),
+            total / (sim_encoder.absolute_samples + sim_encoder.delta_samples),
+            sim_encoder.absolute_samples,
+            sim_encoder.delta_samples,
+        )
+    )
+    print("Ground:", sim_decoder.report())
+    for sim_sf in (7, 9, 12):
+        sim_airtime = time_on_air_ms(MAX_FRAME_SIZE + RADIOHEAD_HEADER_SIZE, sim_sf)
+        sim_samples = (MAX_FRAME_SIZE - HEADER_SIZE) // DELTA_SIZE
+        print(
+            "SF%d: %.0f ms per full frame, %.1f samples per second of airtime"
+            % (sim_sf, sim_airtime, sim_samples * 1000 / sim_airtime)
+        )